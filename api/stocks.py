@@ -0,0 +1,73 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / 'shared'))
+
+from engines import core_fmp, api_snapshots, http_cache
+
+# /api/stocks?tickers=NVDA,AAPL,MSFT&fields=scores,trade
+#   → {"count": 3, "stocks": {"NVDA": {"ticker": "NVDA", "scores": {...}, "trade": {...}}, ...}, "missing": []}
+# fields 省略時は api/stock/[ticker] と同じ全項目
+MAX_TICKERS  = 50
+MAX_LIVE     = 10   # スナップショットの無い銘柄をその場で計算する上限（超えた分は missing）
+LIVE_WORKERS = 5
+FIELDS       = {"date", "status", "price", "pivot", "dist_pct", "vcp", "rs",
+                "scores", "trade", "profile", "candles"}
+QUOTE_FIELDS = {"price", "dist_pct", "status"}   # クォートで上書きされる項目
+
+
+def _project(data: dict, fields) -> dict:
+    if fields is None:
+        return data
+    return {"ticker": data["ticker"], **{k: data[k] for k in fields if k in data}}
+
+
+def _live(ticker: str, quote):
+    try:
+        return api_snapshots.live(ticker, quote)
+    except Exception as e:
+        print(f"live {ticker}: {e}")
+        return None
+
+
+def handler(request):
+    """(body, status, headers) を返す。ETag が一致すれば 304（http_cache）"""
+    params  = request.query_params
+    tickers = list(dict.fromkeys(t.strip().upper() for t in params.get('tickers', '').split(',') if t.strip()))
+    if not tickers:
+        return http_cache.error({"error": "tickers is required"}, 400)
+    if len(tickers) > MAX_TICKERS:
+        return http_cache.error({"error": f"at most {MAX_TICKERS} tickers per request"}, 400)
+
+    fields = [f.strip() for f in params.get('fields', '').split(',') if f.strip()] or None
+    if fields is not None and set(fields) - FIELDS:
+        return http_cache.error({"error": f"unknown fields: {', '.join(sorted(set(fields) - FIELDS))}"}, 400)
+
+    # 事前計算スナップショット（日次スキャン済みの銘柄）
+    snaps = {t: api_snapshots.load(t) for t in tickers}
+    found = [t for t in tickers if snaps[t] is not None]
+    rest  = [t for t in tickers if snaps[t] is None]
+
+    # 価格系の項目を返すときだけ、全銘柄のクォートを batch-quote でまとめて取る
+    need_quote = fields is None or bool(QUOTE_FIELDS & set(fields))
+    quotes = core_fmp.get_quotes(tickers) if need_quote else {}
+
+    stocks = {t: api_snapshots.with_quote(snaps[t], quotes.get(t)) for t in found}
+
+    # ユニバース外の銘柄はその場で計算（並列・上限付き）
+    live_targets, missing = rest[:MAX_LIVE], rest[MAX_LIVE:]
+    if live_targets:
+        with ThreadPoolExecutor(max_workers=min(LIVE_WORKERS, len(live_targets))) as pool:
+            results = pool.map(lambda t: _live(t, quotes.get(t)), live_targets)
+            for t, data in zip(live_targets, results):
+                if data is None:
+                    missing.append(t)
+                else:
+                    stocks[t] = data
+
+    body = {
+        "count":   len(stocks),
+        "stocks":  {t: _project(stocks[t], fields) for t in tickers if t in stocks},
+        "missing": missing,
+    }
+    return http_cache.respond(request, body, max((d["date"] for d in stocks.values()), default=""))
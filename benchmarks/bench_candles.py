@@ -0,0 +1,43 @@
+"""
+bench_candles.py — チャート用ローソク足のシリアライズ（合成データ 180本 / 700本）
+iterrows は置き換え前の実装（api/stock・generate_market）で、比較用に残している。
+"""
+from engines import synthetic, candles
+
+TICKER = "SYN00001"
+
+
+def _iterrows(df):
+    return [{
+        "date":   d.strftime("%Y-%m-%d"),
+        "open":   round(float(r["Open"]),  2),
+        "high":   round(float(r["High"]),  2),
+        "low":    round(float(r["Low"]),   2),
+        "close":  round(float(r["Close"]), 2),
+        "volume": int(r["Volume"]),
+    } for d, r in df.iterrows()]
+
+
+def bench_iterrows_180():
+    df = synthetic.generate_ohlcv(TICKER, 180)
+    return lambda: _iterrows(df)
+
+
+def bench_encode_180():
+    df = synthetic.generate_ohlcv(TICKER, 180)
+    return lambda: candles.encode(df)
+
+
+def bench_encode_rows_180():
+    df = synthetic.generate_ohlcv(TICKER, 180)
+    return lambda: candles.encode_rows(df)
+
+
+def bench_iterrows_700():
+    df = synthetic.generate_ohlcv(TICKER, 700)
+    return lambda: _iterrows(df)
+
+
+def bench_encode_700():
+    df = synthetic.generate_ohlcv(TICKER, 700)
+    return lambda: candles.encode(df)
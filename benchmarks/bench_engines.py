@@ -0,0 +1,55 @@
+"""
+bench_engines.py — スコアリングエンジン単体のベンチマーク（合成データ 700本）
+"""
+from engines import synthetic
+from engines.analysis            import VCPAnalyzer, RSAnalyzer, StrategyValidator
+from engines.sentinel_efficiency import SentinelEfficiencyAnalyzer
+from engines.ecr_strategy        import ECRStrategyEngine
+from engines.canslim             import CANSLIMAnalyzer
+
+TICKER = "SYN00001"
+DAYS   = 700
+
+# CANSLIM 用のスタブ（income-statement 2期分 + fundamentals）
+STUB_STMTS = [
+    {"eps": 3.2, "revenue": 1.25e10},
+    {"eps": 2.4, "revenue": 1.00e10},
+]
+STUB_FUND = {"earnings_growth_yoy": 33.3, "revenue_growth_yoy": 25.0}
+
+
+def _df():
+    return synthetic.generate_ohlcv(TICKER, DAYS)
+
+
+def bench_vcp_calculate():
+    df = _df()
+    return lambda: VCPAnalyzer.calculate(df)
+
+
+def bench_strategy_validator_run():
+    df = _df()
+    return lambda: StrategyValidator.run(df)
+
+
+def bench_ses_calculate():
+    df = _df()
+    return lambda: SentinelEfficiencyAnalyzer.calculate(df)
+
+
+def bench_ecr_analyze_single():
+    df = _df()
+    return lambda: ECRStrategyEngine.analyze_single(TICKER, df)
+
+
+def bench_canslim_calculate():
+    df = _df()
+    return lambda: CANSLIMAnalyzer.calculate(TICKER, df, fund=STUB_FUND, stmts=STUB_STMTS)
+
+
+def bench_rs_assign_percentiles():
+    # 5,000銘柄分の raw RS（ユニバース10倍規模）
+    raw = [{"ticker": t, "raw_rs": RSAnalyzer.get_raw_score(synthetic.generate_ohlcv(t, 260))}
+           for t in synthetic.synthetic_tickers(200)]
+    raw = [dict(r, ticker=f"{r['ticker']}_{k}") for k in range(25) for r in raw]
+    return lambda: RSAnalyzer.assign_percentiles(list(raw))
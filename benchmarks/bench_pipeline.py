@@ -0,0 +1,23 @@
+"""
+bench_pipeline.py — エンドツーエンドのオフラインスキャン（合成40銘柄）
+"""
+from engines import synthetic
+from pipeline import run_scan
+
+import generate_strategies
+
+SCAN_SIZE = 40
+
+
+def bench_scan_offline():
+    tickers = synthetic.synthetic_tickers(SCAN_SIZE)
+
+    def run():
+        snapshot = run_scan(tickers, refresh=True, persist=False)
+        results  = [generate_strategies.to_strategy_row(r) for r in snapshot]
+        generate_strategies.build_rankings(results)
+        generate_strategies.build_phase_summary(results)
+        generate_strategies.build_method_comparison(results)
+    return run
+
+bench_scan_offline.repeat = 3
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+benchmarks/cold_start.py — api/stock/[ticker] ハンドラのコールド / ウォーム レイテンシ
+=====================================================================================
+サーバーレスのコールドスタートを、毎回新しい Python プロセスでハンドラを読み込んで近似する。
+
+  import  … ハンドラモジュールの読み込み（engines の import を含む）
+  first   … 読み込み直後の1回目の handler() 呼び出し
+  warm    … 同じプロセスで続けて呼んだときの中央値
+  process … インタプリタ起動からプロセス終了まで（子プロセスの実時間）
+
+経路:
+  snapshot … 事前計算スナップショット + クォートのキャッシュヒット（DATA_PROVIDER=fmp だがネットワーク不使用）
+  live     … スナップショット無し → api_snapshots.live()（DATA_PROVIDER=synthetic で履歴を生成）
+
+スナップショット・キャッシュは一時ディレクトリに作る（API_SNAPSHOT_DIR / FMP_CACHE_DIR）。
+run.py のケース（bench_*.py）とは別物で、baseline との比較はしない。
+
+使い方:
+  python benchmarks/cold_start.py                  # 両経路 × 5 プロセス
+  python benchmarks/cold_start.py --runs 10 --warm 50
+  python benchmarks/cold_start.py --json cold_start.json
+  python3.9 benchmarks/cold_start.py               # vercel.json の runtime（python3.9）で import できるかも確認する
+"""
+import os, sys, json, time, argparse, tempfile, statistics, subprocess
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+ROOT      = BENCH_DIR.parent
+HANDLER   = ROOT / "api" / "stock" / "[ticker].py"
+
+DEFAULT_TICKER = "NVDA"
+DEFAULT_RUNS   = 5
+DEFAULT_WARM   = 20
+HEAVY_MODULES  = ("pandas", "requests", "numpy")
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 子プロセス（1回のコールドスタート）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def child(ticker: str, warm: int):
+    import importlib.util
+    from types import SimpleNamespace
+
+    t0 = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("ticker_handler", HANDLER)
+    mod  = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    t1 = time.perf_counter()
+    loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    request = SimpleNamespace(path_params={"ticker": ticker}, query_params={}, headers={})
+    _, status, _ = mod.handler(request)
+    t2 = time.perf_counter()
+
+    times = []
+    for _ in range(warm):
+        s = time.perf_counter()
+        mod.handler(request)
+        times.append(time.perf_counter() - s)
+
+    print(json.dumps({
+        "status":    status,
+        "import_ms": (t1 - t0) * 1000,
+        "first_ms":  (t2 - t1) * 1000,
+        "warm_ms":   statistics.median(times) * 1000 if times else None,
+        "on_import": loaded,
+        "after":     [m for m in HEAVY_MODULES if m in sys.modules],
+    }))
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 親プロセス（準備・集計）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def prepare(tmp: Path, ticker: str) -> dict:
+    """一時ディレクトリにスナップショットとクォートのキャッシュを作り、経路ごとの環境変数を返す"""
+    os.environ.update(DATA_PROVIDER="synthetic", FMP_CACHE_DIR=str(tmp / "cache"))
+    sys.path.insert(0, str(ROOT / "shared"))
+    from engines import api_snapshots, content_writer, core_fmp
+
+    data = api_snapshots.live(ticker)
+    content_writer.write_json(api_snapshots._file(ticker, tmp / "snapshots"), data,
+                              compress=False, manifest=False)
+    (tmp / "empty").mkdir()
+    quote = core_fmp.get_quote(ticker)
+
+    def seed():
+        # ザラ場中は QUOTE_TTL 秒で切れるので、計測のたびに書き直してキャッシュヒットにする
+        core_fmp._write_cache_file(core_fmp._cache_file(f"quote_{ticker}"), json.dumps([quote]))
+
+    base = {**os.environ, "FMP_API_KEY": "", "FMP_CACHE_DIR": str(tmp / "cache")}
+    return {
+        "snapshot": ({**base, "DATA_PROVIDER": "fmp", "API_SNAPSHOT_DIR": str(tmp / "snapshots")}, seed),
+        "live":     ({**base, "DATA_PROVIDER": "synthetic", "API_SNAPSHOT_DIR": str(tmp / "empty")}, None),
+    }
+
+
+def measure(env: dict, seed, ticker: str, runs: int, warm: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        if seed:
+            seed()
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, __file__, "--child", "--ticker", ticker, "--warm", str(warm)],
+                             env=env, capture_output=True, text=True, check=True)
+        rec = json.loads(out.stdout.strip().splitlines()[-1])
+        rec["process_ms"] = (time.perf_counter() - start) * 1000
+        samples.append(rec)
+
+    med = lambda k: round(statistics.median(s[k] for s in samples), 1)
+    return {
+        "status":    samples[0]["status"],
+        "import_ms": med("import_ms"),
+        "first_ms":  med("first_ms"),
+        "warm_ms":   round(statistics.median(s["warm_ms"] for s in samples), 2),
+        "process_ms": med("process_ms"),
+        "on_import": samples[0]["on_import"],
+        "after":     samples[0]["after"],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="api/stock handler cold/warm latency")
+    ap.add_argument("--ticker", default=DEFAULT_TICKER)
+    ap.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="コールドスタートの回数（中央値を取る）")
+    ap.add_argument("--warm", type=int, default=DEFAULT_WARM, help="1プロセス内のウォーム呼び出し回数")
+    ap.add_argument("--only", choices=("snapshot", "live"))
+    ap.add_argument("--json", help="結果を JSON で書き出すパス")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        return child(args.ticker, args.warm)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths   = prepare(Path(tmp), args.ticker)
+        results = {name: measure(env, seed, args.ticker, args.runs, args.warm)
+                   for name, (env, seed) in paths.items() if args.only in (None, name)}
+
+    print(f"{'path':<10}{'status':>7}{'import':>10}{'first':>10}{'warm':>10}{'process':>10}  modules (import → after)")
+    for name, r in results.items():
+        print(f"{name:<10}{r['status']:>7}{r['import_ms']:>8.1f}ms{r['first_ms']:>8.1f}ms"
+              f"{r['warm_ms']:>8.2f}ms{r['process_ms']:>8.1f}ms  "
+              f"{','.join(r['on_import']) or '-'} → {','.join(r['after']) or '-'}")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"ticker": args.ticker, "runs": args.runs,
+                                               "warm": args.warm, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+benchmarks/run.py — スコアリングエンジン・パイプラインのベンチマーク
+====================================================================
+固定の合成データ（DATA_PROVIDER=synthetic）で各ホットパスを計測し、
+baseline.json と比較して閾値を超えて遅くなったケースがあれば終了コード 1 を返す。
+
+比較は絶対時間ではなく相対値で行う:
+  - 同じプロセスで基準ループ（reference）をケースと交互に計測し、リピートごとの
+    ケース ÷ 基準ループ の比の中央値（rel）を baseline の rel と比べる
+  - マシンの速さ・フルラン中の周波数低下や他プロセスの負荷は両方に乗るので打ち消される
+  - 計測中は gc を止める（timeit と同じ。前のケースのゴミ回収が後のケースに乗らないように）
+baseline の min / median（秒）は参考値として残すだけで判定には使わない。
+
+ケースは benchmarks/bench_*.py の bench_* 関数（asv 方式）:
+  - 関数本体 = セットアップ（計測対象外）
+  - 戻り値   = 計測する引数なしの callable
+  - 関数属性 repeat を付けると繰り返し回数を上書きできる
+
+使い方:
+  python benchmarks/run.py                  # 計測 + baseline と比較
+  python benchmarks/run.py -k vcp           # 名前に vcp を含むケースのみ
+  python benchmarks/run.py --update         # baseline.json を更新
+  python benchmarks/run.py --threshold 0.5  # 許容劣化率（既定 0.30 = +30%）
+"""
+import os, sys, gc, io, json, time, platform, argparse, statistics, importlib
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# エンジン import 前に合成データへ切替（ネットワーク・APIキー不要）
+os.environ["DATA_PROVIDER"] = "synthetic"
+
+BENCH_DIR = Path(__file__).parent
+ROOT      = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT / "shared"))
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(BENCH_DIR))
+
+BASELINE_FILE     = BENCH_DIR / "baseline.json"
+DEFAULT_THRESHOLD = 0.30
+DEFAULT_REPEAT    = 11
+MIN_REPEAT_TIME   = 0.1    # 1リピートあたりの最小計測時間（秒）→ ループ回数を自動調整
+
+
+def discover() -> dict:
+    """bench_*.py から {ケース名: bench関数} を収集"""
+    cases = {}
+    for path in sorted(BENCH_DIR.glob("bench_*.py")):
+        mod = importlib.import_module(path.stem)
+        for name in sorted(dir(mod)):
+            if name.startswith("bench_") and callable(getattr(mod, name)):
+                cases[f"{path.stem[6:]}.{name[6:]}"] = getattr(mod, name)
+    return cases
+
+
+def reference():
+    """基準ループ: エンジンと同じ種類の処理（pandas のローリング・numpy・素の Python ループ）を固定量"""
+    import numpy as np
+    import pandas as pd
+    close = pd.Series(np.random.default_rng(0).standard_normal(700).cumsum() + 100)
+
+    def run():
+        close.rolling(50).mean()
+        close.ewm(span=20).mean()
+        np.maximum.accumulate(close.to_numpy())
+        sum(i * i for i in range(3000))
+    return run
+
+
+def calibrate(fn) -> int:
+    """1リピートが MIN_REPEAT_TIME 以上になるループ回数（ウォーム状態で倍々に伸ばして決める）"""
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= MIN_REPEAT_TIME:
+            return loops
+        # 残りを見積もって伸ばす（見積もりが外れても次の周回で倍にはなる）
+        loops = max(loops * 2, int(loops * MIN_REPEAT_TIME / elapsed) + 1) if elapsed > 0 else loops * 2
+
+
+def _timed(fn, loops: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return (time.perf_counter() - t0) / loops
+
+
+def measure(bench, ref, ref_loops: int) -> dict:
+    """
+    セットアップ → 校正 → repeat 回計測。1呼び出しあたりの秒数と、
+    各リピートの直後に計測した基準ループとの比の中央値（rel）を返す
+    """
+    with redirect_stdout(io.StringIO()):
+        fn = bench()
+        fn()     # ウォームアップ（初回だけの遅延 import・キャッシュ作成を校正に含めない）
+        loops = calibrate(fn)
+        repeat = getattr(bench, "repeat", DEFAULT_REPEAT)
+        samples, ratios = [], []
+        gc.collect()
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(repeat):
+                sec = _timed(fn, loops)
+                samples.append(sec)
+                ratios.append(sec / _timed(ref, ref_loops))
+        finally:
+            if enabled:
+                gc.enable()
+    return {
+        "median": statistics.median(samples),
+        "min":    min(samples),
+        "rel":    statistics.median(ratios),
+        "loops":  loops,
+        "repeat": repeat,
+    }
+
+
+def _fmt(sec: float) -> str:
+    return f"{sec * 1e3:9.3f} ms" if sec < 1 else f"{sec:9.3f} s "
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SENTINEL benchmark suite")
+    ap.add_argument("-k", default=None, help="ケース名の部分一致フィルタ")
+    ap.add_argument("--update", action="store_true", help="baseline.json を今回の結果で更新")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="許容する劣化率（0.30 = baseline の rel の 1.3倍まで）")
+    ap.add_argument("--json", default=None, help="結果を JSON で保存するパス")
+    args = ap.parse_args()
+
+    baseline = json.loads(BASELINE_FILE.read_text()).get("cases", {}) if BASELINE_FILE.exists() else {}
+    cases = {k: v for k, v in discover().items() if not args.k or args.k in k}
+
+    print(f"===== BENCHMARK ({len(cases)} cases / threshold +{args.threshold:.0%} relative to reference) =====")
+    results, regressions = {}, []
+    ref = reference()
+    ref()
+    ref_loops = calibrate(ref)
+    for name, bench in cases.items():
+        res = measure(bench, ref, ref_loops)
+        results[name] = res
+        base = baseline.get(name, {}).get("rel")
+        if base:
+            ratio  = res["rel"] / base
+            mark   = "❌" if ratio > 1 + args.threshold else "✅"
+            detail = f"x{ratio:5.2f} (rel {res['rel']:.3g} vs {base:.3g})"
+            if mark == "❌":
+                regressions.append(name)
+        else:
+            mark, detail = "🆕", "no baseline"
+        print(f"  {mark} {name:38s} min {_fmt(res['min'])} / median {_fmt(res['median'])}"
+              f"  ({res['loops']}x{res['repeat']})  {detail}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+    if args.update:
+        merged = {**baseline, **results}
+        BASELINE_FILE.write_text(json.dumps({
+            "meta": {
+                "python":   platform.python_version(),
+                "machine":  platform.machine(),
+                "platform": platform.platform(terse=True),
+                "updated":  time.strftime("%Y-%m-%d"),
+            },
+            "cases": {k: {"min": round(v["min"], 9), "median": round(v["median"], 9),
+                          "rel": round(v["rel"], 6)}
+                      for k, v in sorted(merged.items())},
+        }, indent=2) + "\n")
+        print(f"💾 baseline updated: {BASELINE_FILE}")
+        return 0
+
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
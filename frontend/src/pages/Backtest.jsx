@@ -8,6 +8,7 @@ import {
 import { FlaskConical, TrendingUp, TrendingDown, Zap,
          Trophy, AlertTriangle, ExternalLink } from 'lucide-react';
 import { useSEO } from '../hooks/useSEO';
+import { fetchContent } from '@shared/useContent';
 
 // ── 手法メタ ─────────────────────────────────────────────
 const METHODS = {
@@ -266,8 +267,7 @@ export default function Backtest() {
   });
 
   useEffect(() => {
-    fetch('/content/backtest.json')
-      .then(r => r.ok ? r.json() : null)
+    fetchContent('backtest.json')
       .then(d => { setData(d); setLoading(false); })
       .catch(() => setLoading(false));
   }, []);
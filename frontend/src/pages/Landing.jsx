@@ -3,6 +3,7 @@ import { Link } from 'react-router-dom';
 import { Shield, TrendingUp, Zap, BarChart3, ArrowRight,
          ChevronRight, FlaskConical, Activity, Loader } from 'lucide-react';
 import { useSEO } from '../hooks/useSEO';
+import { fetchContent } from '@shared/useContent';
 
 const FEATURES = [
   { icon: BarChart3,  title: 'RS Rating',        body: '全銘柄を相対強度でランク付け。市場の上位銘柄だけをスキャン対象に絞り込む。' },
@@ -17,8 +18,7 @@ function BacktestSummaryCard() {
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    fetch('/content/backtest.json')
-      .then(r => r.ok ? r.json() : null)
+    fetchContent('backtest.json')
       .then(d => { setBt(d); setLoading(false); })
       .catch(() => setLoading(false));
   }, []);
@@ -7,15 +7,18 @@ import {
   BarChart
 } from 'recharts';
 import { useSEO } from '../hooks/useSEO';
+import { fetchContent } from '@shared/useContent';
+import { toCandleRows } from '../lib/candles';
 import { Activity, TrendingUp, TrendingDown, Zap,
          ExternalLink, ChevronRight, Loader } from 'lucide-react';
 
 // ── ローソク足チャート（ComposedChart + Bar trick） ──────
 function CandleChart({ candles, color, label }) {
-  if (!candles?.length) return null;
+  const rows = toCandleRows(candles);
+  if (!rows.length) return null;
 
   // 直近90日
-  const data = candles.slice(-90).map(c => {
+  const data = rows.slice(-90).map(c => {
     const up    = c.close >= c.open;
     const body  = Math.abs(c.close - c.open);
     const bodyLo = Math.min(c.open, c.close);
@@ -111,8 +114,9 @@ function CandleChart({ candles, color, label }) {
 
 // ── シンプルな終値折れ線チャート ───────────────────────────
 function PriceLineChart({ candles, color, label }) {
-  if (!candles?.length) return null;
-  const data = candles.slice(-90).map(c => ({
+  const rows = toCandleRows(candles);
+  if (!rows.length) return null;
+  const data = rows.slice(-90).map(c => ({
     date:  c.date.slice(5),
     close: c.close,
     vol:   c.volume,
@@ -257,8 +261,7 @@ export default function Market() {
   });
 
   useEffect(() => {
-    fetch('/content/market.json')
-      .then(r => r.ok ? r.json() : null)
+    fetchContent('market.json')
       .then(d => { setData(d); setLoading(false); })
       .catch(() => setLoading(false));
   }, []);
@@ -5,6 +5,9 @@ import {
   BarChart, Bar, XAxis, YAxis, Tooltip, Cell, CartesianGrid,
 } from 'recharts';
 import { useSEO } from '../hooks/useSEO';
+import {
+  fetchStrategyIndex, fetchStrategyShard, fetchStrategyRows, fetchMethodComparison,
+} from '@shared/useContent';
 import { FlaskConical, Zap, TrendingUp, Award, ExternalLink,
          ChevronRight, Activity } from 'lucide-react';
 
@@ -129,11 +132,10 @@ function RankRow({ rank, r, activeMethod, lang }) {
 }
 
 // ── 手法比較レーダーチャート ──────────────────────────────
-function MethodRadar({ rankings, ticker }) {
-  if (!rankings || !ticker) return null;
-  // 指定ティッカーの各手法スコアを集める
-  const allData = Object.values(rankings).flat();
-  const found   = allData.find(r => r.ticker === ticker);
+function MethodRadar({ rows, ticker }) {
+  if (!rows || !ticker) return null;
+  // 指定ティッカーの各手法スコアを集める（rows.json = ランキング・フェーズに出てくる全銘柄）
+  const found = rows.find(r => r.ticker === ticker);
   if (!found) return null;
 
   const radarData = [
@@ -195,9 +197,11 @@ function MethodCompareChart({ data, lang }) {
 }
 
 // ── ECRフェーズサマリー ───────────────────────────────────
+// パネルに表示するフェーズ（このフェーズのシャードだけ取得する）
+const ECR_PHASE_ORDER = ['ACCUMULATION', 'IGNITION', 'RELEASE', 'HOLD/WATCH'];
+
 function ECRPhasePanel({ phases, lang }) {
   if (!phases) return null;
-  const order = ['ACCUMULATION', 'IGNITION', 'RELEASE', 'HOLD/WATCH'];
   return (
     <div className="bg-panel border border-border rounded-xl overflow-hidden">
       <div className="px-5 py-3.5 border-b border-border">
@@ -209,7 +213,7 @@ function ECRPhasePanel({ phases, lang }) {
         </div>
       </div>
       <div className="p-4 space-y-4">
-        {order.map(p => {
+        {ECR_PHASE_ORDER.map(p => {
           const def   = ECR_PHASES[p] ?? ECR_PHASES.WATCH;
           const items = phases[p] ?? [];
           if (!items.length) return null;
@@ -295,8 +299,12 @@ function ConsensusPanel({ items, lang }) {
 
 // ── メインページ ─────────────────────────────────────────
 export default function Strategies() {
-  const [data,         setData]         = useState(null);
+  const [data,         setData]         = useState(null);   // strategies/index.json
   const [loading,      setLoading]      = useState(true);
+  const [rankings,     setRankings]     = useState({});     // 取得済みのランキング（表示したものだけ）
+  const [phases,       setPhases]       = useState(null);
+  const [methodCmp,    setMethodCmp]    = useState(null);
+  const [radarRows,    setRadarRows]    = useState(null);
   const [activeMethod, setActiveMethod] = useState('composite');
   const [radarTicker,  setRadarTicker]  = useState('');
   const [lang,         setLang]         = useState('ja');
@@ -312,13 +320,33 @@ export default function Strategies() {
   });
 
   useEffect(() => {
-    fetch('/content/strategies.json')
-      .then(r => r.ok ? r.json() : null)
+    fetchStrategyIndex()
       .then(d => { setData(d); setLoading(false); })
       .catch(() => setLoading(false));
   }, []);
 
-  const rankings = data?.rankings ?? {};
+  // 表示中のタブとコンセンサスのシャードだけ取得（取得済みは fetchContent 側で再利用）
+  useEffect(() => {
+    if (!data) return;
+    [activeMethod, 'consensus'].forEach(name =>
+      fetchStrategyShard(data.rankings?.[name])
+        .then(items => setRankings(prev => ({ ...prev, [name]: items })))
+        .catch(() => {}));
+  }, [data, activeMethod]);
+
+  useEffect(() => {
+    if (!data) return;
+    fetchMethodComparison(data).then(setMethodCmp).catch(() => {});
+    const shown = ECR_PHASE_ORDER.filter(p => data.ecr_phases?.[p]);
+    Promise.all(shown.map(p => fetchStrategyShard(data.ecr_phases[p])))
+      .then(lists => setPhases(Object.fromEntries(shown.map((p, i) => [p, lists[i]]))))
+      .catch(() => {});
+  }, [data]);
+
+  useEffect(() => {
+    if (data && radarTicker && !radarRows) fetchStrategyRows().then(setRadarRows).catch(() => {});
+  }, [data, radarTicker, radarRows]);
+
   const activeList = rankings[activeMethod] ?? [];
 
   return (
@@ -408,7 +436,7 @@ export default function Strategies() {
                     <Icon size={11}/>
                     {m.label}
                     <span className={`text-xs ${activeMethod === m.key ? 'text-ink/60' : 'text-muted/60'}`}>
-                      ({(rankings[m.key] ?? []).length})
+                      ({data.rankings?.[m.key]?.count ?? 0})
                     </span>
                   </button>
                 );
@@ -466,10 +494,10 @@ export default function Strategies() {
             </div>
 
             {/* 手法比較チャート */}
-            <MethodCompareChart data={data.method_comparison} lang={lang}/>
+            <MethodCompareChart data={methodCmp} lang={lang}/>
 
             {/* ECRフェーズパネル */}
-            <ECRPhasePanel phases={data.ecr_phases} lang={lang}/>
+            <ECRPhasePanel phases={phases} lang={lang}/>
 
             {/* コンセンサス */}
             <ConsensusPanel items={rankings.consensus} lang={lang}/>
@@ -493,7 +521,7 @@ export default function Strategies() {
                 </span>
               </div>
               {radarTicker && (
-                <MethodRadar rankings={rankings} ticker={radarTicker}/>
+                <MethodRadar rows={radarRows} ticker={radarTicker}/>
               )}
             </div>
 
@@ -1,10 +1,19 @@
+import { fileURLToPath } from 'node:url';
 import { defineConfig } from 'vite';
 import react from '@vitejs/plugin-react';
 
+// frontend / personal 共通の JS（shared/web）。react はこのアプリの node_modules から解決する
+const sharedWeb = fileURLToPath(new URL('../shared/web', import.meta.url));
+
 export default defineConfig({
   plugins: [react()],
+  resolve: {
+    alias:  { '@shared': sharedWeb },
+    dedupe: ['react', 'react-dom'],
+  },
   server: {
     port: 3000,
+    fs: { allow: ['.', sharedWeb] },
     proxy: {
       '/api': {
         target: 'http://localhost:8000',
@@ -2,157 +2,84 @@
 """
 generate_strategies.py — 完全版
 ================================
-- 30日履歴保存
+- スコア履歴保存（銘柄 × 日付のストア。保持は年単位。キーは実行日ではなくスキャンの as_of 営業日）
 - 全数値必ず出力（ma50_ratio, ma200_ratio など）
-- 並列処理対応（MAX_WORKERS=2）
+- スキャン本体は shared/pipeline（公開サイト側スクリプトと共通の1日1回スキャン）
 
 出力:
-  - frontend/public/content/strategies.json
-  - frontend/public/content/strategies_history/{date}.json (30日分)
+  - frontend/public/content/strategies/（index.json + ランキング・フェーズ・手法比較ごとのシャード）
+  - frontend/public/content/score_history/{TICKER}.json（銘柄別のスコア推移。全履歴は data/score_history.parquet）
 """
-import sys, json, time
-import pandas as pd
-import numpy as np
+import sys
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-sys.path.append(str(Path(__file__).parent.parent / "shared"))
+sys.path.append(str(Path(__file__).parent.parent.parent / "shared"))
 
-from engines import core_fmp
-from engines.analysis           import VCPAnalyzer, RSAnalyzer, StrategyValidator
-from engines.sentinel_efficiency import SentinelEfficiencyAnalyzer
-from engines.ecr_strategy        import ECRStrategyEngine
-from engines.canslim             import CANSLIMAnalyzer
-from engines.config              import CONFIG, TICKERS
+from engines import content_writer, score_history
+from engines.config import TICKERS
+from pipeline import run_scan
+from pipeline.scan import default_as_of
 
 JST     = timezone(timedelta(hours=9))
 TODAY   = datetime.now(JST).strftime("%Y-%m-%d")
 CONTENT = Path(__file__).parent.parent / "frontend" / "public" / "content"
-OUT     = CONTENT / "strategies.json"
-HIST    = CONTENT / "strategies_history"
+OUT     = CONTENT / "strategies"
+LEGACY  = CONTENT / "strategies.json"      # 分割前の単一ファイル（書き出し時に削除）
+HIST    = CONTENT / "strategies_history"   # 旧形式（日次 JSON）。初回に score_history へ取り込む
+SERIES  = CONTENT / "score_history"        # 銘柄別の時系列（engines.score_history）
 
 # 全銘柄スキャン（最大600銘柄）
 SCAN_TICKERS = TICKERS
-MAX_WORKERS  = 2  # API制限考慮
 
 
-def process_ticker(ticker: str):
-    """1銘柄の全手法計算（並列用）"""
-    try:
-        df = core_fmp.get_historical_data(ticker, days=700)
-        if df is None or len(df) < 200:
-            return None
-
-        # 各手法計算
-        vcp     = VCPAnalyzer.calculate(df)
-        pf      = StrategyValidator.run(df)
-        ses     = SentinelEfficiencyAnalyzer.calculate(df)
-        ecr     = ECRStrategyEngine.analyze_single(ticker, df)
-        rs_raw  = RSAnalyzer.get_raw_score(df)
-        
-        fund    = core_fmp.get_fundamentals(ticker) or {}
-        own     = core_fmp.get_ownership(ticker) or {}
-        canslim = CANSLIMAnalyzer.calculate(ticker, df, fund=fund, own=own)
-        profile = core_fmp.get_company_profile(ticker) or {}
-
-        # 価格計算（全数値必ず出力）
-        price  = float(df["Close"].iloc[-1])
-        pivot  = float(df["High"].iloc[-20:].max())
-        dist   = (price - pivot) / pivot
-        status = "ACTION" if -0.05 <= dist <= 0.03 else ("WAIT" if dist < -0.05 else "EXTENDED")
-
-        # MA比率（必ず計算・Noneを避ける）
-        ma50  = df["Close"].rolling(50).mean().iloc[-1]
-        ma200 = df["Close"].rolling(200).mean().iloc[-1]
-        ma50_ratio  = round((price / ma50  - 1) * 100, 1) if pd.notna(ma50)  and ma50  > 0 else 0.0
-        ma200_ratio = round((price / ma200 - 1) * 100, 1) if pd.notna(ma200) and ma200 > 0 else 0.0
-
-        # ATR比率（必ず計算）
-        atr = vcp.get("atr", 0)
-        atr_pct = round(atr / price * 100, 2) if price > 0 else 0.0
-
-        return {
-            "ticker": ticker,
-            "raw_rs": rs_raw,
-            "data": {
-                "ticker":       ticker,
-                "name":         profile.get("companyName", ticker)[:25],
-                "sector":       profile.get("sector", "N/A"),
-                "status":       status,
-                "scores": {
-                    "vcp":        vcp["score"],
-                    "ses":        ses["score"],
-                    "ecr_rank":   ecr["sentinel_rank"],
-                    "canslim":    canslim["score"],
-                    "pf":         round(pf, 2),
-                },
-                "ecr_phase":     ecr["phase"],
-                "ecr_strategy":  ecr["strategy"],
-                "canslim_grade": canslim["grade"],
-                "atr_pct":       atr_pct,
-                "pivot_dist_pct": round(dist * 100, 2),
-                "ma50_ratio":    ma50_ratio,
-                "ma200_ratio":   ma200_ratio,
-            }
-        }
-    except Exception as e:
-        print(f"    ❌ {ticker}: {e}")
-        return None
-
-
-def scan_all():
-    """並列スキャン"""
-    print(f"  Starting scan: {len(SCAN_TICKERS)} tickers (Workers={MAX_WORKERS})...")
-    
-    raw_results = []
-    processed = 0
-
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(process_ticker, t): t for t in SCAN_TICKERS}
-        
-        for future in as_completed(futures):
-            processed += 1
-            res = future.result()
-            if res:
-                raw_results.append(res)
-            
-            if processed % 50 == 0:
-                print(f"    {processed}/{len(SCAN_TICKERS)} processed")
-
-    # RS percentile計算
-    print(f"  Calculating RS percentiles...")
-    rs_input = [{"ticker": r["ticker"], "raw_rs": r["raw_rs"]} for r in raw_results]
-    scored_rs = RSAnalyzer.assign_percentiles(rs_input)
-    rs_map = {s["ticker"]: s["rs_rating"] for s in scored_rs}
+def to_strategy_row(r: dict) -> dict:
+    """スナップショット1行 → strategies の1銘柄分（rows.json の1行。数値は必ず出力・Noneを避ける）"""
+    rs = r["rs"]
+    d = {
+        "ticker":       r["ticker"],
+        "name":         r["name"][:25],
+        "sector":       r["sector"],
+        "status":       r["status"],
+        "scores": {
+            "vcp":        r["vcp"],
+            "ses":        r["ses"],
+            "ecr_rank":   r["ecr_rank"],
+            "canslim":    r["canslim"],
+            "pf":         r["pf"],
+            "rs":         rs,
+        },
+        "ecr_phase":     r["ecr_phase"],
+        "ecr_strategy":  r["ecr_strategy"],
+        "canslim_grade": r["canslim_grade"],
+        "atr_pct":       r["atr_pct"] if r["atr_pct"] is not None else 0.0,
+        "pivot_dist_pct": r["pivot_dist_pct"],
+        "ma50_ratio":    r["ma50_ratio"] if r["ma50_ratio"] is not None else 0.0,
+        "ma200_ratio":   r["ma200_ratio"] if r["ma200_ratio"] is not None else 0.0,
+    }
 
-    # 最終データ構築
-    final_results = []
-    for r in raw_results:
-        d = r["data"]
-        rs = rs_map.get(r["ticker"], 0)
-        d["scores"]["rs"] = rs
+    # 総合スコア
+    vcp_rs_norm = min(100, (d["scores"]["vcp"] / 105 * 50) + (rs / 99 * 50))
+    composite = (
+        vcp_rs_norm * 0.35 +
+        d["scores"]["ecr_rank"] * 0.35 +
+        d["scores"]["canslim"] * 0.30
+    )
+    d["scores"]["composite"] = round(composite, 1)
 
-        # 総合スコア
-        vcp_rs_norm = min(100, (d["scores"]["vcp"] / 105 * 50) + (rs / 99 * 50))
-        composite = (
-            vcp_rs_norm * 0.35 +
-            d["scores"]["ecr_rank"] * 0.35 +
-            d["scores"]["canslim"] * 0.30
-        )
-        d["scores"]["composite"] = round(composite, 1)
+    # 手法ヒット数
+    d["method_hits"] = sum([
+        d["scores"]["vcp"] >= 70 and rs >= 80,
+        d["scores"]["ecr_rank"] >= 70,
+        d["scores"]["canslim"] >= 60,
+        d["scores"]["ses"] >= 60,
+    ])
+    return d
 
-        # 手法ヒット数
-        d["method_hits"] = sum([
-            d["scores"]["vcp"] >= 70 and rs >= 80,
-            d["scores"]["ecr_rank"] >= 70,
-            d["scores"]["canslim"] >= 60,
-            d["scores"]["ses"] >= 60,
-        ])
-        
-        final_results.append(d)
 
-    return final_results
+def scan_all(as_of: str):
+    """共通パイプラインのスナップショットを strategies 形式に変換"""
+    return [to_strategy_row(r) for r in run_scan(SCAN_TICKERS, as_of=as_of)]
 
 
 def build_rankings(results):
@@ -204,33 +131,32 @@ def build_method_comparison(results):
     return summary
 
 
-def save_history(results):
-    """30日履歴保存"""
-    HIST.mkdir(parents=True, exist_ok=True)
-    
-    # 簡略化（スコアのみ）
-    simplified = [{
-        "ticker": r["ticker"],
-        "scores": r["scores"],
-        "status": r["status"],
-    } for r in results]
-    
-    hist_file = HIST / f"{TODAY}.json"
-    hist_file.write_text(json.dumps(simplified, ensure_ascii=False, indent=2))
-    
-    # 古い履歴削除（30日より前）
-    all_hist = sorted(HIST.glob("*.json"))
-    if len(all_hist) > 30:
-        for old in all_hist[:-30]:
-            old.unlink()
-    
-    print(f"  💾 History saved: {hist_file.name} ({len(all_hist)} days)")
+def save_history(results, as_of: str):
+    """
+    スコア履歴をストアへ追加し、銘柄別の時系列ファイルを書き出す。
+    日付はスナップショットの as_of（最新の確定営業日）。週末・祝日の再実行で同じ足が
+    別の日付として重複しないよう、その日付が既にあれば追加しない
+    """
+    if not score_history.HISTORY_FILE.exists() and HIST.exists():
+        # 旧形式（日次 JSON）を初回だけ取り込んでから片付ける
+        n = score_history.import_daily_json(HIST)
+        for old in sorted(HIST.glob("*.json")):
+            content_writer.remove(old)
+        print(f"  📦 Imported {n} daily history files into {score_history.HISTORY_FILE.name}")
+
+    if as_of in score_history.available_dates():
+        print(f"  ⏭️  History for {as_of} already stored — skipped")
+        return
+    df    = score_history.append(as_of, results)
+    index = score_history.write_series(SERIES, df)
+    print(f"  💾 History saved: {len(index['dates'])} days × {len(index['tickers'])} tickers → {SERIES.name}/")
 
 
 def main():
-    print(f"===== STRATEGIES FULL SCAN {TODAY} =====")
+    as_of = default_as_of()
+    print(f"===== STRATEGIES FULL SCAN {TODAY} (as of {as_of}) =====")
     
-    results = scan_all()
+    results = scan_all(as_of)
     print(f"✅ Scored: {len(results)}/{len(SCAN_TICKERS)} tickers")
 
     rankings = build_rankings(results)
@@ -248,12 +174,13 @@ def main():
     }
 
     CONTENT.mkdir(parents=True, exist_ok=True)
-    OUT.write_text(json.dumps(output, ensure_ascii=False, indent=2))
+    content_writer.write_strategies(OUT, output)
+    content_writer.remove(LEGACY)
     
     # 履歴保存
-    save_history(results)
+    save_history(results, as_of)
     
-    print(f"✅ strategies.json saved")
+    print(f"✅ strategies/ saved")
     print(f"===== Done =====")
 
 
@@ -1,61 +1,41 @@
 import React, { useState, useEffect } from 'react';
 import { LineChart, Line, XAxis, YAxis, Tooltip, ResponsiveContainer, Legend } from 'recharts';
+import { fetchScoreHistory } from '@shared/useContent';
 
 /**
- * ScoreHistoryChart - 30日間のスコア推移チャート
- * 
- * strategies_history/*.json から該当ティッカーのスコアを抽出
+ * ScoreHistoryChart - スコア推移チャート（直近 days 営業日）
+ *
+ * score_history/{TICKER}.json（engines/score_history.py が書く銘柄別の時系列）を index.json のハッシュ付きで取得
  */
-export default function ScoreHistoryChart({ ticker }) {
+export default function ScoreHistoryChart({ ticker, days = 30 }) {
   const [data, setData] = useState([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    const loadHistory = async () => {
-      try {
-        // strategies_history ディレクトリの全JSONファイルを取得
-        // （実際にはindex.jsonなどで日付リストを管理する方が効率的）
-        const dates = [];
-        const today = new Date();
-        for (let i = 0; i < 30; i++) {
-          const d = new Date(today);
-          d.setDate(d.getDate() - i);
-          dates.push(d.toISOString().slice(0, 10));
-        }
-        dates.reverse();
-
-        const history = [];
-        for (const date of dates) {
-          try {
-            const resp = await fetch(`/content/strategies_history/${date}.json`);
-            if (!resp.ok) continue;
-            const json = await resp.json();
-            
-            // 該当ティッカーを探す
-            const item = json.find(d => d.ticker === ticker);
-            if (item) {
-              history.push({
-                date: date.slice(5), // MM-DD
-                vcp: item.scores.vcp,
-                rs: item.scores.rs,
-                ecr: item.scores.ecr_rank,
-                canslim: item.scores.canslim,
-                ses: item.scores.ses,
-              });
-            }
-          } catch {}
-        }
-
-        setData(history);
-      } catch (e) {
-        console.error('History load error:', e);
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    loadHistory();
-  }, [ticker]);
+    let alive = true;
+    setLoading(true);
+    fetchScoreHistory(ticker)
+      .then(series => {
+        if (!alive) return;
+        // 列形式 {dates, vcp, rs, ...} → チャート用の行
+        const dates = series?.dates ?? [];
+        const from  = Math.max(0, dates.length - days);
+        setData(dates.slice(from).map((date, j) => {
+          const i = from + j;
+          return {
+            date:    date.slice(5), // MM-DD
+            vcp:     series.vcp[i],
+            rs:      series.rs[i],
+            ecr:     series.ecr_rank[i],
+            canslim: series.canslim[i],
+            ses:     series.ses[i],
+          };
+        }));
+      })
+      .catch(e => console.error('History load error:', e))
+      .finally(() => { if (alive) setLoading(false); });
+    return () => { alive = false; };
+  }, [ticker, days]);
 
   if (loading) return (
     <div className="text-center text-muted font-mono text-xs py-8">Loading history...</div>
@@ -67,7 +47,7 @@ export default function ScoreHistoryChart({ ticker }) {
 
   return (
     <div className="space-y-2">
-      <div className="text-muted font-mono text-xs">📈 Score Trend (30 days)</div>
+      <div className="text-muted font-mono text-xs">📈 Score Trend ({data.length} days)</div>
       <ResponsiveContainer width="100%" height={200}>
         <LineChart data={data} margin={{ top: 5, right: 5, left: -20, bottom: 0 }}>
           <XAxis 
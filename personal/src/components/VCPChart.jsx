@@ -1,5 +1,6 @@
 import React from 'react';
 import { LineChart, Line, BarChart, Bar, XAxis, YAxis, Tooltip, ResponsiveContainer, ReferenceLine, Area, ComposedChart } from 'recharts';
+import { toCandleRows } from '../lib/candles';
 
 /**
  * VCPChart - VCPパターン可視化
@@ -10,28 +11,31 @@ import { LineChart, Line, BarChart, Bar, XAxis, YAxis, Tooltip, ResponsiveContai
  * - 出来高（dry-up強調）
  * - Pivot Point
  * - タイトニング範囲
+ *
+ * data: /api/stock の candles（列形式 {date: [...], close: [...]}）または行の配列
  */
-export default function VCPChart({ data, vcp_detail }) {
-  if (!data || data.length === 0) return null;
+export default function VCPChart({ data: candles, vcp_detail }) {
+  const data = toCandleRows(candles);
+  if (data.length === 0) return null;
 
   // 直近90日分
   const recent = data.slice(-90);
   
   // チャートデータ整形
   const chartData = recent.map((d, i) => {
-    const ma20  = i >= 19 ? recent.slice(i - 19, i + 1).reduce((s, x) => s + x.Close, 0) / 20 : null;
-    const ma50  = i >= 49 ? recent.slice(i - 49, i + 1).reduce((s, x) => s + x.Close, 0) / 50 : null;
+    const ma20  = i >= 19 ? recent.slice(i - 19, i + 1).reduce((s, x) => s + x.close, 0) / 20 : null;
+    const ma50  = i >= 49 ? recent.slice(i - 49, i + 1).reduce((s, x) => s + x.close, 0) / 50 : null;
     const ma200 = data.length >= 200 && i >= 199 
-      ? data.slice(data.length - 200 + i - recent.length + 1, data.length + i - recent.length + 2).reduce((s, x) => s + x.Close, 0) / 200 
+      ? data.slice(data.length - 200 + i - recent.length + 1, data.length + i - recent.length + 2).reduce((s, x) => s + x.close, 0) / 200 
       : null;
 
     return {
       date: d.date.slice(5, 10), // MM-DD
-      close: d.Close,
-      high: d.High,
-      low: d.Low,
-      open: d.Open,
-      volume: d.Volume,
+      close: d.close,
+      high: d.high,
+      low: d.low,
+      open: d.open,
+      volume: d.volume,
       ma20,
       ma50,
       ma200,
@@ -39,16 +43,16 @@ export default function VCPChart({ data, vcp_detail }) {
   });
 
   // Pivot（直近20日の最高値）
-  const pivot = Math.max(...recent.slice(-20).map(d => d.High));
+  const pivot = Math.max(...recent.slice(-20).map(d => d.high));
 
   // Volume平均（dry-up判定用）
-  const avgVol = recent.slice(-50, -20).reduce((s, d) => s + d.Volume, 0) / 30;
-  const recentAvgVol = recent.slice(-20).reduce((s, d) => s + d.Volume, 0) / 20;
+  const avgVol = recent.slice(-50, -20).reduce((s, d) => s + d.volume, 0) / 30;
+  const recentAvgVol = recent.slice(-20).reduce((s, d) => s + d.volume, 0) / 20;
   const isDryUp = recentAvgVol < avgVol * 0.6;
 
   // 価格レンジ（直近20日）
-  const recentHigh = Math.max(...recent.slice(-20).map(d => d.High));
-  const recentLow  = Math.min(...recent.slice(-20).map(d => d.Low));
+  const recentHigh = Math.max(...recent.slice(-20).map(d => d.high));
+  const recentLow  = Math.min(...recent.slice(-20).map(d => d.low));
   const rangeSize  = (recentHigh - recentLow) / recentLow * 100;
 
   return (
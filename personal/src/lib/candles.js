@@ -0,0 +1,23 @@
+// ローソク足（shared/engines/candles.py）の列形式・行形式のどちらでも
+// [{ date, open, high, low, close, volume }, ...] の行にそろえる。
+//   列形式: { date: [...], open: [...], high: [...], low: [...], close: [...], volume: [...] }
+//   行形式: [{ date, open, ... }]（旧形式。Open / Close などの大文字キーも受け付ける）
+const FIELDS = ['open', 'high', 'low', 'close', 'volume'];
+const upper  = k => k[0].toUpperCase() + k.slice(1);
+
+export function toCandleRows(candles) {
+  if (!candles) return [];
+  if (Array.isArray(candles)) {
+    return candles.map(c => {
+      const row = { date: c.date };
+      for (const k of FIELDS) row[k] = c[k] ?? c[upper(k)];
+      return row;
+    });
+  }
+  const dates = candles.date ?? [];
+  return dates.map((date, i) => {
+    const row = { date };
+    for (const k of FIELDS) row[k] = candles[k]?.[i];
+    return row;
+  });
+}
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { TrendingUp, Award, BarChart3 } from 'lucide-react';
+import { fetchStrategyIndex, fetchMethodComparison } from '@shared/useContent';
 
 const METHOD_COLORS = {
   'VCP×RS':  '#00FF88',
@@ -87,9 +88,10 @@ export default function MethodComparison() {
   const [data, setData] = useState(null);
 
   useEffect(() => {
-    fetch('/content/strategies.json')
-      .then(r => r.json())
-      .then(setData)
+    // 手法比較ブロックのシャードだけ取得（ランキング・銘柄行は読まない）
+    fetchStrategyIndex()
+      .then(fetchMethodComparison)
+      .then(mc => setData(mc ? { method_comparison: mc } : null))
       .catch(() => {});
   }, []);
 
@@ -5,6 +5,7 @@ import TradingViewWidget from '../components/TradingViewWidget';
 import VCPChart from '../components/VCPChart';
 import ScoreHistoryChart from '../components/ScoreHistoryChart';
 import ScoreRadarChart from '../components/ScoreRadarChart';
+import { fetchStrategyRows } from '@shared/useContent';
 
 const fmt = (n, d=2) => n != null ? `$${Number(n).toFixed(d)}` : '—';
 const pct = (n) => n != null ? `${n > 0 ? '+' : ''}${Number(n).toFixed(2)}%` : '—';
@@ -33,15 +34,12 @@ export default function RealtimePage() {
     }
   };
 
-  // strategies.jsonから現在のスコア取得
+  // strategies の銘柄行（rows.json）から現在のスコア取得
   const fetchData = async () => {
     try {
-      const resp = await fetch('/content/strategies.json');
-      const json = await resp.json();
-      
-      // 全ランキングから該当ティッカーを探す
-      const allRankings = Object.values(json.rankings || {}).flat();
-      const found = allRankings.find(t => t.ticker === ticker);
+      // ランキング・フェーズに出てくる全銘柄の行（重複除去済み）から該当ティッカーを探す
+      const rows  = await fetchStrategyRows();
+      const found = rows.find(t => t.ticker === ticker);
       
       if (found) {
         setData(found);
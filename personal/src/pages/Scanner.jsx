@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { Search, ExternalLink, ChevronDown, ChevronUp, SlidersHorizontal } from 'lucide-react';
+import { fetchStrategyIndex, fetchStrategyShard } from '@shared/useContent';
 
 const fmt = (n, d=2) => n != null ? `$${Number(n).toFixed(d)}` : '—';
 
@@ -164,9 +165,13 @@ export default function Scanner() {
   const [showFilters, setShowFilters] = useState(false);
 
   useEffect(() => {
-    fetch('/content/strategies.json')
-      .then(r => r.json())
-      .then(setData)
+    // index.json（件数）と表示する vcp_rs ランキングのシャードだけ取得
+    fetchStrategyIndex()
+      .then(async index => {
+        if (!index) return;
+        const vcp_rs = await fetchStrategyShard(index.rankings?.vcp_rs);
+        setData({ ...index, rankings: { vcp_rs } });
+      })
       .catch(() => {});
   }, []);
 
@@ -174,8 +179,7 @@ export default function Scanner() {
     <div className="flex items-center justify-center h-64 font-mono text-green animate-pulse">LOADING...</div>
   );
 
-  // strategies.json の rankings.vcp_rs と daily の actions をマージ
-  // strategies.jsonにある全銘柄を表示
+  // strategies の vcp_rs ランキングの全銘柄を表示
   const all = data.rankings?.vcp_rs || [];
 
   // フィルタ・ソート
@@ -193,7 +197,7 @@ export default function Scanner() {
       return 0;
     });
 
-  // strategies.jsonの構造に合わせてデータ変換
+  // strategies の行の構造に合わせてデータ変換
   const toRow = (t) => ({
     ticker:       t.ticker,
     name:         t.name,
@@ -211,7 +215,7 @@ export default function Scanner() {
     atr_pct:      t.atr_pct,
     pivot_dist_pct: t.pivot_dist_pct,
     ma50_ratio:   t.ma50_ratio,
-    _price:       null,  // strategies.jsonには価格なし
+    _price:       null,  // strategies には価格なし
     _entry:       null,
     _stop:        null,
     _target:      null,
@@ -1,8 +1,16 @@
+import { fileURLToPath } from 'node:url';
 import { defineConfig } from 'vite';
 import react from '@vitejs/plugin-react';
 
+// frontend / personal 共通の JS（shared/web）。react はこのアプリの node_modules から解決する
+const sharedWeb = fileURLToPath(new URL('../shared/web', import.meta.url));
+
 export default defineConfig({
   plugins: [react()],
-  server: { port: 4000 },
+  resolve: {
+    alias:  { '@shared': sharedWeb },
+    dedupe: ['react', 'react-dom'],
+  },
+  server: { port: 4000, fs: { allow: ['.', sharedWeb] } },
   build: { outDir: 'dist' },
 });
@@ -3,9 +3,9 @@
 scripts/generate_articles.py — 毎日実行
 ====================================
 VCP×RSスキャン + AI記事生成
-修正点: JSON化できないDataFrameオブジェクトを保存データから除外
+スキャン本体は shared/pipeline（generate_strategies と共通の1日1回スキャン）
 """
-import sys, json, os, time
+import sys, json
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 
@@ -13,12 +13,9 @@ from datetime import datetime, timezone, timedelta
 sys.path.append(str(Path(__file__).parent.parent / "shared"))
 
 # エンジン群のインポート
-from engines import core_fmp
-from engines.analysis import VCPAnalyzer, RSAnalyzer, StrategyValidator
-from engines.sentinel_efficiency import SentinelEfficiencyAnalyzer
-from engines.ecr_strategy import ECRStrategyEngine
-from engines.canslim import CANSLIMAnalyzer
+from engines import core_fmp, market_calendar, content_writer, llm
 from engines.config import CONFIG, TICKERS
+from pipeline import run_scan
 
 # タイムゾーン設定 (JST)
 JST      = timezone(timedelta(hours=9))
@@ -29,186 +26,85 @@ CONTENT  = Path(__file__).parent.parent / "frontend" / "public" / "content"
 OUT_DIR  = CONTENT
 CONTENT.mkdir(parents=True, exist_ok=True)
 
-# AI設定
-OPENAI_API_KEY  = os.environ.get("OPENAI_API_KEY", "")
-OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
-OPENAI_MODEL    = os.environ.get("OPENAI_MODEL", "gpt-4")
+# AI設定（接続先は OPENAI_* 環境変数。呼び出し・キャッシュ・記録は engines.llm）
+AI_MAX_TOKENS = 1500
 
 
 def get_latest_trading_date() -> str:
     """
-    FMPから取得できる最新の取引日を特定する。
-    休場日（祝日・週末）に実行された場合、直近の営業日を返す。
+    EOD データが揃っている最新の取引日（NYSE カレンダーで判定、ネットワーク不要）。
+    休場日（祝日・週末）や引け前に実行された場合は直近の営業日を返す。
     """
-    print("\n=== Detecting latest trading date ===")
-
-    # SPYのデータを使って市場が開いていた最新日を確認（最大5回リトライ）
-    for attempt in range(5):
-        df = core_fmp.get_historical_data("SPY", days=10)
-        if df is not None and len(df) > 0:
-            latest = df.index[-1].strftime("%Y-%m-%d")
-            print(f"✅ FMP latest data: {latest}")
-            print(f"   (Executed on: {TODAY})")
-
-            if latest != TODAY:
-                print(f"⚠️  Market closed on {TODAY}, using {latest} data")
-
-            return latest
-
-        if attempt < 4:
-            print(f"   Retry {attempt+1}/5...")
-            time.sleep(5)
-
-    # 万が一SPYが取れない場合のフォールバック（日付計算）
-    print("❌ Cannot fetch SPY data after 5 retries")
-    dt = datetime.now(JST)
-    if dt.weekday() == 5:  # 土曜なら金曜
-        fallback = (dt - timedelta(days=1)).strftime("%Y-%m-%d")
-    elif dt.weekday() == 6:  # 日曜なら金曜
-        fallback = (dt - timedelta(days=2)).strftime("%Y-%m-%d")
-    else:
-        fallback = TODAY
-
-    print(f"   Using fallback: {fallback}")
-    return fallback
+    latest = market_calendar.latest_completed_session().isoformat()
+    print(f"\n=== Latest trading date: {latest} (executed on: {TODAY}) ===")
+    if latest != TODAY:
+        print(f"⚠️  Market closed or not yet settled on {TODAY}, using {latest} data")
+    return latest
 
 
 def scan_all_tickers(report_date: str):
     print(f"\n=== Scanning {len(TICKERS)} tickers ===")
     print(f"Report date: {report_date}")
 
-    # 接続テスト (最初の3銘柄)
-    print("\n--- Pre-scan test (first 3 tickers) ---")
-    for i, ticker in enumerate(TICKERS[:3]):
-        df = core_fmp.get_historical_data(ticker, days=10)
-        if df is not None and len(df) > 0:
-            latest = df.index[-1].strftime("%Y-%m-%d")
-            price  = float(df["Close"].iloc[-1])
-            print(f"  [{i+1}] {ticker:6s}: ✅ {len(df):2d} days, latest={latest}, price=${price:.2f}")
-        else:
-            print(f"  [{i+1}] {ticker:6s}: ❌ Data fetch failed")
-
-    # 本番スキャン
+    # 本番スキャン（共通パイプライン: generate_strategies と同じスナップショットを共有）
     print("\n--- Full scan starting ---")
-    raw_list = []
-    failed_count = 0
-
-    for i, ticker in enumerate(TICKERS):
-        # 過去700日分取得（200日移動平均線などのために十分な期間）
-        df = core_fmp.get_historical_data(ticker, days=700)
-        
-        # データ不足（上場直後など）はスキップ
-        if df is None or len(df) < 200:
-            failed_count += 1
-            continue
-
-        # RSスコア計算
-        rs_raw = RSAnalyzer.get_raw_score(df)
-        if rs_raw != -999.0:
-            raw_list.append({"ticker": ticker, "df": df, "raw_rs": rs_raw})
-
-        if (i + 1) % 50 == 0:
-            print(f"  Progress: {i+1}/{len(TICKERS)} ({len(raw_list)} valid, {failed_count} failed)")
-
-    print(f"\n--- RS assignment ---")
-    print(f"  Total scanned: {len(raw_list)}")
-    print(f"  Failed:        {failed_count}")
+    snapshot = run_scan(as_of=report_date)
 
-    if not raw_list:
+    if not snapshot:
         print("❌ No valid tickers found")
         return {"qualified":[], "actions":[], "waits":[], "all_scored":[]}
 
-    # RSスコアの正規化（1-99）
-    scored = RSAnalyzer.assign_percentiles(raw_list)
-    print(f"  RS assigned:   {len(scored)}")
-
-    print("\n--- Multi-strategy scoring ---")
+    print(f"\n--- Multi-strategy scoring ---")
     qualified, all_scored = [], []
 
-    for i, item in enumerate(scored):
-        # 各種戦略エンジンの実行
-        vcp     = VCPAnalyzer.calculate(item["df"])
-        pf      = StrategyValidator.run(item["df"])
-        ses     = SentinelEfficiencyAnalyzer.calculate(item["df"])
-        ecr     = ECRStrategyEngine.analyze_single(item["ticker"], item["df"])
-        canslim = CANSLIMAnalyzer.calculate(item["ticker"], item["df"])
-
-        # 各種数値の計算
-        price = float(item["df"]["Close"].iloc[-1])
-        pivot = float(item["df"]["High"].iloc[-20:].max()) # 簡易ピボット
-        entry = round(pivot * 1.002, 2)
-        
-        # ATRベースの損切りライン
-        stop  = round(entry - vcp["atr"] * CONFIG["STOP_LOSS_ATR"], 2)
-        target= round(entry + (entry - stop) * CONFIG["TARGET_R_MULTIPLE"], 2)
-        
-        # ピボットからの距離
-        dist  = (price - pivot) / pivot
-        status= "ACTION" if -0.05<=dist<=0.03 else ("WAIT" if dist<-0.05 else "EXTENDED")
-
-        # 表示用データ
-        atr_pct       = round(vcp["atr"] / price * 100, 2) if price else None
-        pivot_dist_pct= round(dist * 100, 2)
-        stop_atr_mult = round(CONFIG["STOP_LOSS_ATR"], 2)
-        target_r      = round(CONFIG["TARGET_R_MULTIPLE"], 1)
-
-        close = item["df"]["Close"]
-        ma50_ratio  = round(price / float(close.rolling(50).mean().iloc[-1]) * 100 - 100, 1) \
-                      if len(close) >= 50 else None
-        ma200_ratio = round(price / float(close.rolling(200).mean().iloc[-1]) * 100 - 100, 1) \
-                      if len(close) >= 200 else None
-
-        profile = core_fmp.get_company_profile(item["ticker"]) or {}
-
-        # 【修正】JSON化できない "df" (DataFrame) を除外しました
+    for r in snapshot:
+        # RS が計算できなかった銘柄（raw_rs = -999）は従来どおりランキング・記事の対象外
+        if r["raw_rs"] == -999.0:
+            continue
         row = {
-            "ticker":  item["ticker"],
-            "status":  status,
-            "rs":      item["rs_rating"],
-            "vcp":     vcp["score"],
-            "pf":      round(pf, 2),
-            "sector":  profile.get("sector",  "N/A"),
-            "industry":profile.get("industry","N/A"),
-            "name":    profile.get("companyName", item["ticker"]),
-            "vcp_detail": vcp,
-            # "df": item["df"],  <-- ここにあったDataFrameを削除
-            "atr_pct":        atr_pct,
-            "pivot_dist_pct": pivot_dist_pct,
-            "stop_atr_mult":  stop_atr_mult,
-            "target_r":       target_r,
-            "ma50_ratio":     ma50_ratio,
-            "ma200_ratio":    ma200_ratio,
-            "ses":            ses["score"],
-            "ses_breakdown":  ses.get("breakdown", {}),
-            "ecr_rank":       ecr["sentinel_rank"],
-            "ecr_phase":      ecr["phase"],
-            "ecr_strategy":   ecr["strategy"],
-            "canslim_score":  canslim["score"],
-            "canslim_grade":  canslim["grade"],
-            "canslim_breakdown": canslim.get("breakdown", {}),
+            "ticker":  r["ticker"],
+            "status":  r["status"],
+            "rs":      r["rs"],
+            "vcp":     r["vcp"],
+            "pf":      r["pf"],
+            "sector":  r["sector"],
+            "industry":r["industry"],
+            "name":    r["name"],
+            "vcp_detail": r["vcp_detail"],
+            "atr_pct":        r["atr_pct"],
+            "pivot_dist_pct": r["pivot_dist_pct"],
+            "stop_atr_mult":  round(CONFIG["STOP_LOSS_ATR"], 2),
+            "target_r":       round(CONFIG["TARGET_R_MULTIPLE"], 1),
+            "ma50_ratio":     r["ma50_ratio"],
+            "ma200_ratio":    r["ma200_ratio"],
+            "ses":            r["ses"],
+            "ses_breakdown":  r["ses_breakdown"],
+            "ecr_rank":       r["ecr_rank"],
+            "ecr_phase":      r["ecr_phase"],
+            "ecr_strategy":   r["ecr_strategy"],
+            "canslim_score":  r["canslim"],
+            "canslim_grade":  r["canslim_grade"],
+            "canslim_breakdown": r["canslim_breakdown"],
             # 総合スコア
             "composite": round(
-                (vcp["score"] / 105 * 100) * 0.35 +
-                ecr["sentinel_rank"]        * 0.35 +
-                canslim["score"]            * 0.30,
+                (r["vcp"] / 105 * 100) * 0.35 +
+                r["ecr_rank"]          * 0.35 +
+                r["canslim"]           * 0.30,
                 1
             ),
-            "_price":  price,
-            "_entry":  entry,
-            "_stop":   stop,
-            "_target": target,
+            "_price":  r["price"],
+            "_entry":  r["entry"],
+            "_stop":   r["stop"],
+            "_target": r["target"],
         }
 
         all_scored.append(row)
 
         # フィルタリング（最低基準を満たすか）
-        if (item["rs_rating"]>=CONFIG["MIN_RS_RATING"] and
-                vcp["score"]>=CONFIG["MIN_VCP_SCORE"] and pf>=CONFIG["MIN_PROFIT_FACTOR"]):
+        if (r["rs"]>=CONFIG["MIN_RS_RATING"] and
+                r["vcp"]>=CONFIG["MIN_VCP_SCORE"] and r["pf"]>=CONFIG["MIN_PROFIT_FACTOR"]):
             qualified.append(row)
 
-        if (i + 1) % 100 == 0:
-            print(f"  Scored: {i+1}/{len(scored)}")
-
     # ソート順: ACTION優先、次いで VCP+RS の合計スコア
     qualified.sort(key=lambda x:(x["status"]=="ACTION", x["vcp"]+x["rs"]), reverse=True)
     all_scored.sort(key=lambda x: x["vcp"]+x["rs"]*0.5, reverse=True)
@@ -278,10 +174,9 @@ def build_sector_summary(all_scored: list) -> list:
     } for s, v in sec.items()], key=lambda x: x["avg_vcp"], reverse=True)
 
 
-def generate_daily_ai_report(actions: list, index: dict, sector: list, 
-                              ranking: list, report_date: str, lang: str = "ja"):
-    """AIによる市況コメント生成"""
-    import requests
+def daily_report_prompt(actions: list, index: dict, sector: list,
+                        ranking: list, report_date: str, lang: str = "ja") -> dict:
+    """AI市況コメントの llm.complete() 引数（system / prompt / max_tokens）"""
     idx_str  = ", ".join([f"{v['name']} {v.get('ret_1d','?')}%" for v in index.values()])
     sec_str  = ", ".join([f"{s['sector']}" for s in sector[:3]])
     act_str  = ", ".join([a["ticker"] for a in actions[:5]])
@@ -312,20 +207,16 @@ def generate_daily_ai_report(actions: list, index: dict, sector: list,
         f"Write a 300-400 word report with:\n"
         f"## ① Index\n## ② Signals\n## ③ Sectors"
     )
+    return {"system": system, "prompt": prompt, "max_tokens": AI_MAX_TOKENS}
 
-    try:
-        resp = requests.post(
-            f"{OPENAI_BASE_URL}/chat/completions",
-            headers={"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"},
-            json={"model": OPENAI_MODEL, "max_tokens": 1500,
-                  "messages": [{"role": "system", "content": system},
-                               {"role": "user",   "content": prompt}]},
-            timeout=60
-        )
-        return resp.json()["choices"][0]["message"]["content"].strip()
-    except Exception as e:
-        print(f"AI error: {e}")
-        return "（レポート生成失敗）" if lang == "ja" else "(Report generation failed)"
+
+def generate_daily_ai_reports(actions: list, index: dict, sector: list,
+                              ranking: list, report_date: str, langs=("ja", "en")) -> dict:
+    """AIによる市況コメント生成（言語ごとの呼び出しを並列に実行）。{lang: 本文}"""
+    jobs  = {lang: daily_report_prompt(actions, index, sector, ranking, report_date, lang) for lang in langs}
+    texts = llm.complete_many({f"daily/{lang}": kw for lang, kw in jobs.items()})
+    return {lang: texts[f"daily/{lang}"] or ("（レポート生成失敗）" if lang == "ja" else "(Report generation failed)")
+            for lang in langs}
 
 
 def main():
@@ -347,8 +238,9 @@ def main():
     idx_ret = list(index.values())[0].get("ret_1d", "?") if index else "?"
 
     # 3. AIコメント生成
-    daily_ja = generate_daily_ai_report(result["actions"], index, sector, ranking, REPORT_DATE, "ja")
-    daily_en = generate_daily_ai_report(result["actions"], index, sector, ranking, REPORT_DATE, "en")
+    reports  = generate_daily_ai_reports(result["actions"], index, sector, ranking, REPORT_DATE)
+    daily_ja, daily_en = reports["ja"], reports["en"]
+    llm.report()
 
     # 4. JSON構築
     daily_article = {
@@ -377,9 +269,7 @@ def main():
     }
 
     # 5. ファイル保存
-    (OUT_DIR / f"daily-{REPORT_DATE}.json").write_text(
-        json.dumps(daily_article, ensure_ascii=False, indent=2)
-    )
+    content_writer.write_json(OUT_DIR / f"daily-{REPORT_DATE}.json", daily_article)
     print("✅ Daily report saved")
 
     # 6. index.json 更新（破損対策済み）
@@ -409,7 +299,7 @@ def main():
 
     # 過去100件まで保持
     idx["articles"] = idx["articles"][:100]
-    index_file.write_text(json.dumps(idx, ensure_ascii=False, indent=2))
+    content_writer.write_json(index_file, idx)
     print(f"index.json: {len(idx['articles'])} entries")
 
     print(f"\n{'='*60}")
@@ -4,8 +4,14 @@ scripts/generate_backtest.py — 完全な売買シミュレーション（並
 ======================================================
 4手法（VCP/CANSLIM/SES/ECR）ごとの勝率比較 +
 100万円スタート複利シミュレーションを並列実行で高速化。
+
+銘柄ごとの結果は data/backtest/checkpoints.jsonl に追記され、再実行時は完了済み銘柄を
+スキップする（データの指紋の照合はワーカー内で行い、変わっていた銘柄だけ再計算する）。
+--shard K/N で複数ジョブに分割し、--merge-only で結果を統合できる。
 """
-import sys, json, os, time
+from __future__ import annotations
+
+import sys, os, time, argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -14,12 +20,15 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.append(str(Path(__file__).parent.parent / "shared"))
 
-from engines import core_fmp
+from engines import core_fmp, market_calendar
 from engines.analysis import VCPAnalyzer, RSAnalyzer, StrategyValidator
 from engines.sentinel_efficiency import SentinelEfficiencyAnalyzer
 from engines.ecr_strategy import ECRStrategyEngine
 from engines.canslim import CANSLIMAnalyzer
-from engines.config import CONFIG, TICKERS
+from engines.config import CONFIG, TICKERS, DATA_DIR
+from engines import ledger, content_writer
+from engines.universe import registry as universe_registry
+from engines.checkpoint import CheckpointLog, run_key, data_fingerprint, is_current
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 設定
@@ -32,10 +41,13 @@ TARGET_R       = CONFIG["TARGET_R_MULTIPLE"]
 INITIAL_CAPITAL = 1_000_000  # 100万円
 POSITION_SIZE   = 0.10       # 残高の10%を毎回投入
 MAX_WORKERS    = 5          # API負荷を考慮した同時並列数
+SAMPLE_TRADES  = 200        # backtest.json に載せるサンプル件数（全件は ledger に保存）
+CHECKPOINT_FILE = DATA_DIR / "backtest" / "checkpoints.jsonl"
 
 # 手法ごとのエントリー条件
+# ※ `&` で結合しているのは、dict（1トレード）と DataFrame（台帳の列）の両方で評価できるようにするため
 METHOD_FILTERS = {
-    "vcp": lambda scores: scores["vcp"] >= 60 and scores["rs_pct"] >= 60,
+    "vcp": lambda scores: (scores["vcp"] >= 60) & (scores["rs_pct"] >= 60),
     "canslim": lambda scores: scores["canslim"] >= 40,
     "ses": lambda scores: scores["ses"] >= 40,
     "ecr": lambda scores: scores["ecr_rank"] >= 55,
@@ -71,12 +83,19 @@ def score_ticker_at(ticker: str, past_df: pd.DataFrame) -> dict:
     except:
         return None
 
-def run_simulation_for_ticker(ticker: str):
-    """1銘柄のバックテスト実行ユニット"""
+def run_simulation_for_ticker(ticker: str, df: pd.DataFrame | None = None):
+    """
+    1銘柄のバックテスト実行ユニット（df 省略時は取得する）
+    Returns: (trades, data_fingerprint)
+      fingerprint が None の場合はデータ取得失敗（再実行対象・チェックポイントしない）
+    """
     try:
-        df = core_fmp.get_historical_data(ticker, days=LOOKBACK_DAYS)
-        if df is None or len(df) < START_DELAY + 20:
-            return []
+        if df is None:
+            df = core_fmp.get_historical_data(ticker, days=LOOKBACK_DAYS)
+        if df is None:
+            return [], None
+        if len(df) < START_DELAY + 20:
+            return [], data_fingerprint(df)
 
         trades = []
         position = None
@@ -141,10 +160,10 @@ def run_simulation_for_ticker(ticker: str):
                 "date": date_str,
                 "scores": scores,
             }
-        return trades
+        return trades, data_fingerprint(df)
     except Exception as e:
         print(f"  ❌ Error processing {ticker}: {e}")
-        return []
+        return [], None
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 集計・シミュレーション
@@ -193,22 +212,93 @@ def compound_simulation(trades: list, method_filter=None) -> dict:
 # メイン
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+def parse_args():
+    ap = argparse.ArgumentParser(description="SENTINEL 並列バックテスト（チェックポイント再開対応）")
+    ap.add_argument("--checkpoint", action="append", default=None,
+                    help="チェックポイントファイル。複数指定可（先頭に追記、全ファイルを読み込み）")
+    ap.add_argument("--as-of", default=market_calendar.latest_completed_session().isoformat(),
+                    help="データ基準日。チェックポイントのキーに含まれる（既定: EOD の揃った最新の営業日。"
+                         "日付をまたいで再開しても同じキーになる）")
+    ap.add_argument("--shard", default=None,
+                    help="K/N 形式。銘柄をN分割したK番目（0始まり）のみ処理し、集計は行わない")
+    ap.add_argument("--fresh", action="store_true",
+                    help="既存チェックポイントを無視して全銘柄を再計算")
+    ap.add_argument("--merge-only", action="store_true",
+                    help="計算せず、チェックポイントの結果だけを集計・保存（指紋の照合もしない）")
+    return ap.parse_args()
+
+
+def run_or_reuse(ticker: str, checkpointed: dict | None):
+    """
+    ワーカー内の1銘柄: 履歴を1回だけ取得し、チェックポイント行の指紋が今のデータと一致すれば
+    その結果を再利用、そうでなければ同じデータで再計算する。
+    Returns: (trades, data_fingerprint, reused)
+    """
+    if checkpointed is None:
+        return (*run_simulation_for_ticker(ticker), False)
+    try:
+        df = core_fmp.get_historical_data(ticker, days=LOOKBACK_DAYS)
+    except Exception:
+        df = None
+    if is_current(checkpointed, data_fingerprint(df) if df is not None else None):
+        return checkpointed.get("result") or [], checkpointed.get("data"), True
+    return (*run_simulation_for_ticker(ticker, df), False)
+
+
+def select_shard(tickers: list, shard: str | None) -> list:
+    if not shard:
+        return tickers
+    k, n = (int(x) for x in shard.split("/"))
+    return tickers[k::n]
+
+
 def main():
+    args = parse_args()
     start_time = time.time()
     print(f"===== PARALLEL BACKTEST START ({datetime.now().strftime('%Y-%m-%d')}) =====")
-    print(f"Tickers: {len(TICKERS)} / Workers: {MAX_WORKERS} / Stop: {STOP_ATR_MULT}xATR")
 
-    all_trades = []
+    # チェックポイント: パラメータ + 基準日が一致する行を読み、データの指紋はワーカー内で今と照合する
+    ckpt_paths = args.checkpoint or [CHECKPOINT_FILE]
+    key = run_key({
+        "lookback": LOOKBACK_DAYS, "start_delay": START_DELAY,
+        "stop_atr": STOP_ATR_MULT, "target_r": TARGET_R, "as_of": args.as_of,
+    })
+    log  = CheckpointLog(ckpt_paths[0], key)
+    done = {} if args.fresh else log.completed(ckpt_paths[1:])
+
+    targets = [] if args.merge_only else universe_registry().active(select_shard(TICKERS, args.shard))
+    print(f"Tickers: {len(TICKERS)} / Checkpointed: {len(done)} / To run or verify: {len(targets)} / "
+          f"Workers: {MAX_WORKERS} / Stop: {STOP_ATR_MULT}xATR / key={key}")
+
+    records = dict(done)
     processed = 0
+    reused = 0
+    new_trades = 0
 
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_ticker = {executor.submit(run_simulation_for_ticker, t): t for t in TICKERS}
+        future_to_ticker = {executor.submit(run_or_reuse, t, done.get(t)): t for t in targets}
         for future in as_completed(future_to_ticker):
             processed += 1
-            all_trades.extend(future.result())
+            ticker = future_to_ticker[future]
+            trades, fp, was_reused = future.result()
+            if was_reused:
+                reused += 1
+            elif fp is not None:
+                log.append(ticker, trades, data=fp)  # 取得失敗は記録せず次回再実行
+                records[ticker] = {"result": trades}
+                new_trades += len(trades)
+            else:
+                records.pop(ticker, None)            # データが変わったのに再計算できなかった古い結果は使わない
             if processed % 20 == 0:
                 elapsed = time.time() - start_time
-                print(f"  [{processed:>3}/{len(TICKERS)}] {elapsed:.0f}s elapsed / {len(all_trades)} trades")
+                print(f"  [{processed:>3}/{len(targets)}] {elapsed:.0f}s elapsed / {reused} reused / {new_trades} new trades")
+
+    if args.shard:
+        print(f"✅ Shard {args.shard} done: {processed} tickers ({reused} reused) → {log.path}")
+        return
+
+    # チェックポイント済み（他ジョブ分を含む）+ 今回分を集計
+    all_trades = [t for r in records.values() for t in (r.get("result") or [])]
 
     print("-" * 60)
     if not all_trades:
@@ -227,14 +317,24 @@ def main():
         method_results[name] = sim
         print(f"  {name.upper():8s}: ¥{sim['final_capital']:>12,.0f} ({sim['total_return']:>+7.1f}%) CAGR: {sim['cagr']:>+6.1f}% DD: -{sim['max_drawdown']}%")
 
-    # 保存
+    # 全トレードは台帳（Parquet）へ、backtest.json には集計とサンプルのみ
+    ledger_rows = ledger.write_ledger(all_trades)
+    print(f"\n🗂  Ledger saved: {ledger.LEDGER_FILE} ({ledger_rows} trades)")
+
+    method_stats = ledger.summarize_by_method(METHOD_FILTERS)
+    by_month     = ledger.summarize_records(ledger.query_ledger(), by="entry_month")
+
     out_file = Path(__file__).parent.parent / "frontend" / "public" / "content" / "backtest.json"
-    out_file.write_text(json.dumps({
+    content_writer.write_json(out_file, {
         "generated_at": datetime.now().strftime("%Y-%m-%d"),
         "overall": stats,
         "methods": method_results,
-        "trades": all_trades[:200] # 容量削減のため一部のみ保存
-    }, indent=2, ensure_ascii=False), encoding="utf-8")
+        "method_stats": method_stats,
+        "monthly": by_month,
+        "ledger": {"file": str(ledger.LEDGER_FILE.relative_to(DATA_DIR.parent)),
+                   "total_trades": ledger_rows},
+        "trades": sorted(all_trades, key=lambda t: t["entry_date"], reverse=True)[:SAMPLE_TRADES],
+    })
 
     print(f"\n✅ Done. Total Time: {(time.time() - start_time)/60:.1f} min")
 
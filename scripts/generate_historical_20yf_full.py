@@ -1,13 +1,25 @@
 #!/usr/bin/env python3
 """
-generate_historical_20yf_full.py — FMP完全排除・yfinanceのみ・高速版
-固定20銘柄で直近3ヶ月分の過去データを生成（計算ロジックは本番と同じ）
+generate_historical_20yf_full.py — FMP完全排除・yfinance のみ・1パス版
+固定20銘柄で直近数ヶ月分の過去スコア履歴を生成（計算ロジックは本番と同じ）
+
+高速化のポイント:
+  - 銘柄ごとに全営業日のスコア系列を1回で計算し、日付ごとのスナップショットへ転置
+    （旧版は「日付 × 銘柄」ごとに boolean mask でスライス + copy していた）
+  - エンジンへは直近 HISTORY_WINDOW 本の iloc ビューのみ渡す（結果は全期間渡しと同一）
+  - RS 生スコア・ピボット（50日高値）は銘柄ごとに全期間のローリング系列として1回だけ計算し、
+    日付ごとには当日の値を読むだけ（RSAnalyzer.get_raw_score / 直近50本の High.max() と同値）
+  - CANSLIM の income-statement は1銘柄につき1回だけ取得
+  - 休場日（データに存在しない日付）はスキップ
+  - 出力は全履歴1ファイル（Parquet）+ 任意で日次 JSON
 """
-import sys, json, time
+from __future__ import annotations
+
+import sys, time, argparse
 from pathlib import Path
-from datetime import datetime, timedelta
 
 import yfinance as yf
+import numpy as np
 import pandas as pd
 
 sys.path.append(str(Path(__file__).parent.parent / "shared"))
@@ -16,6 +28,8 @@ from engines.analysis import VCPAnalyzer, RSAnalyzer
 from engines.canslim import CANSLIMAnalyzer
 from engines.ecr_strategy import ECRStrategyEngine
 from engines.sentinel_efficiency import SentinelEfficiencyAnalyzer
+from engines.config import DATA_DIR
+from engines import market_calendar, content_writer
 
 # ====================== 固定20銘柄 ======================
 FIXED_TICKERS = [
@@ -23,91 +37,176 @@ FIXED_TICKERS = [
     "GEV", "QQQ", "CRWD", "PNC", "SLV", "VCIT", "JPM", "BP", "APH", "MO"
 ]
 
-OUTPUT_DIR = Path(__file__).parent.parent / "frontend" / "public" / "content" / "strategies_history"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+OUTPUT_DIR   = Path(__file__).parent.parent / "frontend" / "public" / "content" / "strategies_history"
+HISTORY_FILE = DATA_DIR / "strategies_history.parquet"
+
+SLEEP_SECONDS  = 1.5   # 取得時は少し丁寧に
+MIN_BARS       = 130   # これ未満の日付はスコアを出さない
+HISTORY_WINDOW = 300   # エンジンが参照する最大本数（RS 252日 + ECR の5日前RS + 余裕）
+PREFETCH_DAYS  = 460   # 開始日より前に確保する暦日数（HISTORY_WINDOW 営業日分）
 
-SLEEP_SECONDS = 4.0   # 取得時は少し丁寧に
 
-def prefetch_all_data():
-    """全20銘柄のデータを最初に1回だけ取得（高速化の核心）"""
-    print(f"📥 {len(FIXED_TICKERS)}銘柄の全期間データを一括取得中...")
+def prefetch_all_data(tickers: list, start: str, end: str) -> dict:
+    """全銘柄のデータを最初に1回だけ取得（高速化の核心）"""
+    print(f"📥 {len(tickers)}銘柄の全期間データを一括取得中...")
     data_map = {}
-    fetch_start = "2025-08-01"   # 3ヶ月＋バッファ
+    fetch_start = (pd.Timestamp(start) - pd.Timedelta(days=PREFETCH_DAYS)).strftime("%Y-%m-%d")
+    fetch_end   = (pd.Timestamp(end) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
 
-    for ticker in FIXED_TICKERS:
+    for ticker in tickers:
         try:
-            df = yf.download(ticker, start=fetch_start, end="2026-02-19", 
+            df = yf.download(ticker, start=fetch_start, end=fetch_end,
                              progress=False, threads=False)
             if not df.empty:
-                data_map[ticker] = df
+                # 新しい yfinance は (Price, Ticker) の MultiIndex 列を返す
+                if isinstance(df.columns, pd.MultiIndex):
+                    df.columns = df.columns.get_level_values(0)
+                data_map[ticker] = df.sort_index()
                 print(f"  ✅ {ticker} 取得完了 ({len(df)}日分)")
-            time.sleep(1.5)
+            time.sleep(SLEEP_SECONDS)
         except Exception as e:
             print(f"  ❌ {ticker} 取得失敗: {e}")
     return data_map
 
-def run_backtest():
-    all_data = prefetch_all_data()
-
-    current = datetime(2025, 11, 1)
-    end = datetime(2026, 2, 18)
-
-    print("\n🚀 Walk-forward生成開始...\n")
-
-    while current <= end:
-        target_str = current.strftime("%Y-%m-%d")
-        results = []
-
-        for ticker in FIXED_TICKERS:
-            if ticker not in all_data:
-                continue
-            full_df = all_data[ticker]
-            # 先読み防止：target_date 以前のデータのみ使用
-            df_sliced = full_df[full_df.index <= target_str].copy()
-
-            if len(df_sliced) < 130:
-                continue
-
-            try:
-                vcp = VCPAnalyzer.calculate(df_sliced)
-                rs_raw = RSAnalyzer.get_raw_score(df_sliced)
-                rs_pct = min(99, max(0, int((rs_raw + 0.3) * 100))) if rs_raw != -999.0 else 0
-
-                canslim = CANSLIMAnalyzer.calculate(ticker, df_sliced)
-                ecr = ECRStrategyEngine.analyze_single(ticker, df_sliced)
-                ses = SentinelEfficiencyAnalyzer.calculate(df_sliced)
-
-                price = float(df_sliced["Close"].iloc[-1])
-                pivot = float(df_sliced["High"].iloc[-50:].max())
-                dist_pct = round((price - pivot) / pivot * 100, 2)
-
-                results.append({
-                    "ticker": ticker,
-                    "scores": {
-                        "vcp": vcp["score"],
-                        "rs": rs_pct,
-                        "canslim": canslim["score"],
-                        "ecr_rank": ecr["sentinel_rank"],
-                        "ses": ses["score"],
-                        "composite": round(vcp["score"]*0.35 + rs_pct*0.35 + canslim["score"]*0.3, 1)
-                    },
-                    "status": "ACTION" if dist_pct <= 5 and vcp["score"] >= 55 else "WAIT",
-                    "vcp_details": vcp,
-                    "ses_details": ses,
-                    "ecr_phase": ecr["phase"]
-                })
-            except:
-                pass
-
-        if results:
-            file_path = OUTPUT_DIR / f"{target_str}.json"
-            file_path.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
-            print(f"✅ {target_str}: {len(results)}銘柄保存")
-
-        current += timedelta(days=1)
+
+def rolling_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    日付ごとの RS 生スコアとピボットを全期間で1回だけ計算する（行 = df の各足）。
+    rs_raw は RSAnalyzer.get_raw_score と同じ式（本数が足りない期間は先頭の終値と比べる。21本未満は -999.0）、
+    pivot は直近50本の高値の最大値
+    """
+    c   = df["Close"]
+    pos = np.arange(len(c))
+    def r(n):
+        back = c.shift(n - 1).where(pos >= n - 1, c.iloc[0]) if len(c) else c
+        return c / back - 1
+    rs_raw = (r(252) * 0.4) + (r(126) * 0.2) + (r(63) * 0.2) + (r(21) * 0.2)
+    return pd.DataFrame({
+        "rs_raw": rs_raw.where(pos >= 20, -999.0),
+        "pivot":  df["High"].rolling(50, min_periods=1).max(),
+    }, index=df.index)
+
+
+def score_at(ticker: str, df: pd.DataFrame, stmts: list, ind: pd.Series | None = None) -> dict | None:
+    """1時点のスコア（df は当日までの直近ウィンドウ、ind は rolling_indicators() の当日の行）"""
+    try:
+        vcp = VCPAnalyzer.calculate(df)
+        rs_raw = float(ind["rs_raw"]) if ind is not None else RSAnalyzer.get_raw_score(df)
+        rs_pct = min(99, max(0, int((rs_raw + 0.3) * 100))) if rs_raw != -999.0 else 0
+
+        canslim = CANSLIMAnalyzer.calculate(ticker, df, stmts=stmts)
+        ecr = ECRStrategyEngine.analyze_single(ticker, df)
+        ses = SentinelEfficiencyAnalyzer.calculate(df)
+
+        price = float(df["Close"].iloc[-1])
+        pivot = float(ind["pivot"]) if ind is not None else float(df["High"].iloc[-50:].max())
+        dist_pct = round((price - pivot) / pivot * 100, 2)
+
+        return {
+            "ticker": ticker,
+            "scores": {
+                "vcp": vcp["score"],
+                "rs": rs_pct,
+                "canslim": canslim["score"],
+                "ecr_rank": ecr["sentinel_rank"],
+                "ses": ses["score"],
+                "composite": round(vcp["score"]*0.35 + rs_pct*0.35 + canslim["score"]*0.3, 1)
+            },
+            "status": "ACTION" if dist_pct <= 5 and vcp["score"] >= 55 else "WAIT",
+            "vcp_details": vcp,
+            "ses_details": ses,
+            "ecr_phase": ecr["phase"]
+        }
+    except Exception:
+        return None
+
+
+def score_series(ticker: str, df: pd.DataFrame, dates: pd.DatetimeIndex) -> dict:
+    """
+    1銘柄について、指定営業日ごとのスコアを1パスで計算する。
+    Returns: {date_str: row}
+    その日に足がない場合（売買停止など）は直前の足の評価を使う（旧版の `<= target` と同じ意味）。
+    """
+    stmts = CANSLIMAnalyzer._fetch_income_statements(ticker)  # 1銘柄1回
+    ind   = rolling_indicators(df)                             # 1銘柄1回
+    positions = df.index.searchsorted(dates, side="right") - 1
+
+    by_pos, out = {}, {}
+    for date, pos in zip(dates, positions):
+        if pos + 1 < MIN_BARS:
+            continue
+        if pos not in by_pos:
+            window = df.iloc[max(0, pos + 1 - HISTORY_WINDOW): pos + 1]
+            by_pos[pos] = score_at(ticker, window, stmts, ind.iloc[pos])
+        if by_pos[pos] is not None:
+            out[date.strftime("%Y-%m-%d")] = by_pos[pos]
+    return out
+
+
+def history_to_frame(snapshots: dict) -> pd.DataFrame:
+    """{date: [row, ...]} → date × ticker のフラットな DataFrame"""
+    rows = [{"date": d, **r} for d, items in snapshots.items() for r in items]
+    if not rows:
+        return pd.DataFrame()
+    df = pd.json_normalize(rows, sep="_")
+    for col in ("date", "ticker", "status", "ecr_phase"):
+        df[col] = df[col].astype("category")
+    return df
+
+
+def run_backtest(tickers: list, start: str, end: str, write_json: bool = True):
+    all_data = prefetch_all_data(tickers, start, end)
+
+    # 営業日 = NYSE カレンダーの取引日（週末・祝日・臨時休場を除外）。データ最終日より先は作らない
+    last_bar = max((d.index[-1] for d in all_data.values()), default=None)
+    trading_days = market_calendar.sessions(start, end)
+    trading_days = trading_days[trading_days <= last_bar] if last_bar is not None else trading_days[:0]
+
+    print(f"\n🚀 Walk-forward生成開始... ({len(trading_days)}営業日 × {len(all_data)}銘柄)\n")
+
+    snapshots = {d.strftime("%Y-%m-%d"): [] for d in trading_days}
+    for ticker in tickers:
+        if ticker not in all_data:
+            continue
+        t0 = time.time()
+        series = score_series(ticker, all_data[ticker], trading_days)
+        for date_str, row in series.items():
+            snapshots[date_str].append(row)
+        print(f"  ✅ {ticker}: {len(series)}日分 ({time.time() - t0:.1f}s)")
+
+    snapshots = {d: rows for d, rows in snapshots.items() if rows}
+
+    # 全履歴を1ファイルに
+    hist_df = history_to_frame(snapshots)
+    if not hist_df.empty:
+        HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        hist_df.to_parquet(HISTORY_FILE, compression="zstd", index=False)
+        print(f"\n🗂  {HISTORY_FILE}: {len(hist_df)} rows / {len(snapshots)} days")
+
+    # 日次 JSON（フロントエンド互換の任意出力）
+    if write_json:
+        entries = {
+            f"{OUTPUT_DIR.name}/{date_str}.json":
+                content_writer.write_json(OUTPUT_DIR / f"{date_str}.json", results, manifest=False)
+            for date_str, results in snapshots.items()
+        }
+        content_writer.update_manifest(OUTPUT_DIR.parent, entries)   # manifest は最後に1回だけ更新
+        print(f"✅ 日次JSON: {len(snapshots)}日分保存")
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="過去スコア履歴の一括生成（walk-forward）")
+    ap.add_argument("--start", default="2025-11-01")
+    ap.add_argument("--end",   default="2026-02-18")
+    ap.add_argument("--tickers", default=None, help="カンマ区切り（省略時は固定20銘柄）")
+    ap.add_argument("--no-json", action="store_true", help="日次JSONを出力しない（Parquetのみ）")
+    return ap.parse_args()
+
 
 if __name__ == "__main__":
+    args = parse_args()
+    tickers = [t.strip().upper() for t in args.tickers.split(",")] if args.tickers else FIXED_TICKERS
     start_time = time.time()
-    run_backtest()
+    run_backtest(tickers, args.start, args.end, write_json=not args.no_json)
     elapsed = time.time() - start_time
-    print(f"\n🎉 完了！ 所要時間: {elapsed/60:.1f} 分")
\ No newline at end of file
+    print(f"\n🎉 完了！ 所要時間: {elapsed/60:.1f} 分")
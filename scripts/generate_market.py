@@ -3,16 +3,21 @@
 generate_market.py — 毎日実行
 S&P500 / NASDAQ100 / Russell2000 の指数分析データ生成
 ・指数ETFのOHLCV（120日）
-・構成銘柄の寄与度ランキング
+・構成銘柄の寄与度ランキング（全指数の和集合を1回ずつ並列取得。日次スキャンの価格ストアを再利用）
 ・「なぜ動いたか」AI解説
 → content/market.json に保存
 """
-import sys, json, os, time
+from __future__ import annotations
+
+import sys, os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 
+import pandas as pd
+
 sys.path.append(str(Path(__file__).parent.parent / "shared"))
-from engines import core_fmp
+from engines import core_fmp, content_writer, llm, market_calendar, price_store, candles
 
 JST     = timezone(timedelta(hours=9))
 NOW     = datetime.now(JST)
@@ -21,6 +26,8 @@ CONTENT = Path(__file__).parent.parent / "frontend" / "public" / "content"
 OUT     = CONTENT / "market.json"
 CONTENT.mkdir(parents=True, exist_ok=True)
 
+FETCH_WORKERS = int(os.environ.get("MARKET_FETCH_WORKERS", "8") or 8)  # 総レートは FMP_LIMITER が制御
+
 # ── 指数設定 ───────────────────────────────────────────────
 INDICES = {
     "SP500": {
@@ -56,41 +63,38 @@ INDICES = {
 }
 
 
-def call_ai(prompt: str, system: str = "", max_tokens: int = 1200) -> str:
-    api_key  = os.environ.get("OPENAI_API_KEY", "")
-    base_url = os.environ.get("OPENAI_BASE_URL", "https://api.deepseek.com")
-    model    = os.environ.get("OPENAI_MODEL",    "deepseek-chat")
-    if not api_key:
-        return ""
-    try:
-        from openai import OpenAI
-        client   = OpenAI(api_key=api_key, base_url=base_url)
-        messages = ([{"role":"system","content":system}] if system else [])
-        messages.append({"role":"user","content":prompt})
-        res = client.chat.completions.create(
-            model=model, max_tokens=max_tokens, messages=messages, temperature=0.65)
-        return res.choices[0].message.content.strip()
-    except Exception as e:
-        print(f"AI error: {e}"); return ""
-
-
-def get_candles_json(ticker: str, days: int = 120) -> list:
-    """チャート用OHLCVをJSONシリアライズ可能な形式で返す"""
-    df = core_fmp.get_historical_data(ticker, days=days)
-    if df is None: return []
-    return [{
-        "date":   d.strftime("%Y-%m-%d"),
-        "open":   round(float(r["Open"]),  2),
-        "high":   round(float(r["High"]),  2),
-        "low":    round(float(r["Low"]),   2),
-        "close":  round(float(r["Close"]), 2),
-        "volume": int(r["Volume"]),
-    } for d, r in df.iterrows()]
+# AI 解説の接続先（OPENAI_* 環境変数が無いときの既定は DeepSeek）
+AI_BASE_URL    = os.environ.get("OPENAI_BASE_URL", "https://api.deepseek.com")
+AI_MODEL       = os.environ.get("OPENAI_MODEL",    "deepseek-chat")
+AI_TEMPERATURE = 0.65
+
+
+def ai_job(prompt: str, system: str = "", max_tokens: int = 1200) -> dict:
+    """llm.complete() のキーワード引数"""
+    return {"prompt": prompt, "system": system, "max_tokens": max_tokens,
+            "temperature": AI_TEMPERATURE, "model": AI_MODEL, "base_url": AI_BASE_URL}
+
+
+def load_history(ticker: str, days: int) -> pd.DataFrame | None:
+    """
+    OHLCV（直近 days 本）。日次スキャンが価格ストアへ書いた履歴が最新の取引日まで揃っていれば
+    それを使い、無い・古い銘柄だけ API（core_fmp）で取る。
+    """
+    df = price_store.read(ticker, days=days)
+    latest = pd.Timestamp(market_calendar.latest_completed_session())
+    if df is not None and len(df) >= days and df.index[-1] >= latest:
+        return df
+    return core_fmp.get_historical_data(ticker, days=days)
+
+
+def get_candles_json(ticker: str, days: int = 120) -> dict:
+    """チャート用OHLCV（engines.candles の列形式 {"date": [...], "open": [...], ...}）"""
+    return candles.encode(load_history(ticker, days))
 
 
 def analyze_component(ticker: str, days: int = 60) -> dict | None:
     """構成銘柄の個別データ取得"""
-    df = core_fmp.get_historical_data(ticker, days=days + 10)
+    df = load_history(ticker, days + 10)
     if df is None or len(df) < 10:
         return None
     profile = core_fmp.get_company_profile(ticker) or {}
@@ -123,14 +127,38 @@ def analyze_component(ticker: str, days: int = 60) -> dict | None:
     }
 
 
-def build_index_analysis(key: str, cfg: dict) -> dict:
-    """1指数の分析データを構築"""
+def analyze_components(indices: dict) -> dict:
+    """
+    全指数の構成銘柄の和集合を1回ずつ並列に分析して {ticker: 行} を返す（取得失敗は含まない）。
+    SP500 と NASDAQ に重複する大型株も取得・プロフィール参照は1回だけ。
+    """
+    tickers = sorted({t for cfg in indices.values() for t in cfg["components"]})
+    print(f"  Analyzing {len(tickers)} unique components "
+          f"({sum(len(cfg['components']) for cfg in indices.values())} across indices)...")
+
+    def work(ticker):
+        try:
+            return ticker, analyze_component(ticker)
+        except Exception as e:
+            print(f"  ⚠️ {ticker}: {e}")
+            return ticker, None
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        return {t: d for t, d in pool.map(work, tickers) if d}
+
+
+def build_index_analysis(key: str, cfg: dict, analyzed: dict) -> tuple[dict, dict]:
+    """
+    1指数の分析データを構築（構成銘柄は analyze_components() の結果から引く）。
+    AI 解説は呼ばずに (データ, {lang: llm ジョブ}) を返す
+    （全指数分をまとめて main で並列実行する。analysis には失敗時の定型文が入っている）
+    """
     print(f"  [{key}] Fetching ETF data...")
     etf_candles = get_candles_json(cfg["etf"], days=120)
 
     # ETFのリターン計算
-    if len(etf_candles) >= 22:
-        c  = [d["close"] for d in etf_candles]
+    if len(etf_candles["close"]) >= 22:
+        c  = etf_candles["close"]
         ret_1d = round((c[-1]/c[-2]-1)*100, 2) if len(c)>=2  else None
         ret_5d = round((c[-1]/c[-6]-1)*100, 2) if len(c)>=6  else None
         ret_1m = round((c[-1]/c[-22]-1)*100,2) if len(c)>=22 else None
@@ -138,14 +166,8 @@ def build_index_analysis(key: str, cfg: dict) -> dict:
     else:
         ret_1d = ret_5d = ret_1m = ret_3m = None
 
-    # 構成銘柄の分析
-    print(f"  [{key}] Analyzing {len(cfg['components'])} components...")
-    components = []
-    for ticker in cfg["components"]:
-        d = analyze_component(ticker)
-        if d:
-            components.append(d)
-        time.sleep(0.3)  # レート制限
+    # 構成銘柄（指数の並び順のまま）
+    components = [analyzed[t] for t in cfg["components"] if t in analyzed]
 
     # 寄与度ランキング（1m リターンの絶対値順）
     gainers = sorted([c for c in components if (c["ret_1m"] or 0) > 0],
@@ -193,10 +215,9 @@ Top gainers: {top3_gain} | Top losers: {top3_loss} | Vol surge: {vol_names or 'n
 300-400 words, 3 headings (##①Overview ②Key Contributors ③Volume/Volatility Context).
 Explain WHY the index moved. No predictions or recommendations. 1-line disclaimer. Markdown."""
 
-    print(f"  [{key}] Generating AI analysis...")
-    ai_ja = call_ai(prompt_ja, sys_msg, 1200) or f"""## {cfg['label']}（{cfg['etf']}）動向\n1m: {ret_1m}%\n## 上昇寄与\n{top3_gain}\n## 下落・背景\n{top3_loss}\n⚠️ 投資助言ではありません。"""
-    ai_en = call_ai(prompt_en, "", 700) or f"""## {cfg['label']} Overview\n1m: {ret_1m}%\n## Gainers\n{top3_gain}\n## Losers\n{top3_loss}\n⚠️ Not investment advice."""
-    time.sleep(1.5)
+    jobs = {"ja": ai_job(prompt_ja, sys_msg, 1200), "en": ai_job(prompt_en, "", 700)}
+    fallback_ja = f"""## {cfg['label']}（{cfg['etf']}）動向\n1m: {ret_1m}%\n## 上昇寄与\n{top3_gain}\n## 下落・背景\n{top3_loss}\n⚠️ 投資助言ではありません。"""
+    fallback_en = f"""## {cfg['label']} Overview\n1m: {ret_1m}%\n## Gainers\n{top3_gain}\n## Losers\n{top3_loss}\n⚠️ Not investment advice."""
 
     return {
         "key":      key,
@@ -215,10 +236,10 @@ Explain WHY the index moved. No predictions or recommendations. 1-line disclaime
         "vol_surge": vol_surge,
         "high_vol":  high_vol,
         "analysis": {
-            "ja": ai_ja,
-            "en": ai_en,
+            "ja": fallback_ja,
+            "en": fallback_en,
         },
-    }
+    }, jobs
 
 
 def main():
@@ -227,13 +248,25 @@ def main():
         "generated_at": TODAY,
         "indices": {},
     }
+    analyzed = analyze_components(INDICES)
+    jobs = {}
     for key, cfg in INDICES.items():
         try:
-            result["indices"][key] = build_index_analysis(key, cfg)
+            result["indices"][key], idx_jobs = build_index_analysis(key, cfg, analyzed)
+            jobs.update({(key, lang): job for lang, job in idx_jobs.items()})
             print(f"  ✅ {key} done")
         except Exception as e:
             print(f"  ❌ {key}: {e}")
-    OUT.write_text(json.dumps(result, ensure_ascii=False, indent=2))
+
+    # 「なぜ動いたか」AI解説（全指数 × 言語を並列に。失敗分は定型文のまま）
+    print(f"  Generating AI analysis ({len(jobs)} calls)...")
+    texts = llm.complete_many({f"market/{key}/{lang}": job for (key, lang), job in jobs.items()})
+    for (key, lang) in jobs:
+        if texts[f"market/{key}/{lang}"]:
+            result["indices"][key]["analysis"][lang] = texts[f"market/{key}/{lang}"]
+    llm.report()
+
+    content_writer.write_json(OUT, result)
     print(f"✅ market.json saved ({len(result['indices'])} indices)")
     print("===== Done =====")
 
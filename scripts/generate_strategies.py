@@ -1,145 +1,79 @@
 #!/usr/bin/env python3
 """
-scripts/generate_strategies.py — 全銘柄マルチ戦略スキャン（並列最適化版）
+scripts/generate_strategies.py — 全銘柄マルチ戦略スキャン（共通パイプライン版）
 ======================================================
 VCP/CANSLIM/SES/ECR の4手法ですべての銘柄を評価します。
-並列処理(ThreadPool)を導入し、600超の銘柄を高速に処理します。
+スキャン本体は shared/pipeline（generate_articles と共通）で1日1回だけ実行され、
+このスクリプトはスコア済みスナップショットから strategies を組み立て、
+content/strategies/ に index.json + シャード（ランキング・フェーズ・手法比較ごと）として書き出します。
 """
-import sys, json, time, os
-import pandas as pd
-import numpy as np
+import sys
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.append(str(Path(__file__).parent.parent / "shared"))
 
-from engines import core_fmp
-from engines.analysis           import VCPAnalyzer, RSAnalyzer, StrategyValidator
-from engines.sentinel_efficiency import SentinelEfficiencyAnalyzer
-from engines.ecr_strategy        import ECRStrategyEngine
-from engines.canslim             import CANSLIMAnalyzer
-from engines.config              import CONFIG, TICKERS
+from engines import content_writer
+from engines.config import TICKERS
+from pipeline import run_scan
+from pipeline.pipelined import FETCH_WORKERS, CPU_WORKERS
 
 JST     = timezone(timedelta(hours=9))
 TODAY   = datetime.now(JST).strftime("%Y-%m-%d")
 CONTENT = Path(__file__).parent.parent / "frontend" / "public" / "content"
-OUT     = CONTENT / "strategies.json"
+OUT     = CONTENT / "strategies"
+LEGACY  = CONTENT / "strategies.json"   # 分割前の単一ファイル（書き出し時に削除）
 
 # 全銘柄を対象にする
-SCAN_TICKERS = TICKERS 
-MAX_WORKERS  = 2  # API制限を考慮し、同時接続数は5までに制限
-
-def process_single_ticker(ticker):
-    """1銘柄の全手法計算ユニット（並列実行用）"""
-    try:
-        # 1. データ取得
-        df = core_fmp.get_historical_data(ticker, days=700)
-        if df is None or len(df) < 200:
-            return None
-
-        # 2. 基本指標・スコア計算
-        vcp     = VCPAnalyzer.calculate(df)
-        pf      = StrategyValidator.run(df)
-        ses     = SentinelEfficiencyAnalyzer.calculate(df)
-        ecr     = ECRStrategyEngine.analyze_single(ticker, df)
-        
-        # RSの生スコア（後でランキング計算に使用）
-        rs_raw  = RSAnalyzer.get_raw_score(df)
-        
-        # 3. 会社情報・ファンダ
-        fund    = core_fmp.get_fundamentals(ticker) or {}
-        own     = core_fmp.get_ownership(ticker) or {}
-        canslim = CANSLIMAnalyzer.calculate(ticker, df, fund=fund, own=own)
-        profile = core_fmp.get_company_profile(ticker) or {}
-
-        # 4. 価格・乖離率
-        price   = float(df["Close"].iloc[-1])
-        pivot   = float(df["High"].iloc[-20:].max())
-        dist    = (price - pivot) / pivot
-        status  = "ACTION" if -0.05 <= dist <= 0.03 else ("WAIT" if dist < -0.05 else "EXTENDED")
-        
-        ma50 = df["Close"].rolling(50).mean().iloc[-1]
-        ma50_ratio = round((price / ma50 - 1) * 100, 1) if not np.isnan(ma50) else None
-
-        return {
-            "ticker": ticker,
-            "df": df,
-            "raw_rs": rs_raw,
-            "data": {
-                "ticker":       ticker,
-                "name":         profile.get("companyName", ticker)[:25],
-                "sector":       profile.get("sector", "N/A"),
-                "status":       status,
-                "scores": {
-                    "vcp":           vcp["score"],
-                    "ses":           ses["score"],
-                    "ecr_rank":      ecr["sentinel_rank"],
-                    "canslim":       canslim["score"],
-                    "pf":            round(pf, 2),
-                },
-                "ecr_phase":     ecr["phase"],
-                "ecr_strategy":  ecr["strategy"],
-                "canslim_grade": canslim["grade"],
-                "atr_pct":       round(vcp.get("atr", 0) / price * 100, 2) if price > 0 else None,
-                "pivot_dist_pct": round(dist * 100, 2),
-                "ma50_ratio":    ma50_ratio,
-            }
-        }
-    except Exception:
-        return None
+SCAN_TICKERS = TICKERS
+
+
+def to_strategy_row(r: dict) -> dict:
+    """スナップショット1行 → strategies の1銘柄分（rows.json の1行）"""
+    rs = r["rs"]
+    d = {
+        "ticker":       r["ticker"],
+        "name":         r["name"][:25],
+        "sector":       r["sector"],
+        "status":       r["status"],
+        "scores": {
+            "vcp":           r["vcp"],
+            "ses":           r["ses"],
+            "ecr_rank":      r["ecr_rank"],
+            "canslim":       r["canslim"],
+            "pf":            r["pf"],
+            "rs":            rs,
+        },
+        "ecr_phase":     r["ecr_phase"],
+        "ecr_strategy":  r["ecr_strategy"],
+        "canslim_grade": r["canslim_grade"],
+        "atr_pct":       r["atr_pct"],
+        "pivot_dist_pct": r["pivot_dist_pct"],
+        "ma50_ratio":    r["ma50_ratio"],
+    }
+
+    # 総合スコアの計算
+    vcp_rs_norm = min(100, (d["scores"]["vcp"] / 105 * 50) + (rs / 99 * 50))
+    composite = (
+        vcp_rs_norm * 0.35 +
+        d["scores"]["ecr_rank"] * 0.35 +
+        d["scores"]["canslim"] * 0.30
+    )
+    d["scores"]["composite"] = round(composite, 1)
+
+    # コンセンサスヒット数
+    d["method_hits"] = sum([
+        d["scores"]["vcp"] >= 70 and rs >= 80,
+        d["scores"]["ecr_rank"] >= 70,
+        d["scores"]["canslim"] >= 60,
+        d["scores"]["ses"] >= 60,
+    ])
+    return d
+
 
 def scan_all():
-    """ThreadPoolを使用した高速スキャン"""
-    print(f"  Starting Parallel Scan ({len(SCAN_TICKERS)} tickers, Workers={MAX_WORKERS})...")
-    
-    raw_results = []
-    processed_count = 0
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_ticker = {executor.submit(process_single_ticker, t): t for t in SCAN_TICKERS}
-        
-        for future in as_completed(future_to_ticker):
-            processed_count += 1
-            res = future.result()
-            if res:
-                raw_results.append(res)
-            
-            if processed_count % 50 == 0:
-                print(f"    Progress: {processed_count}/{len(SCAN_TICKERS)} processed")
-
-    # --- Phase 2: 全銘柄比較が必要なスコア（RS）の算出 ---
-    print(f"  Calculating RS relative ratings...")
-    rs_input = [{"ticker": r["ticker"], "raw_rs": r["raw_rs"]} for r in raw_results]
-    scored_rs = RSAnalyzer.assign_percentiles(rs_input)
-    rs_map = {s["ticker"]: s["rs_rating"] for s in scored_rs}
-
-    # --- Phase 3: 最終データの組み立て ---
-    final_results = []
-    for r in raw_results:
-        d = r["data"]
-        rs = rs_map.get(r["ticker"], 0)
-        d["scores"]["rs"] = rs
-        
-        # 総合スコアの計算
-        vcp_rs_norm = min(100, (d["scores"]["vcp"] / 105 * 50) + (rs / 99 * 50))
-        composite = (
-            vcp_rs_norm * 0.35 +
-            d["scores"]["ecr_rank"] * 0.35 +
-            d["scores"]["canslim"] * 0.30
-        )
-        d["scores"]["composite"] = round(composite, 1)
-        
-        # コンセンサスヒット数
-        d["method_hits"] = sum([
-            d["scores"]["vcp"] >= 70 and rs >= 80,
-            d["scores"]["ecr_rank"] >= 70,
-            d["scores"]["canslim"] >= 60,
-            d["scores"]["ses"] >= 60,
-        ])
-        final_results.append(d)
-
-    return final_results
+    """共通パイプラインのスナップショットを strategies 形式に変換"""
+    return [to_strategy_row(r) for r in run_scan(SCAN_TICKERS)]
 
 def build_rankings(results):
     valid = [r for r in results if r["status"] in ("ACTION", "WAIT")]
@@ -187,7 +121,8 @@ def build_method_comparison(results):
 
 def main():
     print(f"===== STRATEGIES OPTIMIZED FULL SCAN {TODAY} =====")
-    print(f"Processing {len(SCAN_TICKERS)} tickers with {MAX_WORKERS} threads...")
+    print(f"Processing {len(SCAN_TICKERS)} tickers "
+          f"(fetch {FETCH_WORKERS} concurrent / score {CPU_WORKERS} processes)...")
 
     results = scan_all()
     print(f"Success: {len(results)}/{len(SCAN_TICKERS)} tickers")
@@ -207,8 +142,10 @@ def main():
     }
 
     CONTENT.mkdir(parents=True, exist_ok=True)
-    OUT.write_text(json.dumps(output, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"✅ strategies.json updated via Optimized Scan")
+    index = content_writer.write_strategies(OUT, output)
+    content_writer.remove(LEGACY)
+    print(f"✅ strategies/ updated via Optimized Scan "
+          f"({len(index['rankings'])} rankings / {len(index['ecr_phases'])} phases / {index['rows']['count']} rows)")
 
 if __name__ == "__main__":
     main()
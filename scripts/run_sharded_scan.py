@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+scripts/run_sharded_scan.py — シャード分割スキャン（複数ワーカー）
+======================================================
+ユニバースを N シャードに分けて SQLite キューに登録し、複数のワーカー（別プロセス・別ホスト）で
+処理してから、merge で横断 RS を付けてその日のスナップショットとして保存する。
+merge 後は generate_strategies / generate_articles の run_scan() が保存済みスナップショットを
+そのまま使うので再スキャンは起きない。
+
+使い方:
+  python scripts/run_sharded_scan.py enqueue --shards 8     # タスク登録
+  python scripts/run_sharded_scan.py work                   # ワーカー（何台でも並走可）
+  python scripts/run_sharded_scan.py merge                  # 全シャード完了後に統合
+  python scripts/run_sharded_scan.py status
+  python scripts/run_sharded_scan.py local --shards 8 --workers 4   # 上記をローカルで一括実行
+
+複数ホストで使う場合は SCAN_QUEUE_DB を共有ストレージ上のパスにし、--as-of を揃える。
+FMP のレート制限（engines.ratelimit）はプロセスごとなので、local は FMP_RATE_LIMIT をワーカー数で割って渡す。
+複数ホストのときは各ホストの FMP_RATE_LIMIT を合計が上限に収まるように設定すること。
+"""
+import os, sys, time, argparse, subprocess
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "shared"))
+
+from engines import snapshots, api_snapshots, ratelimit
+from engines.config import TICKERS
+from pipeline import stages, sharded
+from pipeline.scan import ScanArtifacts, SNAPSHOT_ROOT, API_SNAPSHOT_DIR, default_as_of
+from pipeline.pipelined import FETCH_WORKERS, CPU_WORKERS
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="SENTINEL シャード分割スキャン")
+    ap.add_argument("command", choices=["enqueue", "work", "merge", "status", "local"])
+    ap.add_argument("--as-of", default=default_as_of(), help="スナップショットの日付（既定: 最新の営業日）")
+    ap.add_argument("--shards", type=int, default=8, help="シャード数（enqueue / local）")
+    ap.add_argument("--workers", type=int, default=2, help="起動するワーカープロセス数（local）")
+    ap.add_argument("--worker-id", default=None, help="ワーカー名（既定: host:pid）")
+    ap.add_argument("--max-tasks", type=int, default=None, help="このワーカーが処理する最大シャード数")
+    ap.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS)
+    ap.add_argument("--cpu-workers", type=int, default=CPU_WORKERS,
+                    help="ワーカー1つあたりの score プロセス数（0 ならワーカー内で実行）")
+    ap.add_argument("--queue-db", default=None, help="キューの SQLite パス（既定: SCAN_QUEUE_DB）")
+    ap.add_argument("--reset", action="store_true", help="同じ run の既存タスクを消して登録し直す")
+    return ap.parse_args()
+
+
+def enqueue(q, run_id: str, uni: list, n: int, reset: bool):
+    targets = stages.active(uni)
+    if len(targets) < len(uni):
+        print(f"⏭  Skipping {len(uni) - len(targets)} dead / short-history tickers (universe registry)")
+    shards = sharded.split(targets, n)
+    added  = q.enqueue(run_id, shards, reset=reset)
+    sizes  = [len(v) for v in shards.values()]
+    print(f"📥 {run_id}: {added} shards enqueued ({min(sizes)}–{max(sizes)} tickers each)")
+
+
+def merge(q, run_id: str, art: ScanArtifacts, as_of: str, uni: list):
+    scored = sharded.merge(q, run_id)
+    art.save("universe", uni)
+    art.save("raw", [{**r, "rs": None} for r in scored])
+    path = snapshots.write_snapshot(scored, as_of, universe_key=art.key, root=SNAPSHOT_ROOT)
+    print(f"✅ Merged {len(scored)}/{len(uni)} tickers → {path}")
+    n = api_snapshots.write_all(scored, as_of, out_dir=API_SNAPSHOT_DIR)
+    print(f"📇 API snapshots: {n} tickers → {API_SNAPSHOT_DIR}")
+
+
+def main():
+    args  = parse_args()
+    uni   = stages.universe(TICKERS)
+    art   = ScanArtifacts(args.as_of, uni)
+    run_id = art.dir.name
+    q = sharded.WorkQueue(args.queue_db) if args.queue_db else sharded.WorkQueue()
+
+    if args.command == "enqueue":
+        enqueue(q, run_id, uni, args.shards, args.reset)
+
+    elif args.command == "work":
+        n = sharded.work(q, run_id, args.worker_id, args.max_tasks,
+                         fetch_workers=args.fetch_workers, cpu_workers=args.cpu_workers)
+        print(f"👷 {args.worker_id or sharded.default_worker_id()}: {n} shards done")
+
+    elif args.command == "status":
+        print(f"{run_id}: {q.status(run_id) or 'no tasks'}")
+        for shard, error in q.failures(run_id).items():
+            print(f"  ❌ shard {shard}: {error}")
+
+    elif args.command == "merge":
+        merge(q, run_id, art, args.as_of, uni)
+
+    elif args.command == "local":
+        t0 = time.time()
+        enqueue(q, run_id, uni, args.shards, args.reset)
+        cmd = [sys.executable, __file__, "work", "--as-of", args.as_of,
+               "--fetch-workers", str(args.fetch_workers), "--cpu-workers", "0"]
+        if args.queue_db:
+            cmd += ["--queue-db", args.queue_db]
+        # 各ワーカーは自前のトークンバケットを持つので、総レートを分け合う
+        env = {**os.environ, **ratelimit.split_env(ratelimit.FMP_LIMITER, args.workers)}
+        print(f"🚦 FMP rate per worker: {float(env['FMP_RATE_LIMIT']):.2f} req/s "
+              f"(total {ratelimit.FMP_LIMITER.rate:g} req/s)")
+        procs = [subprocess.Popen(cmd + ["--worker-id", f"local-{i}"], env=env) for i in range(args.workers)]
+        codes = [p.wait() for p in procs]
+        if any(codes):
+            print(f"⚠️ worker exit codes: {codes}")
+        merge(q, run_id, art, args.as_of, uni)
+        print(f"⏱  {args.workers} workers / {args.shards} shards: {time.time() - t0:.1f}s")
+
+    q.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+scripts/update_prices.py — 一括EODで価格ストアを更新
+======================================================
+前回の取り込み日の翌営業日から --to（既定: EOD が揃っている最新の営業日）までの一括EODを1日1リクエストで取得し、
+全銘柄の価格ストアに追記する。欠損がある銘柄だけ銘柄単位でバックフィルする。
+ストアが空の初回は全銘柄のバックフィルになる。
+
+その後のスキャンは PRICE_SOURCE=store で実行すると、OHLCV を API ではなくストアから読む:
+  python scripts/update_prices.py
+  PRICE_SOURCE=store python scripts/generate_strategies.py
+"""
+import sys, time, argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "shared"))
+
+from engines import price_store, market_calendar
+from engines.universe import registry as universe_registry, active_universe
+from pipeline import ingest
+
+
+def parse_args():
+    latest = market_calendar.latest_completed_session().isoformat()
+    ap = argparse.ArgumentParser(description="SENTINEL 価格ストア更新（一括EOD）")
+    ap.add_argument("--from", dest="start", default=None,
+                    help="取り込み開始日（既定: 前回取り込み日の翌営業日。初回は --to のみ）")
+    ap.add_argument("--to", dest="end", default=latest, help="取り込み終了日（既定: 最新の営業日）")
+    ap.add_argument("--no-backfill", action="store_true", help="欠損銘柄のバックフィルを行わない")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    uni  = active_universe()
+    last = price_store.ingested_through()
+    start = args.start or (market_calendar.next_session(last).isoformat() if last else args.end)
+    print(f"===== PRICE STORE UPDATE {start} → {args.end} ({len(uni)} tickers) =====")
+    print(f"  store: {price_store.PRICE_DIR} (ingested through {last or '-'})")
+
+    if start > args.end:
+        print("✅ Already up to date")
+        return
+
+    t0 = time.time()
+    for res in ingest.ingest_range(start, args.end, uni, do_backfill=not args.no_backfill):
+        if res.get("empty"):
+            print(f"  {res['date']}: no bulk data yet")
+            continue
+        print(f"  {res['date']}: appended {res['appended']} / up-to-date {res['up_to_date']} / "
+              f"backfilled {res['backfilled']}/{res['gaps']} / missing {len(res['missing'])} / "
+              f"adjusted {res['refetched']}/{len(res['adjusted'])}")
+    universe_registry().save()
+    print(f"✅ Done ({time.time() - t0:.0f}s) — ingested through {price_store.ingested_through()}")
+
+
+if __name__ == "__main__":
+    main()
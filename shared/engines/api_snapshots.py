@@ -0,0 +1,190 @@
+"""
+api_snapshots.py — api/stock/[ticker] 用の銘柄別スナップショット
+=================================================================
+日次スキャンのスコア済み行から、API のレスポンスと同じ形の JSON を銘柄ごとに書き出す。
+ハンドラはこれを読んで返すだけにし（最新クォートだけ短い TTL のキャッシュで上書き）、
+700日分の履歴取得・VCP / RS の再計算はユニバース外の銘柄だけで行う。
+
+  frontend/public/content/stocks/{TICKER}.json  … {ticker, date, status, price, pivot, dist_pct,
+                                                   vcp, rs, scores, trade, profile, candles}
+  frontend/public/content/stocks/index.json     … {"updated": as_of, "tickers": {ticker: date}, "rs_raw": [...]}
+
+  rs はどちらの経路もユニバース内の RS パーセンタイル（stages.rank と同じ式の 1-99）。
+  live() はスキャン時のユニバースの raw_rs（index.json の rs_raw・昇順）に1銘柄加えたものとして順位を付ける。
+  scores もスキャンと同じ stages.score で計算するので、スナップショットと同じ形・同じ意味になる。
+
+  - content/ 配下なので日次ワークフローのコミットにそのまま乗る（vercel.json の includeFiles で関数に同梱）
+  - ページからは読まないので manifest には載せず、事前圧縮もしない
+  - 最新の銘柄より STALE_DAYS 以上古い銘柄（上場廃止・ユニバースから外れた銘柄）のファイルは削除する
+  - load() / with_quote() は標準ライブラリだけで動く（ハンドラの読み出し経路。pandas は live() でだけ読み込む）
+  - API_SNAPSHOT_DIR で置き場所を変えられる（計測・検証用）
+  - live() はスナップショットの無い銘柄をその場で計算する（api/stock・api/stocks 共通）
+"""
+from __future__ import annotations
+
+import os, json, bisect
+from datetime import date, timedelta
+from pathlib import Path
+
+OUT_DIR     = Path(os.getenv("API_SNAPSHOT_DIR") or
+                   Path(__file__).parent.parent.parent / "frontend" / "public" / "content" / "stocks")
+INDEX_NAME  = "index.json"
+CANDLE_DAYS = 180   # 暦日
+STALE_DAYS  = 10    # 暦日
+
+
+def _status(dist_pct: float) -> str:
+    return "ACTION" if -5 <= dist_pct <= 3 else ("WAIT" if dist_pct < -5 else "EXTENDED")
+
+
+def _file(ticker: str, root) -> Path:
+    return Path(root) / f"{ticker.replace('/', '_')}.json"
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 書き出し（日次スキャン）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def build(row: dict, df, profile: dict) -> dict:
+    """スコア済み1行（rank 済み）+ OHLCV + プロフィール → API レスポンス"""
+    import pandas as pd
+    from . import candles
+
+    cutoff = df.index[-1] - pd.DateOffset(days=CANDLE_DAYS)
+    return {
+        "ticker":   row["ticker"],
+        "date":     row["date"],
+        "status":   row["status"],
+        "price":    round(row["price"], 2),
+        "pivot":    round(row["pivot"], 2),
+        "dist_pct": row["pivot_dist_pct"],
+        "vcp":      row["vcp_detail"],
+        "rs":       row["rs"],
+        "scores": {
+            "vcp":           row["vcp"],
+            "rs":            row["rs"],
+            "pf":            row["pf"],
+            "ses":           row["ses"],
+            "ecr_rank":      row["ecr_rank"],
+            "ecr_phase":     row["ecr_phase"],
+            "canslim":       row["canslim"],
+            "canslim_grade": row["canslim_grade"],
+        },
+        "trade": {
+            "entry":  row["entry"],
+            "stop":   row["stop"],
+            "target": row["target"],
+        },
+        "profile": {
+            "sector":      profile.get("sector", row.get("sector", "N/A")),
+            "industry":    profile.get("industry", row.get("industry", "N/A")),
+            "description": profile.get("description", ""),
+            "exchange":    profile.get("exchangeShortName", ""),
+        },
+        "candles": candles.encode(df[df.index >= cutoff]),
+    }
+
+
+def write_all(rows: list, as_of: str, out_dir=OUT_DIR, price_root=None) -> int:
+    """
+    スキャン結果の全銘柄のスナップショットを書き、index.json を更新する。書いた件数を返す。
+    OHLCV は fetch ステージが書いた価格ストアから読む（無ければ core_fmp のキャッシュ）。
+    """
+    from . import content_writer, core_fmp, price_store
+
+    out_dir = Path(out_dir)
+    root    = price_root or price_store.PRICE_DIR
+    index   = content_writer.read_json(out_dir / INDEX_NAME, {}) or {}
+    dates   = index.get("tickers", {})
+    written = 0
+    for row in rows:
+        ticker = row["ticker"]
+        try:
+            df = price_store.read(ticker, days=CANDLE_DAYS + 10, root=root)
+            if df is None or df.index[-1].strftime("%Y-%m-%d") != row["date"]:
+                df = core_fmp.get_historical_data(ticker, days=CANDLE_DAYS + 10)
+            if df is None or len(df) == 0:
+                continue
+            profile = core_fmp.get_company_profile(ticker) or {}
+            content_writer.write_json(_file(ticker, out_dir), build(row, df, profile),
+                                      compress=False, manifest=False)
+            dates[ticker] = row["date"]
+            written += 1
+        except Exception as e:
+            print(f"  ⚠️ api snapshot {ticker}: {e}")
+
+    # 最新の銘柄から STALE_DAYS 以上遅れている銘柄は取得できなくなったとみなす
+    newest = max(dates.values(), default=as_of)
+    cutoff = (date.fromisoformat(newest) - timedelta(days=STALE_DAYS)).isoformat()
+    for ticker in [t for t, d in dates.items() if d < cutoff]:
+        _file(ticker, out_dir).unlink(missing_ok=True)
+        del dates[ticker]
+    # live() がユニバース外の銘柄に同じ尺度の RS を付けるための分布
+    rs_raw = sorted(round(float(r["raw_rs"]), 6) for r in rows if r.get("raw_rs") is not None)
+    content_writer.write_json(out_dir / INDEX_NAME, {"updated": as_of, "tickers": dict(sorted(dates.items())),
+                                                     "rs_raw": rs_raw},
+                              compress=False, manifest=False)
+    return written
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 読み出し（api/stock ハンドラ）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def load(ticker: str, root=OUT_DIR):
+    """銘柄のスナップショット（無い・壊れているときは None）"""
+    try:
+        return json.loads(_file(ticker, root).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def load_index(root=OUT_DIR) -> dict:
+    """index.json（無い・壊れているときは {}）"""
+    try:
+        return json.loads((Path(root) / INDEX_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def rs_rating(raw_rs: float, rs_raw: list) -> int:
+    """
+    ユニバースの raw_rs（昇順）に1銘柄加えたときの RS Rating（RSAnalyzer.assign_percentiles と同じ式）。
+    分布が無いとき（スナップショット未生成）は raw_rs を 1-99 に線形に写した旧来の近似
+    """
+    if not rs_raw:
+        return min(99, max(1, int((raw_rs + 1) * 50)))
+    i = bisect.bisect_right(rs_raw, raw_rs)
+    return int(((i + 1) / (len(rs_raw) + 1)) * 99) + 1
+
+
+def live(ticker: str, quote=None, root=OUT_DIR):
+    """
+    スナップショットの無い銘柄（ユニバース外）: 履歴を取得し、スキャンと同じ stages.score で計算した
+    API レスポンス（build と同じ形）。quote を渡さなければ get_quote で取る。履歴が足りなければ None
+    """
+    from . import core_fmp
+    from pipeline import stages   # スキャンと同じ score（重いエンジン群はここで初めて読み込む）
+
+    df = core_fmp.get_historical_data(ticker, days=stages.HISTORY_DAYS)
+    if df is None or len(df) < stages.MIN_BARS:
+        return None
+    fetched = stages.bundle(ticker, df)
+    row = stages.score(fetched)
+    if row is None:
+        return None
+    index = load_index(root)
+    row["rs"] = rs_rating(row["raw_rs"], index.get("rs_raw") or [])
+
+    # 最新クォート（リアルタイム価格優先）
+    quote = quote if quote is not None else core_fmp.get_quote(ticker)
+    return with_quote(build(row, df, fetched["profile"]), quote)
+
+
+def with_quote(snap: dict, quote) -> dict:
+    """最新クォートの価格でスナップショットの price / dist_pct / status を置き換えた新しい dict"""
+    price = float((quote or {}).get("price") or 0)
+    if not price or not snap.get("pivot"):
+        return snap
+    dist = (price - snap["pivot"]) / snap["pivot"] * 100
+    return {**snap, "price": round(price, 2), "dist_pct": round(dist, 2), "status": _status(dist)}
@@ -0,0 +1,101 @@
+"""
+cache_policy.py — 取引セッションに合わせたキャッシュ有効期限
+===============================================================
+core_fmp._get のキャッシュ判定を固定 TTL（秒）ではなく「データの性質 × 市場カレンダー」で行う。
+キャッシュを書いた時刻から「次にデータが変わり得る時刻」を求め、それを過ぎたら期限切れ。
+
+  eod          … 日足・アナリスト評価など引け後に1回変わるもの。次の引け + DATA_DELAY まで有効
+                 （朝9時の実行も15時の実行も同じ前日データを使い、週末は金曜のデータを使い続ける）
+  quote        … ザラ場中は QUOTE_TTL 秒、時間外に取ったものは次の寄り付きまで有効
+  fundamentals … 財務・主要指標。最大7日、ただし決算発表日を過ぎたら即期限切れ
+  profile      … 会社プロフィール。7日
+  news         … 6時間
+
+policy ごとのヒット率は stats() / report() で確認できる（pipeline の PipelineStats にも載る）。
+"""
+import threading
+from datetime import datetime, timedelta, time as dtime
+
+try:
+    from . import market_calendar as cal
+except ImportError:
+    import market_calendar as cal
+
+QUOTE_TTL        = 15
+REGULAR_OPEN     = dtime(9, 30)
+FUNDAMENTALS_MAX = timedelta(days=7)
+PROFILE_MAX      = timedelta(days=7)
+NEWS_MAX         = timedelta(hours=6)
+
+POLICIES = ("eod", "quote", "fundamentals", "profile", "news")
+
+_lock  = threading.Lock()
+_stats = {}
+
+
+def _next_open(now: datetime) -> datetime:
+    d = now.date()
+    if cal.is_trading_day(d) and now.time() < REGULAR_OPEN:
+        return datetime.combine(d, REGULAR_OPEN, tzinfo=cal.ET)
+    return datetime.combine(cal.next_session(d), REGULAR_OPEN, tzinfo=cal.ET)
+
+
+def in_session(now: datetime) -> bool:
+    d = now.date()
+    return cal.is_trading_day(d) and REGULAR_OPEN <= now.time() < cal.session_close(d).time()
+
+
+def expires_at(policy: str, written: float, earnings_dates=()) -> float:
+    """
+    written（UNIX 秒）に書いたキャッシュの期限（UNIX 秒）。
+    earnings_dates: fundamentals 用の決算発表日（date のイテラブル）
+    """
+    w = datetime.fromtimestamp(written, cal.ET)
+    if policy == "eod":
+        return cal.next_data_time(w).timestamp()
+    if policy == "quote":
+        if in_session(w):
+            return written + QUOTE_TTL
+        return _next_open(w).timestamp()
+    if policy == "fundamentals":
+        limit = w + FUNDAMENTALS_MAX
+        for d in earnings_dates:
+            # 発表日の翌日 0 時（ET）以降は新しい決算が載っている可能性がある
+            reported = datetime.combine(d + timedelta(days=1), dtime(0, 0), tzinfo=cal.ET)
+            if w < reported < limit:
+                limit = reported
+        return limit.timestamp()
+    if policy == "profile":
+        return (w + PROFILE_MAX).timestamp()
+    if policy == "news":
+        return (w + NEWS_MAX).timestamp()
+    raise ValueError(f"unknown cache policy: {policy}")
+
+
+def is_fresh(policy: str, written: float, now: float, earnings_dates=()) -> bool:
+    return now < expires_at(policy, written, earnings_dates)
+
+
+def record(policy: str, outcome: str):
+    """outcome: "hit"（有効なキャッシュ）/ "stale"（期限切れで再取得）/ "miss"（キャッシュ無し）"""
+    with _lock:
+        s = _stats.setdefault(policy, {"hit": 0, "stale": 0, "miss": 0})
+        s[outcome] += 1
+
+
+def stats() -> dict:
+    """{policy: {hit, stale, miss, hit_rate}}"""
+    with _lock:
+        out = {}
+        for policy, s in sorted(_stats.items()):
+            total = s["hit"] + s["stale"] + s["miss"]
+            out[policy] = {**s, "hit_rate": round(s["hit"] / total, 3) if total else None}
+        return out
+
+
+def report():
+    st = stats()
+    if not st:
+        return
+    parts = [f"{p} {s['hit']}/{s['hit'] + s['stale'] + s['miss']} ({s['hit_rate']:.0%})" for p, s in st.items()]
+    print(f"  🗄  cache hit: {' / '.join(parts)}")
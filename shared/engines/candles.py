@@ -0,0 +1,65 @@
+"""
+candles.py — チャート用ローソク足の共通エンコーダ
+=================================================
+OHLCV DataFrame → JSON 用のローソク足。df.iterrows() で1行ずつ float() / round() / strftime する代わりに、
+列ごとにまとめて丸め・日付文字列化する（api/stock と generate_market の両方が使う）。
+
+  encode()      … 列形式 {"date": [...], "open": [...], "high": [...], "low": [...], "close": [...], "volume": [...]}
+                  キー名の繰り返しが無いぶん小さい。フロントエンドは lib/candles.js の toCandleRows() で行に戻す
+  encode_rows() … 従来の行形式 [{"date", "open", "high", "low", "close", "volume"}, ...]（同じ列から組み立てる）
+
+価格は DECIMALS 桁に丸め、出来高は整数。欠損は None（JSON の null）。
+Vercel の Python ランタイム（3.9）からも import されるため、numpy 以外に依存しない書き方にしている。
+"""
+import numpy as np
+
+DECIMALS = 2
+FIELDS   = ("open", "high", "low", "close", "volume")
+_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+
+def _prices(values, decimals: int) -> list:
+    raw = np.asarray(values, dtype="float64")
+    v   = np.round(raw, decimals)
+    # np.round は 10**decimals 倍してから丸めるため、ちょうど半端（x.xx5）付近で組み込み round() と
+    # 1桁ずれることがある。該当する少数の値だけ round() で丸め直して従来の出力と一致させる
+    scaled = raw * 10.0 ** decimals
+    near_half = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    out = v.tolist()
+    for i in np.flatnonzero(near_half).tolist():
+        out[i] = round(float(raw[i]), decimals)
+    if np.isnan(v).any():
+        out = [None if x != x else x for x in out]
+    return out
+
+
+def _volumes(values) -> list:
+    v = np.asarray(values, dtype="float64")
+    mask = np.isnan(v)
+    out = np.where(mask, 0, v).astype("int64").tolist()
+    if mask.any():
+        out = [None if m else x for x, m in zip(out, mask.tolist())]
+    return out
+
+
+def encode(df, decimals: int = DECIMALS) -> dict:
+    """OHLCV（DatetimeIndex・Open/High/Low/Close/Volume 列）→ 列形式のローソク足。df が None / 空なら空の列"""
+    if df is None or len(df) == 0:
+        return {"date": [], **{f: [] for f in FIELDS}}
+    out = {"date": df.index.strftime("%Y-%m-%d").tolist()}
+    for field in FIELDS:
+        col = df[_COLUMNS[field]].to_numpy()
+        out[field] = _volumes(col) if field == "volume" else _prices(col, decimals)
+    return out
+
+
+def encode_rows(df, decimals: int = DECIMALS) -> list:
+    """OHLCV → 行形式のローソク足（iterrows 版と同じ出力）"""
+    return to_rows(encode(df, decimals))
+
+
+def to_rows(columns: dict) -> list:
+    """列形式 → 行形式"""
+    keys = ("date", *FIELDS)
+    return [dict(zip(keys, vals)) for vals in zip(*(columns[k] for k in keys))]
+
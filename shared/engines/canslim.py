@@ -14,6 +14,8 @@ CANSLIM 簡易版スコアリングエンジン（William O'Neil 手法）
 ※ income-statement から C/A を自前計算
 ※ fund引数がNoneの場合はFMPから直接取得
 """
+from __future__ import annotations
+
 import pandas as pd
 import numpy as np
 
@@ -31,20 +33,22 @@ class CANSLIMAnalyzer:
     def _fetch_income_statements(ticker: str) -> list:
         """
         /stable/income-statement から年次データを3期分取得。
-        24時間キャッシュ済み。
+        キャッシュは最大7日、決算発表日を過ぎたら再取得（cache_policy "fundamentals"）。
         """
         data = core_fmp._get(
             f"{core_fmp.BASE_URL}/income-statement",
             {"symbol": ticker, "period": "annual", "limit": 3},
             cache_key=f"incstmt_{ticker}",
-            ttl=24 * 3600,
+            policy="fundamentals",
+            ticker=ticker,
         )
         return data if isinstance(data, list) else []
 
     @staticmethod
     def calculate(ticker: str, df: pd.DataFrame,
-                  fund: dict | None = None,
-                  own:  dict | None = None) -> dict:
+                  fund:  dict | None = None,
+                  own:   dict | None = None,
+                  stmts: list | None = None) -> dict:
         """
         Parameters
         ----------
@@ -52,6 +56,8 @@ class CANSLIMAnalyzer:
         df     : OHLCV DataFrame（100日以上）
         fund   : core_fmp.get_fundamentals() の結果（省略可）
         own    : core_fmp.get_ownership() の結果（省略可・Starter非対応）
+        stmts  : _fetch_income_statements() の結果（省略時は取得。
+                 同一銘柄を多数の日付で評価する場合は事前取得して渡す）
         """
         try:
             if df is None or len(df) < 100:
@@ -62,7 +68,8 @@ class CANSLIMAnalyzer:
             price  = float(close.iloc[-1])
 
             # ── income-statement 取得（C/A の計算に使用） ──────────
-            stmts = CANSLIMAnalyzer._fetch_income_statements(ticker)
+            if stmts is None:
+                stmts = CANSLIMAnalyzer._fetch_income_statements(ticker)
 
             # ── C: Current Earnings — EPS成長率 (25pt) ────────────
             c_score    = 0
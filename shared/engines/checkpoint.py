@@ -0,0 +1,92 @@
+"""
+checkpoint.py — 銘柄単位のチェックポイント（追記専用 JSONL）
+==============================================================
+長時間バックテストの途中停止（429連発・OOM・CIタイムアウト）に備え、
+1銘柄の処理が終わるたびに結果を1行追記する。
+
+  - 1行 = {"ticker", "key", "data", "result", "ts"}
+  - key  = パラメータ + データ基準日のハッシュ。key が一致する行だけを「完了済み」とみなす
+  - data = 計算に使った OHLCV の指紋。is_current() で今の指紋と照合し、一致しない行（分割調整・取り直しで
+           データが変わった銘柄）は再計算の対象にする。照合は呼び出し側のワーカー内で、再計算用に
+           取得したデータでそのまま行う（再開時に全銘柄の履歴を直列で取り直さない）
+  - 書き込みは追記 + fsync のみ。クラッシュで最終行が壊れても読み込み時に無視する
+  - 複数ファイル（別ジョブ・別マシンの出力）をそのままマージできる
+"""
+from __future__ import annotations
+
+import os, json, time, hashlib
+from pathlib import Path
+
+
+def run_key(params: dict) -> str:
+    """パラメータdict → 短いハッシュ（キー順に依存しない）"""
+    raw = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def data_fingerprint(df) -> dict:
+    """OHLCV の同一性を表す軽量指紋（最終日・本数・最終終値）"""
+    if df is None or len(df) == 0:
+        return {"last_date": None, "bars": 0, "last_close": None}
+    return {
+        "last_date":  df.index[-1].strftime("%Y-%m-%d"),
+        "bars":       int(len(df)),
+        "last_close": round(float(df["Close"].iloc[-1]), 4),
+    }
+
+
+def is_current(record: dict, fingerprint: dict | None) -> bool:
+    """記録時の指紋が今の指紋と一致するか（今の指紋が取れない None は検証できないので記録を信用する）"""
+    return fingerprint is None or record.get("data") == fingerprint
+
+
+def load_records(paths, key: str | None = None) -> dict:
+    """
+    チェックポイントファイル群を読み込み {ticker: record} を返す。
+    key 指定時は一致する行のみ。同一銘柄が複数あれば後勝ち。
+    """
+    records = {}
+    for path in paths:
+        path = Path(path)
+        if not path.exists():
+            continue
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue  # 書きかけの行は無視
+                if key is not None and rec.get("key") != key:
+                    continue
+                records[rec["ticker"]] = rec
+    return records
+
+
+class CheckpointLog:
+    """追記専用のチェックポイントログ（書き込みは呼び出し側の単一スレッドから行う）"""
+
+    def __init__(self, path, key: str):
+        self.path = Path(path)
+        self.key  = key
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def completed(self, extra_paths=()) -> dict:
+        """key が一致する完了済みレコード {ticker: record}（データの指紋はまだ照合していない）"""
+        return load_records([self.path, *extra_paths], key=self.key)
+
+    def append(self, ticker: str, result, data: dict | None = None):
+        rec = {
+            "ticker": ticker,
+            "key":    self.key,
+            "data":   data or {},
+            "result": result,
+            "ts":     round(time.time(), 3),
+        }
+        line = json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 
 def _ei(key, default):
     v = os.getenv(key, "").strip()
@@ -21,6 +22,9 @@ CONFIG = {
     "CACHE_EXPIRY":      12 * 3600,
 }
 
+# 生成データ（台帳・履歴ストア等）の保存先
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
 # NASDAQ 100
 _NASDAQ100 = [
     "AAPL","MSFT","NVDA","AMZN","META","GOOGL","GOOG","TSLA","AVGO","COST",
@@ -138,3 +142,8 @@ _CORE = [
 ]
 
 TICKERS = sorted(list(set(_NASDAQ100 + _DOW30 + _RUSSELL2000 + _CORE)))
+
+# 負荷試験: DATA_PROVIDER=synthetic かつ SYNTHETIC_UNIVERSE=N で合成ユニバース（N銘柄）に差し替え
+if os.getenv("DATA_PROVIDER", "").strip().lower() == "synthetic" and _ei("SYNTHETIC_UNIVERSE", 0) > 0:
+    from .synthetic import synthetic_tickers
+    TICKERS = synthetic_tickers(_ei("SYNTHETIC_UNIVERSE", 0))
@@ -0,0 +1,232 @@
+"""
+content_writer.py — frontend/public/content 向け JSON の共通書き出し
+======================================================================
+各ジェネレータの json.dumps(..., indent=2) を置き換える。データ構造は変えず、表現だけを小さくする。
+
+  - 最小化 JSON（orjson があれば orjson、無ければ標準 json の separators 指定）
+  - 同じ場所に .gz / .br（brotli があれば）を事前圧縮して置く（gzip_static 等でそのまま配信できる）
+  - 内容ハッシュ（sha256 先頭12桁）を content/manifest.json に記録
+    フロントエンドは manifest のハッシュを ?v= に付けて取得する（hooks/useContent.js）
+  - 本体・圧縮ファイル・manifest はすべて一時ファイル → rename でアトミックに置き換え
+
+NaN / Inf は null として書く（標準 json の NaN はブラウザの JSON.parse で読めないため）。
+
+write_strategies() は strategies.json を index + シャード（ランキング・フェーズ・手法比較ごと）に分けて書く。
+"""
+from __future__ import annotations
+
+import os, re, gzip, json, math, hashlib
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_NAME  = "manifest.json"
+GZIP_LEVEL     = 9
+BROTLI_QUALITY = 11
+MIN_COMPRESS   = 1024   # これより小さいファイルは圧縮しても小さくならないので素のまま
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# シリアライズ
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _default(o):
+    """numpy スカラー・配列や date など、JSON に無い型"""
+    if hasattr(o, "tolist"):
+        return o.tolist()
+    if hasattr(o, "isoformat"):
+        return o.isoformat()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _clean(o):
+    """標準 json 用: NaN / Inf → None（orjson は自前で null にする）"""
+    if isinstance(o, float):
+        return o if math.isfinite(o) else None
+    if isinstance(o, dict):
+        return {k: _clean(v) for k, v in o.items()}
+    if isinstance(o, (list, tuple)):
+        return [_clean(v) for v in o]
+    return o
+
+
+def _clean_default(o):
+    """標準 json 用の default: 変換結果（numpy 配列の tolist() など）にも NaN / Inf が残るので _clean を通す"""
+    return _clean(_default(o))
+
+
+def dumps(obj) -> bytes:
+    """最小化 JSON（UTF-8 バイト列）"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_clean(obj), ensure_ascii=False, separators=(",", ":"),
+                      default=_clean_default, allow_nan=False).encode("utf-8")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 書き出し
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _atomic_write(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _manifest_root(path: Path) -> Path:
+    """path が属する content ディレクトリ（manifest.json を置く場所）"""
+    for parent in path.parents:
+        if parent.name == "content":
+            return parent
+    return path.parent
+
+
+def write_json(path, obj, compress: bool = True, manifest: bool = True) -> dict:
+    """
+    obj を最小化 JSON で path に保存し、.gz / .br を添える。
+    返り値: {"hash", "bytes", "gz", "br"}（manifest.json の1エントリと同じ）
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data  = dumps(obj)
+    entry = {"hash": content_hash(data), "bytes": len(data), "gz": None, "br": None}
+
+    gz_path = path.with_name(path.name + ".gz")
+    br_path = path.with_name(path.name + ".br")
+    compress = compress and len(data) >= MIN_COMPRESS
+    _atomic_write(path, data)
+    if compress:
+        gz = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)  # mtime=0: 同じ内容なら同じバイト列
+        _atomic_write(gz_path, gz)
+        entry["gz"] = len(gz)
+    if compress and brotli is not None:
+        br = brotli.compress(data, quality=BROTLI_QUALITY)
+        _atomic_write(br_path, br)
+        entry["br"] = len(br)
+    # 書かなかった圧縮版が前回のまま残ると中身が食い違うので消す
+    if entry["gz"] is None:
+        gz_path.unlink(missing_ok=True)
+    if entry["br"] is None:
+        br_path.unlink(missing_ok=True)
+
+    if manifest:
+        root = _manifest_root(path)
+        update_manifest(root, {path.relative_to(root).as_posix(): entry})
+    return entry
+
+
+def read_json(path, default=None):
+    """write_json で書いたファイル（または従来の整形 JSON）を読む。無い・壊れているときは default"""
+    try:
+        data = Path(path).read_bytes()
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    except Exception:
+        return default
+
+
+def update_manifest(root, entries: dict, remove: list | None = None):
+    """content/manifest.json の files に entries をマージ（remove のキーは削除）"""
+    path  = Path(root) / MANIFEST_NAME
+    files = (read_json(path, {}) or {}).get("files", {})
+    files.update(entries)
+    for key in remove or ():
+        files.pop(key, None)
+    _atomic_write(path, dumps({"files": dict(sorted(files.items()))}))
+
+
+def remove(path):
+    """path と .gz / .br を削除し、manifest からも外す"""
+    path = Path(path)
+    for p in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+        p.unlink(missing_ok=True)
+    root = _manifest_root(path)
+    update_manifest(root, {}, remove=[path.relative_to(root).as_posix()])
+
+
+def write_tree(out_dir, files: dict, recursive: bool = False, manifest: bool = True, keep=()) -> dict:
+    """
+    out_dir 配下に {相対パス: obj} をまとめて書き、今回書かなかった *.json（と .gz / .br）を削除する。
+    keep の相対パスは書かなくても消さない。manifest は最後に1回だけ更新する。{相対パス: エントリ} を返す。
+    manifest=False なら manifest に載せない（以前載っていたエントリは外す）。ファイル数が多く、
+    ハッシュを別の index に持たせるもの向け（manifest は全ページが最初に取得するので小さく保つ）
+    """
+    out_dir = Path(out_dir)
+    root    = _manifest_root(out_dir / "_")
+    entries = {rel: write_json(out_dir / rel, obj, manifest=False) for rel, obj in files.items()}
+
+    found = out_dir.rglob("*.json") if recursive else out_dir.glob("*.json")
+    stale = [p for p in found if p.relative_to(out_dir).as_posix() not in files
+             and p.relative_to(out_dir).as_posix() not in keep]
+    for p in stale:
+        for q in (p, p.with_name(p.name + ".gz"), p.with_name(p.name + ".br")):
+            q.unlink(missing_ok=True)
+    key = lambda rel: (out_dir / rel).relative_to(root).as_posix()
+    update_manifest(root,
+                    {key(rel): e for rel, e in entries.items()} if manifest else {},
+                    remove=[p.relative_to(root).as_posix() for p in stale] +
+                           ([] if manifest else [key(rel) for rel in entries]))
+    return entries
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# strategies の分割出力（ページが描画する分だけ取得できるように）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") or "other"
+
+
+def write_strategies(out_dir, output: dict) -> dict:
+    """
+    strategies.json 相当の output を out_dir（content/strategies）に分割して書く。
+
+      index.json             … 生成日・件数と各シャードのファイル名・件数（最初に読む小さなファイル）
+      rankings/{name}.json   … ランキング順の銘柄行（シャード単体で表示できる）
+      phases/{phase}.json    … そのフェーズの銘柄行
+      method_comparison.json … 手法比較ブロック
+      rows.json              … rankings / ecr_phases に出てくる全銘柄の行（銘柄ごとに1行）。
+                               銘柄横断の検索（レーダー・リアルタイム表示）用で、シャードの表示には不要
+
+    前回あって今回無いシャード（消えたフェーズなど）は削除する。index.json を返す。
+    """
+    out_dir = Path(out_dir)
+    rows    = {}
+
+    def collect(items: list) -> list:
+        for r in items:
+            rows.setdefault(r["ticker"], r)
+        return items
+
+    shards = {}
+    index  = {k: v for k, v in output.items() if k not in ("rankings", "ecr_phases", "method_comparison")}
+    index["rankings"] = {}
+    for name, items in output.get("rankings", {}).items():
+        path = f"rankings/{_slug(name)}.json"
+        shards[path] = collect(items)
+        index["rankings"][name] = {"file": path, "count": len(items)}
+    index["ecr_phases"] = {}
+    for phase, items in output.get("ecr_phases", {}).items():
+        path = f"phases/{_slug(phase)}.json"
+        shards[path] = collect(items)
+        index["ecr_phases"][phase] = {"file": path, "count": len(items)}
+    shards["method_comparison.json"] = output.get("method_comparison", [])
+    index["method_comparison"] = {"file": "method_comparison.json"}
+    shards["rows.json"] = list(rows.values())
+    index["rows"] = {"file": "rows.json", "count": len(rows)}
+    shards["index.json"] = index
+
+    write_tree(out_dir, shards, recursive=True)
+    return index
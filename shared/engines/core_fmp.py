@@ -3,35 +3,115 @@ core_fmp.py — FMP API Client (Starter Plan)
 ============================================
 FMPの新エンドポイント (/stable/) 対応版。
 機関投資家データの取得ロジックを強化し、Mag7等の大型株に対応。
+
+api/stock ハンドラの読み出し経路（get_quote / get_quotes）からも import されるため、
+pandas / requests / synthetic は使う関数の中で import する（コールドスタートで読み込まない）。
+キャッシュディレクトリも import 時には作らず、最初の書き込みで作る。
 """
-import os, requests, json, hashlib, time
+from __future__ import annotations
+
+import os, io, json, hashlib, time, datetime, threading, tempfile
 from pathlib import Path
-import pandas as pd
+
+try:
+    from . import cache_policy
+    from . import market_calendar as cal
+    from .ratelimit import FMP_LIMITER
+except ImportError:
+    import cache_policy
+    import market_calendar as cal
+    from ratelimit import FMP_LIMITER
 
 FMP_API_KEY  = os.environ.get("FMP_API_KEY", "")
 BASE_URL     = "https://financialmodelingprep.com/stable"
 BASE_URL_V3  = "https://financialmodelingprep.com/api/v3"  # フォールバック用
-CACHE_DIR    = Path(__file__).parent.parent.parent / "cache"
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def _default_cache_dir() -> Path:
+    """
+    FMP_CACHE_DIR > リポジトリの cache/ > 一時ディレクトリ。
+    サーバーレス（Vercel）では関数のファイルシステムが読み取り専用で /tmp だけ書けるため。
+    """
+    if os.environ.get("FMP_CACHE_DIR"):
+        return Path(os.environ["FMP_CACHE_DIR"])
+    repo_cache = Path(__file__).parent.parent.parent / "cache"
+    writable = repo_cache if repo_cache.exists() else repo_cache.parent
+    if os.access(writable, os.W_OK):
+        return repo_cache
+    return Path(tempfile.gettempdir()) / "sentinel-cache"
+
+
+CACHE_DIR    = _default_cache_dir()
+
+# データソース切替: "fmp"（既定）/ "synthetic"（負荷試験用・ネットワーク不使用）
+DATA_PROVIDER = os.environ.get("DATA_PROVIDER", "fmp").strip().lower() or "fmp"
+
+
+def _synthetic():
+    """合成データ生成（pandas を読み込むので合成モードのときだけ import）"""
+    try:
+        from . import synthetic
+    except ImportError:
+        import synthetic
+    return synthetic
+
+
+def _write_cache_file(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # キャッシュ付きGET（429リトライ機能付き）
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-def _get(url: str, params: dict = None, cache_key: str = None, ttl: int = 3600):
+def _cache_file(cache_key: str) -> Path:
+    return CACHE_DIR / f"{hashlib.md5(cache_key.encode()).hexdigest()}.json"
+
+
+def _read_cache(cache_key: str, ttl: int = 3600, policy: str = None, ticker: str = None):
+    """有効なキャッシュがあれば中身、無い・期限切れ・破損なら None（hit / stale / miss を記録）"""
+    cache_file = _cache_file(cache_key)
+    label = policy or "fixed"
+    if not cache_file.exists():
+        cache_policy.record(label, "miss")
+        return None
+    written, now = cache_file.stat().st_mtime, time.time()
+    if policy:
+        earnings = _earnings_dates(ticker) if policy == "fundamentals" and ticker else ()
+        fresh = cache_policy.is_fresh(policy, written, now, earnings)
+    else:
+        fresh = now - written < ttl
+    if fresh:
+        try:
+            data = json.loads(cache_file.read_text())
+            cache_policy.record(label, "hit")
+            return data
+        except:
+            pass  # キャッシュ破損時は無視
+    cache_policy.record(label, "stale")
+    return None
+
+
+def _get(url: str, params: dict = None, cache_key: str = None, ttl: int = 3600,
+         policy: str = None, ticker: str = None):
+    """
+    policy を指定するとキャッシュの有効期限を cache_policy（取引セッション基準）で判定し、ttl は使わない。
+    policy="fundamentals" は ticker の決算発表日を過ぎたキャッシュも期限切れにする。
+    """
+    if DATA_PROVIDER == "synthetic":
+        return None  # 合成モードでは外部APIを一切呼ばない（各呼び出し側は None を「データなし」として扱う）
+
     params = params or {}
     if cache_key:
-        h = hashlib.md5(cache_key.encode()).hexdigest()
-        cache_file = CACHE_DIR / f"{h}.json"
-        if cache_file.exists() and (time.time() - cache_file.stat().st_mtime < ttl):
-            try:
-                return json.loads(cache_file.read_text())
-            except:
-                pass  # キャッシュ破損時は無視
+        cache_file = _cache_file(cache_key)
+        data = _read_cache(cache_key, ttl, policy, ticker)
+        if data is not None:
+            return data
+    import requests   # キャッシュヒットだけで返るときは読み込まない
 
-    # --- 429対策: リクエスト前に常に短いウェイトを置く ---
-    time.sleep(0.25)
+    # --- 429対策: プロセス共通のトークンバケットで総リクエストレートを制限 ---
+    FMP_LIMITER.acquire()
 
     max_retries = 5
     for i in range(max_retries):
@@ -52,7 +132,7 @@ def _get(url: str, params: dict = None, cache_key: str = None, ttl: int = 3600):
             resp.raise_for_status()
             data = resp.json()
             if cache_key and data:
-                cache_file.write_text(json.dumps(data))
+                _write_cache_file(cache_file, json.dumps(data))
             return data
 
         except Exception as e:
@@ -72,8 +152,15 @@ def get_historical_data(ticker: str, days: int = 365) -> pd.DataFrame | None:
     """
     /stable/historical-price-eod/full?symbol={ticker}
     返り値: DatetimeIndex付きDataFrame (OHLCV)
+    キャッシュは次の引け + DATA_DELAY まで有効（cache_policy "eod"）
+    DATA_PROVIDER=synthetic の場合は合成データを返す
     """
-    data = _get(f"{BASE_URL}/historical-price-eod/full", {"symbol": ticker})
+    if DATA_PROVIDER == "synthetic":
+        return _synthetic().generate_ohlcv(ticker, days)
+    import pandas as pd
+
+    data = _get(f"{BASE_URL}/historical-price-eod/full", {"symbol": ticker},
+                cache_key=f"eod_{ticker}", policy="eod")
 
     # 【修正】Stable API はリストが直接返ってくる、それ以外は "historical" キーを探す
     hist = None
@@ -114,6 +201,117 @@ def get_historical_data(ticker: str, days: int = 365) -> pd.DataFrame | None:
     return df[["Open", "High", "Low", "Close", "Volume"]]
 
 
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 一括EOD（全銘柄の1日分）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _eod_final(date: str, written: float | None = None) -> bool:
+    """
+    その日の EOD が確定しているか（latest_completed_session 以前）。
+    written（UNIX 秒）を渡すと、その時刻に取得したデータが確定後のものかも見る。
+    """
+    d = datetime.date.fromisoformat(date)
+    if d > cal.latest_completed_session():
+        return False
+    if written is None or not cal.is_trading_day(d):
+        return True
+    return written >= (cal.session_close(d) + cal.DATA_DELAY).timestamp()
+
+
+def get_eod_bulk(date: str, symbols: list | None = None) -> pd.DataFrame | None:
+    """
+    /stable/eod-bulk?date=YYYY-MM-DD — 全銘柄のその日の OHLCV を1リクエストで取得
+    返り値: 列 symbol / date / Open / High / Low / Close / Volume の DataFrame（休場日は空）
+    応答は CSV（JSON の場合も受け付ける）。確定済み（引け + DATA_DELAY 後に取得した）日付だけ長期キャッシュする。
+    ザラ場中・引け直後に取った途中のデータはキャッシュせず、確定前に書かれたキャッシュも使わない。
+    symbols 指定時はその銘柄だけに絞る（DATA_PROVIDER=synthetic では生成対象になる）
+    """
+    if DATA_PROVIDER == "synthetic":
+        return _synthetic().synthetic_eod_bulk(date, symbols)
+    import pandas as pd
+    import requests
+
+    cache_file = CACHE_DIR / f"eod_bulk_{date}.csv"
+    final = _eod_final(date)
+    text = None
+    if final and cache_file.exists() and _eod_final(date, cache_file.stat().st_mtime):
+        text = cache_file.read_text()
+    cached = text is not None
+    if not cached:
+        FMP_LIMITER.acquire()
+        try:
+            resp = requests.get(f"{BASE_URL}/eod-bulk",
+                                params={"date": date, "apikey": FMP_API_KEY}, timeout=120)
+            if resp.status_code != 200:
+                print(f"FMP eod-bulk {date}: HTTP {resp.status_code}")
+                return None
+            text = resp.text
+        except Exception as e:
+            print(f"FMP eod-bulk error {date}: {e}")
+            return None
+
+    try:
+        if text.lstrip().startswith(("[", "{")):
+            data = json.loads(text)
+            df = pd.DataFrame(data if isinstance(data, list) else data.get("data", []))
+        else:
+            df = pd.read_csv(io.StringIO(text))
+    except Exception as e:
+        print(f"FMP eod-bulk parse error {date}: {e}")
+        return None
+
+    cols = {"symbol": "symbol", "date": "date", "open": "Open", "high": "High",
+            "low": "Low", "close": "Close", "volume": "Volume"}
+    if df.empty:
+        return pd.DataFrame(columns=list(cols.values()))
+    if not all(c in df.columns for c in cols):
+        print(f"FMP eod-bulk {date}: unexpected columns {list(df.columns)[:10]}")
+        return None
+    if final and not cached:
+        _write_cache_file(cache_file, text)   # 確定前に書かれた古いファイルもここで置き換わる
+
+    df = df[list(cols)].rename(columns=cols)
+    df["date"] = pd.to_datetime(df["date"])
+    if symbols is not None:
+        df = df[df["symbol"].isin(set(symbols))]
+    return df.reset_index(drop=True)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 決算カレンダー（fundamentals キャッシュの失効判定用）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+_earnings_lock = threading.Lock()
+_earnings_memo = {}
+
+
+def get_earnings_calendar(start: str, end: str) -> dict:
+    """
+    /stable/earnings-calendar?from=&to= — 期間内の決算発表日を全銘柄まとめて取得
+    返り値: {ticker: [date, ...]}（DATA_PROVIDER=synthetic では空）
+    """
+    data = _get(f"{BASE_URL}/earnings-calendar", {"from": start, "to": end},
+                cache_key=f"earnings_cal_{start}_{end}", policy="eod")
+    out = {}
+    for row in data if isinstance(data, list) else []:
+        try:
+            out.setdefault(row["symbol"], []).append(datetime.date.fromisoformat(row["date"][:10]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return out
+
+
+def _earnings_dates(ticker: str) -> list:
+    """直近 FUNDAMENTALS_MAX 日の決算発表日。カレンダーは1日1回だけ取得してプロセス内で使い回す"""
+    today = datetime.date.today()
+    with _earnings_lock:
+        if today not in _earnings_memo:
+            start = today - cache_policy.FUNDAMENTALS_MAX - datetime.timedelta(days=1)
+            _earnings_memo.clear()
+            _earnings_memo[today] = get_earnings_calendar(start.isoformat(), today.isoformat())
+        return _earnings_memo[today].get(ticker, [])
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # ニュース — 確認済み ✅
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -122,18 +320,18 @@ def get_news(ticker: str, limit: int = 5) -> list:
     """
     /stable/news/stock-latest?page=0&limit={limit}
     パラメータ: symbol={ticker} or tickers={ticker} を試行
-    6時間キャッシュ
+    6時間キャッシュ（cache_policy "news"）
     """
     # 試行1: symbol=AAPL
     data = _get(f"{BASE_URL}/news/stock-latest",
                 {"page": 0, "limit": limit, "symbol": ticker},
-                cache_key=f"news_{ticker}", ttl=6*3600)
+                cache_key=f"news_{ticker}", policy="news")
 
     # 試行2: tickers=AAPL（v3互換）
     if not data or not isinstance(data, list):
         data = _get(f"{BASE_URL}/news/stock-latest",
                     {"page": 0, "limit": limit, "tickers": ticker},
-                    cache_key=f"news2_{ticker}", ttl=6*3600)
+                    cache_key=f"news2_{ticker}", policy="news")
 
     if not isinstance(data, list):
         return []
@@ -155,8 +353,13 @@ def get_quote(ticker: str) -> dict | None:
     """
     /stable/quote?symbol={ticker}
     Returns: {price, change, changesPercentage, volume, dayHigh, dayLow, ...}
+    キャッシュはザラ場中 QUOTE_TTL 秒、時間外は次の寄り付きまで（cache_policy "quote"）
     """
-    data = _get(f"{BASE_URL}/quote", {"symbol": ticker})
+    if DATA_PROVIDER == "synthetic":
+        return _synthetic().synthetic_quote(ticker)
+
+    data = _get(f"{BASE_URL}/quote", {"symbol": ticker},
+                cache_key=f"quote_{ticker}", policy="quote")
 
     # レスポンスが配列の場合
     if isinstance(data, list) and data:
@@ -169,6 +372,36 @@ def get_quote(ticker: str) -> dict | None:
     return None
 
 
+QUOTE_BATCH = 100   # batch-quote 1回あたりの銘柄数
+
+
+def get_quotes(tickers: list) -> dict:
+    """
+    /stable/batch-quote?symbols=A,B,... で複数銘柄のクォートをまとめて取得 → {ticker: quote}
+    銘柄ごとの quote キャッシュ（get_quote と共用）を先に見て、期限切れ・未取得の銘柄だけを取りに行く。
+    """
+    if DATA_PROVIDER == "synthetic":
+        return {t: _synthetic().synthetic_quote(t) for t in tickers}
+
+    out, missing = {}, []
+    for t in dict.fromkeys(tickers):
+        data = _read_cache(f"quote_{t}", policy="quote")
+        if isinstance(data, list) and data:
+            out[t] = data[0]
+        else:
+            missing.append(t)
+
+    for i in range(0, len(missing), QUOTE_BATCH):
+        chunk = missing[i:i + QUOTE_BATCH]
+        data  = _get(f"{BASE_URL}/batch-quote", {"symbols": ",".join(chunk)})
+        for q in data if isinstance(data, list) else []:
+            t = q.get("symbol")
+            if t in chunk:
+                out[t] = q
+                _write_cache_file(_cache_file(f"quote_{t}"), json.dumps([q]))
+    return out
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 会社プロフィール
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -176,16 +409,19 @@ def get_quote(ticker: str) -> dict | None:
 def get_company_profile(ticker: str) -> dict | None:
     """
     /stable/profile?symbol={ticker} を試行
-    24時間キャッシュ
+    7日キャッシュ（cache_policy "profile"）
     """
+    if DATA_PROVIDER == "synthetic":
+        return _synthetic().synthetic_profile(ticker)
+
     data = _get(f"{BASE_URL}/profile", {"symbol": ticker},
-                cache_key=f"profile_{ticker}", ttl=24*3600)
+                cache_key=f"profile_{ticker}", policy="profile")
     if data and isinstance(data, list) and data:
         return data[0]
 
     # フォールバック: /v3/profile/{ticker}
     data = _get(f"{BASE_URL_V3}/profile/{ticker}",
-                cache_key=f"profile_v3_{ticker}", ttl=24*3600)
+                cache_key=f"profile_v3_{ticker}", policy="profile")
     return data[0] if isinstance(data, list) and data else None
 
 
@@ -197,17 +433,17 @@ def get_analyst_consensus(ticker: str) -> dict | None:
     """
     /stable/price-target-summary?symbol={ticker} — 目標株価平均
     /stable/analyst-stock-recommendations?symbol={ticker} — Buy/Hold/Sell内訳
-    24時間キャッシュ
+    次の引け後まで有効なキャッシュ（cache_policy "eod"）
     """
     # 目標株価サマリー
     target = _get(f"{BASE_URL}/price-target-summary",
                   {"symbol": ticker},
-                  cache_key=f"target_{ticker}", ttl=24*3600)
+                  cache_key=f"target_{ticker}", policy="eod")
 
     # アナリスト内訳
     recommendations = _get(f"{BASE_URL}/analyst-stock-recommendations",
                            {"symbol": ticker},
-                           cache_key=f"analyst_{ticker}", ttl=24*3600)
+                           cache_key=f"analyst_{ticker}", policy="eod")
 
     # Buy/Hold/Sell集計
     buy = sell = hold = 0
@@ -266,18 +502,18 @@ def get_fundamentals(ticker: str) -> dict | None:
     """
     /stable/key-metrics?symbol={ticker}&period=annual&limit=1
     /stable/income-statement-growth?symbol={ticker}&limit=1
-    24時間キャッシュ
+    最大7日・決算発表日を過ぎたら再取得（cache_policy "fundamentals"）
     """
     # Key Metrics (最新年度)
     km = _get(f"{BASE_URL}/key-metrics",
               {"symbol": ticker, "period": "annual", "limit": 1},
-              cache_key=f"keymetrics_{ticker}", ttl=24*3600)
+              cache_key=f"keymetrics_{ticker}", policy="fundamentals", ticker=ticker)
     km = km[0] if isinstance(km, list) and km else {}
 
     # Income Statement Growth (最新年度)
     ig = _get(f"{BASE_URL}/income-statement-growth",
               {"symbol": ticker, "period": "annual", "limit": 1},
-              cache_key=f"incgrowth_{ticker}", ttl=24*3600)
+              cache_key=f"incgrowth_{ticker}", policy="fundamentals", ticker=ticker)
     ig = ig[0] if isinstance(ig, list) and ig else {}
 
     def _pct(v):
@@ -327,7 +563,7 @@ def get_ownership(ticker: str) -> dict | None:
         # キャッシュキーは inst_own_{ticker} で管理
         own_data = _get(f"{BASE_URL}/institutional-ownership",
                         {"symbol": ticker, "limit": 1},
-                        cache_key=f"inst_own_{ticker}", ttl=24*3600)
+                        cache_key=f"inst_own_{ticker}", policy="fundamentals", ticker=ticker)
         
         # 形式: [{"symbol": "AAPL", "ownershipPercent": 0.58, ...}]
         if own_data and isinstance(own_data, list):
@@ -0,0 +1,70 @@
+"""
+http_cache.py — API レスポンスの HTTP キャッシュ（ETag / 304 / Cache-Control）
+=============================================================================
+api/stock・api/stocks のハンドラが (body, status, headers) を返すための共通処理。
+
+  ETag          … 強い ETag "{データ日付}-{レスポンスの sha256 先頭16桁}"
+                  スコア・売買水準・クォートで上書きした価格のどれかが変われば変わる
+  If-None-Match … 一致すれば本文無しの 304
+  Cache-Control … ブラウザは max-age=0（毎回 ETag で再検証）、Vercel のエッジは s-maxage まで保持
+                  ザラ場中   : s-maxage = cache_policy.QUOTE_TTL（クォートの有効期限に合わせる）
+                  時間外     : 次の寄り付き / 次の EOD データのうち早い方まで（最大 MAX_S_MAXAGE）
+                  stale-while-revalidate でエッジは期限切れ直後も古い応答を返しつつ裏で取り直す
+
+標準ライブラリと market_calendar / cache_policy だけに依存する（ハンドラの読み出し経路で使うため）。
+"""
+from __future__ import annotations
+
+import json, time, hashlib
+from datetime import datetime
+
+from . import cache_policy
+from . import market_calendar as cal
+
+SESSION_SWR   = 60          # ザラ場中の stale-while-revalidate（秒）
+CLOSED_SWR    = 3600        # 時間外
+MAX_S_MAXAGE  = 6 * 3600    # 時間外でも日次スナップショットの入れ替え（デプロイ）を拾える長さに抑える
+ERROR_CONTROL = "no-store"
+
+
+def etag(body, data_date: str = "") -> str:
+    raw = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return f'"{data_date}-{hashlib.sha256(raw).hexdigest()[:16]}"'
+
+
+def cache_control(now: float | None = None) -> str:
+    """今の市場セッションに合わせた Cache-Control"""
+    now = time.time() if now is None else now
+    if cache_policy.in_session(datetime.fromtimestamp(now, cal.ET)):
+        return f"public, max-age=0, s-maxage={cache_policy.QUOTE_TTL}, stale-while-revalidate={SESSION_SWR}"
+    until = min(cache_policy.expires_at("quote", now), cache_policy.expires_at("eod", now))
+    s_maxage = int(max(cache_policy.QUOTE_TTL, min(MAX_S_MAXAGE, until - now)))
+    return f"public, max-age=0, s-maxage={s_maxage}, stale-while-revalidate={CLOSED_SWR}"
+
+
+def _matches(if_none_match: str, tag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match は弱い比較（W/ 付きも同じ ETag とみなす）
+    return any(t.strip().removeprefix("W/") == tag for t in if_none_match.split(","))
+
+
+def _header(request, name: str) -> str:
+    headers = getattr(request, "headers", None) or {}
+    return headers.get(name) or headers.get(name.lower()) or ""
+
+
+def respond(request, body, data_date: str = "", now: float | None = None) -> tuple:
+    """200 または 304 の (body, status, headers)"""
+    tag     = etag(body, data_date)
+    headers = {"ETag": tag, "Cache-Control": cache_control(now)}
+    if _matches(_header(request, "If-None-Match"), tag):
+        return "", 304, headers
+    return body, 200, headers
+
+
+def error(body, status: int) -> tuple:
+    """エラー応答はキャッシュさせない"""
+    return body, status, {"Cache-Control": ERROR_CONTROL}
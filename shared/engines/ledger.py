@@ -0,0 +1,167 @@
+"""
+ledger.py — バックテスト取引台帳（カラムナ保存）
+==================================================
+generate_backtest の全トレードを圧縮 Parquet に保存する。
+
+  - method_scores（ネストdict）は score_* 列へフラット化
+  - entry_month 列（YYYY-MM）を付与し、月次フィルタを列述語で実行
+  - 読み出しは必要な列・行だけを pyarrow で読み、集計は pandas の列演算のみ
+    （全トレードを Python dict に展開しない）
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import DATA_DIR
+
+LEDGER_FILE  = DATA_DIR / "backtest" / "trades.parquet"
+SCORE_PREFIX = "score_"
+
+# 低カーディナリティ列は category で保持（ファイル・メモリ共に削減）
+_CATEGORY_COLS = ["ticker", "type", "entry_month", f"{SCORE_PREFIX}ecr_phase"]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 書き込み
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def trades_to_frame(trades: list) -> pd.DataFrame:
+    """トレードdictのリスト → フラットな DataFrame（score_* 列付き）"""
+    if not trades:
+        return pd.DataFrame()
+    base   = pd.DataFrame([{k: v for k, v in t.items() if k != "method_scores"} for t in trades])
+    scores = pd.DataFrame([t.get("method_scores") or {} for t in trades]).add_prefix(SCORE_PREFIX)
+    df = pd.concat([base, scores], axis=1)
+    df["entry_month"] = df["entry_date"].astype(str).str[:7]
+    for col in _CATEGORY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def write_ledger(trades: list, path: Path = LEDGER_FILE) -> int:
+    """全トレードを zstd 圧縮 Parquet に保存（一時ファイル → rename でアトミック）。件数を返す"""
+    df = trades_to_frame(trades)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    df.to_parquet(tmp, compression="zstd", index=False)
+    os.replace(tmp, path)
+    return len(df)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 読み出し・集計
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _as_list(v):
+    return None if v is None else ([v] if isinstance(v, str) else list(v))
+
+
+def query_ledger(path: Path = LEDGER_FILE,
+                 method_filter=None,
+                 ticker=None,
+                 month=None,
+                 columns: list | None = None) -> pd.DataFrame:
+    """
+    台帳をフィルタして DataFrame で返す。
+
+    Parameters
+    ----------
+    method_filter : scores を受け取り bool（または bool Series）を返す関数。
+                    generate_backtest.METHOD_FILTERS の値をそのまま渡せる。
+                    引数には score_ 接頭辞を外した列名の DataFrame が渡る。
+    ticker        : 銘柄 or 銘柄リスト（Parquet 側で行フィルタ）
+    month         : "YYYY-MM" or そのリスト（entry_month で行フィルタ）
+    columns       : 読み込む列（省略時は全列）
+    """
+    filters = []
+    if ticker is not None:
+        filters.append(("ticker", "in", _as_list(ticker)))
+    if month is not None:
+        filters.append(("entry_month", "in", _as_list(month)))
+
+    df = pd.read_parquet(path, columns=columns, filters=filters or None)
+    if method_filter is not None:
+        df = apply_method_filter(df, method_filter)
+    return df
+
+
+def apply_method_filter(df: pd.DataFrame, method_filter) -> pd.DataFrame:
+    """読み込み済み台帳 DataFrame に手法フィルタを列演算で適用する"""
+    if df.empty:
+        return df
+    score_cols = [c for c in df.columns if c.startswith(SCORE_PREFIX)]
+    scores = df[score_cols].rename(columns=lambda c: c[len(SCORE_PREFIX):])
+    mask = method_filter(scores)
+    if isinstance(mask, (bool, np.bool_)):
+        return df if mask else df.iloc[0:0]
+    return df[np.asarray(mask, dtype=bool)]
+
+
+def summarize(df: pd.DataFrame, by: str | list | None = None) -> pd.DataFrame:
+    """
+    勝率・PF・期待値を列演算で集計する。
+    by: None（全体1行）/ "ticker" / "entry_month" など任意の列
+    """
+    cols = ["total_trades", "win_rate", "profit_factor", "expectancy", "avg_win", "avg_loss"]
+    if df.empty:
+        return pd.DataFrame(columns=cols)
+
+    pnl = df["pnl_pct"]
+    work = pd.DataFrame({
+        "pnl":  pnl,
+        "win":  (pnl > 0).astype(int),
+        "gain": pnl.where(pnl > 0, 0.0),
+        "loss": (-pnl).where(pnl <= 0, 0.0),
+        "wpnl": pnl.where(pnl > 0),
+        "lpnl": pnl.where(pnl <= 0),
+    })
+    if by is None:
+        g = work.assign(_all="all").groupby("_all")
+    else:
+        keys = [by] if isinstance(by, str) else list(by)
+        g = work.groupby([df[k] for k in keys], observed=True)
+
+    agg = g.agg(
+        total_trades=("pnl", "size"),
+        wins=("win", "sum"),
+        gain=("gain", "sum"),
+        loss=("loss", "sum"),
+        expectancy=("pnl", "mean"),
+        avg_win=("wpnl", "mean"),
+        avg_loss=("lpnl", "mean"),
+    )
+    out = pd.DataFrame(index=agg.index)
+    out["total_trades"]  = agg["total_trades"]
+    out["win_rate"]      = (agg["wins"] / agg["total_trades"] * 100).round(1)
+    out["profit_factor"] = (agg["gain"] / agg["loss"].replace(0, np.nan)).round(2)
+    out["expectancy"]    = agg["expectancy"].round(2)
+    out["avg_win"]       = agg["avg_win"].fillna(0).round(2)
+    out["avg_loss"]      = agg["avg_loss"].fillna(0).round(2)
+    return out
+
+
+def summarize_by_method(method_filters: dict, path: Path = LEDGER_FILE,
+                        ticker=None, month=None) -> dict:
+    """手法ごとの集計 {method: {total_trades, win_rate, ...}}"""
+    base = query_ledger(path, ticker=ticker, month=month)
+    result = {}
+    for name, filt in method_filters.items():
+        rows = summarize_records(apply_method_filter(base, filt))
+        result[name] = rows[0] if rows else {"total_trades": 0}
+    return result
+
+
+def summarize_records(df: pd.DataFrame, by: str | list | None = None) -> list:
+    """summarize() の結果を JSON 化可能な dict のリストで返す（NaN → None）"""
+    out = summarize(df, by)
+    if by is not None:
+        out = out.reset_index()
+    out = out.astype(object).where(out.notna(), None)
+    return [{k: (v.item() if hasattr(v, "item") else v) for k, v in r.items()}
+            for r in out.to_dict("records")]
@@ -0,0 +1,189 @@
+"""
+llm.py — 記事・市況ジェネレータ共通の LLM 呼び出し
+====================================================
+OpenAI 互換の /chat/completions を requests で叩く。各スクリプトの逐次呼び出し（固定 sleep 付き）を置き換える。
+
+  - complete_many() はスレッドプールで並列実行し、総レートは LLM_LIMITER（トークンバケット）で制御
+  - 応答キャッシュ: model / system / prompt / パラメータの sha256 をキーに cache/llm/{key}.json
+    （同じ入力の再実行は API を呼ばない。LLM_CACHE=0 で無効）
+  - 1呼び出しごとにトークン数・レイテンシ・キャッシュ有無を data/llm/calls.jsonl に追記
+
+  OPENAI_API_KEY / OPENAI_BASE_URL / OPENAI_MODEL … 接続先（未設定のキーでは呼ばずに "" を返す）
+  LLM_RATE_LIMIT / LLM_RATE_BURST                … 1秒あたりの呼び出し数・バケット容量（既定 1 / 3）
+  LLM_MAX_WORKERS                                 … 同時実行数（既定 4）
+
+失敗時は "" を返す（呼び出し側が定型文にフォールバックする）。失敗した応答はキャッシュしない。
+"""
+from __future__ import annotations
+
+import os, json, time, uuid, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .config import DATA_DIR
+from .ratelimit import TokenBucket
+
+CACHE_DIR     = Path(__file__).parent.parent.parent / "cache" / "llm"
+LOG_FILE      = DATA_DIR / "llm" / "calls.jsonl"
+CACHE_ENABLED = os.environ.get("LLM_CACHE", "1").strip() != "0"
+MAX_WORKERS   = int(os.environ.get("LLM_MAX_WORKERS", "4") or 4)
+TIMEOUT       = 60
+RETRIES       = 2      # 429 / 5xx / 通信エラー時の再試行回数
+RETRY_BACKOFF = 2.0    # 秒（試行ごとに倍）
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL    = "gpt-4"
+
+LLM_LIMITER = TokenBucket(
+    rate=float(os.environ.get("LLM_RATE_LIMIT", "1") or 1),
+    burst=float(os.environ.get("LLM_RATE_BURST", "3") or 3),
+)
+
+RUN_ID = uuid.uuid4().hex[:8]   # calls.jsonl で同じ実行の呼び出しをまとめるため
+
+_lock  = threading.Lock()
+_stats = {"calls": 0, "cached": 0, "failed": 0,
+          "prompt_tokens": 0, "completion_tokens": 0, "latency_sec": 0.0}
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# キャッシュ・記録
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def cache_key(model: str, system: str, prompt: str, params: dict) -> str:
+    """model / system / prompt / パラメータから決まるキャッシュキー"""
+    raw = json.dumps({"model": model, "system": system, "prompt": prompt, "params": params},
+                     sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_read(key: str) -> dict | None:
+    if not CACHE_ENABLED:
+        return None
+    try:
+        return json.loads((CACHE_DIR / f"{key}.json").read_text())
+    except Exception:
+        return None
+
+
+def _cache_write(key: str, entry: dict):
+    if not CACHE_ENABLED:
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / f"{key}.json"
+    tmp  = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(entry, ensure_ascii=False))
+    os.replace(tmp, path)
+
+
+def _log(rec: dict):
+    """calls.jsonl へ1行追記し、実行内の集計に加える"""
+    with _lock:
+        _stats["calls"]             += 1
+        _stats["cached"]            += rec["cached"]
+        _stats["failed"]            += not rec["ok"]
+        _stats["prompt_tokens"]     += rec.get("prompt_tokens") or 0
+        _stats["completion_tokens"] += rec.get("completion_tokens") or 0
+        _stats["latency_sec"]       += rec["latency_sec"]
+        try:
+            LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with LOG_FILE.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"  ⚠️ llm: could not write {LOG_FILE.name}: {e}")
+
+
+def stats() -> dict:
+    with _lock:
+        return {**_stats, "latency_sec": round(_stats["latency_sec"], 2)}
+
+
+def report():
+    s = stats()
+    if not s["calls"]:
+        return
+    print(f"  🤖 llm: {s['calls']} calls ({s['cached']} cached, {s['failed']} failed) / "
+          f"tokens in {s['prompt_tokens']} out {s['completion_tokens']} / {s['latency_sec']}s")
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 呼び出し
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _post(base_url: str, api_key: str, body: dict) -> dict:
+    import requests
+    delay = RETRY_BACKOFF
+    for attempt in range(RETRIES + 1):
+        LLM_LIMITER.acquire()
+        try:
+            resp = requests.post(
+                f"{base_url.rstrip('/')}/chat/completions",
+                headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+                json=body, timeout=TIMEOUT,
+            )
+            if resp.status_code == 429 or resp.status_code >= 500:
+                raise RuntimeError(f"HTTP {resp.status_code}")
+            resp.raise_for_status()
+            return resp.json()
+        except Exception:
+            if attempt == RETRIES:
+                raise
+            time.sleep(delay)
+            delay *= 2
+
+
+def complete(prompt: str, system: str = "", max_tokens: int = 1200, temperature: float | None = None,
+             model: str | None = None, base_url: str | None = None, tag: str = "") -> str:
+    """
+    1回の chat completion。応答テキストを返す（キー未設定・失敗時は ""）。
+    tag は calls.jsonl に残す呼び出し元の名前（"market/SP500/ja" など）。
+    """
+    api_key  = os.environ.get("OPENAI_API_KEY", "")
+    model    = model or os.environ.get("OPENAI_MODEL", DEFAULT_MODEL)
+    base_url = base_url or os.environ.get("OPENAI_BASE_URL", DEFAULT_BASE_URL)
+    params   = {"max_tokens": max_tokens}
+    if temperature is not None:
+        params["temperature"] = temperature
+    key = cache_key(model, system, prompt, params)
+    rec = {"ts": datetime.now(timezone.utc).isoformat(timespec="seconds"), "run": RUN_ID,
+           "tag": tag, "model": model, "key": key[:12], "cached": False, "ok": True}
+
+    hit = _cache_read(key)
+    if hit is not None:
+        _log({**rec, "cached": True, "latency_sec": 0.0, "prompt_tokens": 0, "completion_tokens": 0})
+        return hit["text"]
+    if not api_key:
+        return ""
+
+    messages = ([{"role": "system", "content": system}] if system else [])
+    messages.append({"role": "user", "content": prompt})
+    start = time.monotonic()
+    try:
+        data  = _post(base_url, api_key, {"model": model, "messages": messages, **params})
+        text  = data["choices"][0]["message"]["content"].strip()
+        usage = data.get("usage") or {}
+    except Exception as e:
+        _log({**rec, "ok": False, "error": str(e)[:200], "latency_sec": round(time.monotonic() - start, 3)})
+        print(f"AI error ({tag or model}): {e}")
+        return ""
+
+    rec.update(latency_sec=round(time.monotonic() - start, 3),
+               prompt_tokens=usage.get("prompt_tokens"), completion_tokens=usage.get("completion_tokens"))
+    _log(rec)
+    if text:
+        _cache_write(key, {"model": model, "params": params, "text": text, "usage": usage,
+                           "created": rec["ts"]})
+    return text
+
+
+def complete_many(jobs: dict, max_workers: int = MAX_WORKERS) -> dict:
+    """
+    {名前: complete() のキーワード引数} を並列に実行して {名前: テキスト} を返す。
+    名前は tag の既定値にもなる。
+    """
+    if not jobs:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as pool:
+        futures = {name: pool.submit(complete, **{"tag": str(name), **kw}) for name, kw in jobs.items()}
+        return {name: f.result() for name, f in futures.items()}
@@ -0,0 +1,233 @@
+"""
+market_calendar.py — NYSE 取引カレンダー（オフライン・定数時間ルックアップ）
+============================================================================
+祝日・短縮取引日・臨時休場を 1990〜2060 年分まとめて前計算し、
+「最新の営業日は？」を SPY の取得なしで答える。
+
+  - 祝日: 元日 / キング牧師記念日(1998〜) / ワシントン誕生日 / 聖金曜日 / メモリアルデー /
+          ジューンティーンス(2022〜) / 独立記念日 / レイバーデー / 感謝祭 / クリスマス
+    土曜の祝日は前の金曜、日曜の祝日は翌月曜に振替（ただし元日が土曜のときは前年末を休場にしない）
+  - 短縮取引（13:00 ET 終了）: 独立記念日の前日 / 感謝祭の翌日 / クリスマスイブ
+  - 臨時休場: 国葬・9.11・ハリケーン・サンディなど（SPECIAL_CLOSURES）
+
+ルックアップは暦日オフセット → 配列添字なので O(1)。前計算はモジュール初回利用時に一度だけ行う。
+API ハンドラからも使うので、pandas は sessions() など必要な関数の中でだけ import する。
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time as dtime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+ET          = ZoneInfo("America/New_York")
+FIRST_YEAR  = 1990
+LAST_YEAR   = 2060
+REGULAR_CLOSE = dtime(16, 0)
+EARLY_CLOSE   = dtime(13, 0)
+DATA_DELAY    = timedelta(minutes=30)   # 引け後、EOD データが揃うまでの余裕
+
+SPECIAL_CLOSURES = {
+    date(1994, 4, 27),                       # ニクソン元大統領 国葬
+    date(2001, 9, 11), date(2001, 9, 12),    # 同時多発テロ
+    date(2001, 9, 13), date(2001, 9, 14),
+    date(2004, 6, 11),                       # レーガン元大統領 国葬
+    date(2007, 1, 2),                        # フォード元大統領 国葬
+    date(2012, 10, 29), date(2012, 10, 30),  # ハリケーン・サンディ
+    date(2018, 12, 5),                       # ブッシュ（父）元大統領 国葬
+    date(2025, 1, 9),                        # カーター元大統領 国葬
+}
+
+_EPOCH = date(FIRST_YEAR, 1, 1)
+_END   = date(LAST_YEAR, 12, 31)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 祝日ルール
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n 番目（n<0 なら最後から）の曜日。weekday: 月=0"""
+    if n > 0:
+        d = date(year, month, 1)
+        d += timedelta(days=(weekday - d.weekday()) % 7)
+        return d + timedelta(weeks=n - 1)
+    nxt = date(year + (month == 12), month % 12 + 1, 1)
+    d = nxt - timedelta(days=1)
+    return d - timedelta(days=(d.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """グレゴリオ暦の復活祭（Anonymous Gregorian algorithm）"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _observed(d: date) -> date:
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+def holidays_for_year(year: int) -> set:
+    days = set()
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:               # 土曜の元日は振替なし（NYSE 規則）
+        days.add(_observed(new_year))
+    if year >= 1998:
+        days.add(_nth_weekday(year, 1, 0, 3))     # キング牧師記念日
+    days.add(_nth_weekday(year, 2, 0, 3))         # ワシントン誕生日
+    days.add(_easter(year) - timedelta(days=2))   # 聖金曜日
+    days.add(_nth_weekday(year, 5, 0, -1))        # メモリアルデー
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))    # ジューンティーンス
+    days.add(_observed(date(year, 7, 4)))         # 独立記念日
+    days.add(_nth_weekday(year, 9, 0, 1))         # レイバーデー
+    days.add(_nth_weekday(year, 11, 3, 4))        # 感謝祭
+    days.add(_observed(date(year, 12, 25)))       # クリスマス
+    return days
+
+
+def early_closes_for_year(year: int) -> set:
+    days = set()
+    jul3 = date(year, 7, 3)
+    if jul3.weekday() < 4:                                        # 独立記念日の前日（金曜なら振替休日）
+        days.add(jul3)
+    days.add(_nth_weekday(year, 11, 3, 4) + timedelta(days=1))   # 感謝祭の翌日
+    xmas_eve = date(year, 12, 24)
+    if xmas_eve.weekday() < 4:                                    # 金曜のイブはクリスマスの振替休日
+        days.add(xmas_eve)
+    return days
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 前計算テーブル
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+@lru_cache(maxsize=1)
+def _tables():
+    closed = set(SPECIAL_CLOSURES)
+    early  = set()
+    for y in range(FIRST_YEAR, LAST_YEAR + 1):
+        closed |= holidays_for_year(y)
+        early  |= early_closes_for_year(y)
+
+    n_days   = (_END - _EPOCH).days + 1
+    is_open  = (np.arange(n_days) + _EPOCH.weekday()) % 7 < 5
+    is_open[[(d - _EPOCH).days for d in closed if _EPOCH <= d <= _END]] = False
+    sessions = np.flatnonzero(is_open)                       # 営業日の暦日オフセット
+    # 暦日オフセット → その日以前で最後の営業日の添字（無ければ -1）
+    last_le  = np.cumsum(is_open) - 1
+    early    = {d for d in early if is_open[(d - _EPOCH).days]}
+    return is_open, sessions, last_le, frozenset(early), frozenset(closed)
+
+
+def _offset(d) -> int:
+    d = _as_date(d)
+    if not (_EPOCH <= d <= _END):
+        raise ValueError(f"{d} is outside the calendar range {FIRST_YEAR}-{LAST_YEAR}")
+    return (d - _EPOCH).days
+
+
+def _as_date(d) -> date:
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    if isinstance(d, str):
+        return date.fromisoformat(d[:10])
+    return d.date()  # pandas.Timestamp など
+
+
+def _from_offset(off: int) -> date:
+    return _EPOCH + timedelta(days=int(off))
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 公開 API（日付は date / datetime / "YYYY-MM-DD" / Timestamp を受け付ける）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def is_trading_day(d) -> bool:
+    return bool(_tables()[0][_offset(d)])
+
+
+def is_holiday(d) -> bool:
+    """平日の休場日（祝日・臨時休場）"""
+    return _as_date(d) in _tables()[4]
+
+
+def is_early_close(d) -> bool:
+    return _as_date(d) in _tables()[3]
+
+
+def session_on_or_before(d) -> date:
+    _, sessions, last_le, _, _ = _tables()
+    i = last_le[_offset(d)]
+    if i < 0:
+        raise ValueError(f"no session on or before {d}")
+    return _from_offset(sessions[i])
+
+
+def previous_session(d) -> date:
+    """d より前の直近の営業日"""
+    return session_on_or_before(_as_date(d) - timedelta(days=1))
+
+
+def next_session(d) -> date:
+    """d より後の直近の営業日"""
+    _, sessions, last_le, _, _ = _tables()
+    i = last_le[_offset(d)] + 1
+    if i >= len(sessions):
+        raise ValueError(f"no session after {d}")
+    return _from_offset(sessions[i])
+
+
+def sessions(start, end) -> "pd.DatetimeIndex":
+    """start〜end（両端含む）の営業日"""
+    import pandas as pd
+    _, sess, _, _, _ = _tables()
+    lo = np.searchsorted(sess, _offset(start), side="left")
+    hi = np.searchsorted(sess, _offset(end), side="right")
+    days = np.datetime64(_EPOCH, "D") + sess[lo:hi]
+    return pd.DatetimeIndex(days.astype("datetime64[ns]"), name="date")
+
+
+def session_close(d) -> datetime:
+    """その営業日の引け時刻（ET, tz-aware）"""
+    d = _as_date(d)
+    if not is_trading_day(d):
+        raise ValueError(f"{d} is not a trading day")
+    return datetime.combine(d, EARLY_CLOSE if is_early_close(d) else REGULAR_CLOSE, tzinfo=ET)
+
+
+def latest_completed_session(now: datetime | None = None) -> date:
+    """
+    EOD データが揃っている最新の営業日。
+    今日が営業日で引け + DATA_DELAY を過ぎていれば今日、そうでなければ直前の営業日。
+    """
+    now = (now or datetime.now(ET)).astimezone(ET)
+    today = now.date()
+    if is_trading_day(today) and now >= session_close(today) + DATA_DELAY:
+        return today
+    return previous_session(today)
+
+
+def next_data_time(now: datetime | None = None) -> datetime:
+    """次に新しい EOD データが揃う時刻（次の引け + DATA_DELAY, ET）"""
+    now = (now or datetime.now(ET)).astimezone(ET)
+    d = now.date()
+    if is_trading_day(d) and now < session_close(d) + DATA_DELAY:
+        return session_close(d) + DATA_DELAY
+    return session_close(next_session(d)) + DATA_DELAY
@@ -0,0 +1,103 @@
+"""
+price_store.py — ローカル価格ストア（銘柄ごとの圧縮 Parquet）
+==============================================================
+OHLCV を1銘柄1ファイルで保持する。スキャンの fetch ステージはここへ書き出して DataFrame を手放し、
+score ステージ（別プロセス）は銘柄キーだけを受け取ってここから読み直す。
+キューやワーカー間で DataFrame を持ち回らないので、ユニバースが数千銘柄になってもメモリは一定。
+
+  data/prices/{TICKER}.parquet          （DATA_PROVIDER=fmp）
+  data/prices_{provider}/{TICKER}.parquet（合成データなど。本番ストアを汚さない）
+
+  - index = date（DatetimeIndex）、列 = Open/High/Low/Close/Volume
+  - 書き込みは一時ファイル → rename でアトミック（読み手が途中状態を見ない）
+  - update() は既存の履歴を残したまま新しい区間で上書きする（取得期間より古いバーを失わない）
+  - PRICE_STORE_DIR でルートを上書きできる
+  - _ingest.json に一括EODで取り込み済みの最終日を記録（ingested_through）
+"""
+from __future__ import annotations
+
+import os, json
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .config import DATA_DIR
+
+_PROVIDER   = os.environ.get("DATA_PROVIDER", "fmp").strip().lower() or "fmp"
+PRICE_DIR   = Path(os.environ.get("PRICE_STORE_DIR") or
+                   DATA_DIR / ("prices" if _PROVIDER == "fmp" else f"prices_{_PROVIDER}"))
+OHLCV_COLS  = ["Open", "High", "Low", "Close", "Volume"]
+_STATE_FILE = "_ingest.json"
+
+
+def path_for(ticker: str, root: Path = PRICE_DIR) -> Path:
+    return Path(root) / f"{ticker.replace('/', '_')}.parquet"
+
+
+def write(ticker: str, df: pd.DataFrame, root: Path = PRICE_DIR) -> Path:
+    """銘柄の OHLCV 全体を保存（既存ファイルは置き換え）"""
+    path = path_for(ticker, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    out = df[OHLCV_COLS].rename_axis("date")
+    tmp = path.with_suffix(".parquet.tmp")
+    out.to_parquet(tmp, compression="zstd")
+    os.replace(tmp, path)
+    return path
+
+
+def update(ticker: str, df: pd.DataFrame, root: Path = PRICE_DIR) -> Path:
+    """既存の履歴に df をマージして保存（同じ日付は df 側を優先。古い履歴は残す）"""
+    old = read(ticker, root=root)
+    if old is not None and len(old):
+        df = pd.concat([old[old.index < df.index[0]], df[OHLCV_COLS]]) if len(df) else old
+    return write(ticker, df, root)
+
+
+def read(ticker: str, days: int | None = None, root: Path = PRICE_DIR) -> pd.DataFrame | None:
+    """保存済みの OHLCV（days 指定時は直近 days 本）。無ければ None"""
+    path = path_for(ticker, root)
+    if not path.exists():
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        return None  # 壊れたファイルは「無い」扱い（次の fetch で書き直される）
+    return df.iloc[-days:] if days and len(df) > days else df
+
+
+def tickers(root: Path = PRICE_DIR) -> list:
+    """ストアにある銘柄（ソート済み）"""
+    root = Path(root)
+    return sorted(p.stem for p in root.glob("*.parquet")) if root.exists() else []
+
+
+def last_date(ticker: str, root: Path = PRICE_DIR) -> pd.Timestamp | None:
+    """保存済みの最終バー日（Parquet の列統計から読むのでデータ本体は読まない）"""
+    path = path_for(ticker, root)
+    if not path.exists():
+        return None
+    try:
+        md  = pq.ParquetFile(path).metadata
+        idx = md.schema.names.index("date")
+        mx  = [md.row_group(i).column(idx).statistics.max for i in range(md.num_row_groups)]
+        return pd.Timestamp(max(mx)) if mx else None
+    except Exception:
+        df = read(ticker, root=root)
+        return df.index[-1] if df is not None and len(df) else None
+
+
+def ingested_through(root: Path = PRICE_DIR) -> str | None:
+    """一括EODで取り込み済みの最終日（YYYY-MM-DD）"""
+    path = Path(root) / _STATE_FILE
+    try:
+        return json.loads(path.read_text()).get("through")
+    except Exception:
+        return None
+
+
+def mark_ingested(date: str, root: Path = PRICE_DIR):
+    path = Path(root) / _STATE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if (ingested_through(root) or "") < date:
+        path.write_text(json.dumps({"through": date}))
@@ -0,0 +1,69 @@
+"""
+ratelimit.py — プロセス共通のトークンバケット
+===============================================
+FMP へのリクエスト間隔をスレッドごとの固定 sleep ではなく、
+プロセス全体で共有するバケットで制御する（同時スレッド数を増やしても総レートは一定）。
+
+  FMP_RATE_LIMIT  … 1秒あたりの許容リクエスト数（既定 5 = Starter の 300回/分）
+  FMP_RATE_BURST  … バケット容量（既定 5）
+
+バケットはプロセス内でしか共有されないので、複数プロセスで取得するとき（run_sharded_scan の local など）は
+split_env() で子プロセスごとのレートを 1/N にして渡す（合計が FMP_RATE_LIMIT を超えないように）。
+"""
+from __future__ import annotations
+
+import os, time, threading
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット。acquire() はトークンが貯まるまでブロックする"""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate     = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self._tokens  = self.capacity
+        self._last    = time.monotonic()
+        self._lock    = threading.Lock()
+        self.acquired = 0
+        self.waited   = 0.0   # acquire で待った合計秒数
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last   = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """トークンを取得し、待った秒数を返す（rate <= 0 なら無制限）"""
+        if self.rate <= 0:
+            return 0.0
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.acquired += 1
+                    waited = now - start
+                    self.waited += waited
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)  # ロック外で待つ（他スレッドの refill を妨げない）
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"rate": self.rate, "acquired": self.acquired, "waited_sec": round(self.waited, 2)}
+
+
+FMP_LIMITER = TokenBucket(
+    rate=float(os.environ.get("FMP_RATE_LIMIT", "5") or 5),
+    burst=float(os.environ.get("FMP_RATE_BURST", "5") or 5),
+)
+
+
+def split_env(bucket: TokenBucket, n: int, prefix: str = "FMP") -> dict:
+    """bucket のレート・容量を n プロセスで分け合うための子プロセス用環境変数"""
+    n = max(1, n)
+    return {
+        f"{prefix}_RATE_LIMIT": repr(bucket.rate / n),
+        f"{prefix}_RATE_BURST": repr(max(1.0, bucket.capacity / n)),
+    }
@@ -0,0 +1,145 @@
+"""
+score_history.py — 銘柄 × 日付のスコア履歴（カラムナ保存）と銘柄別の時系列ファイル
+=====================================================================================
+日次 JSON（strategies_history/{date}.json に全銘柄分）を毎日1ファイルずつ増やす代わりに、
+全履歴を1つの Parquet（ticker, date でソート）に持ち、フロントエンド向けには銘柄ごとの
+小さな時系列 JSON を派生させる。チャートは1銘柄1リクエストで済み、保持期間は年単位にできる。
+
+  data/score_history.parquet        列: date / ticker / status / vcp / rs / ecr_rank / canslim / ses / composite / pf
+  content/score_history/index.json  … 保存済みの日付と {銘柄: 内容ハッシュ}（銘柄別ファイルは manifest に載せない）
+  content/score_history/{T}.json    … {"ticker", "dates": [...], "status": [...], "vcp": [...], ...}
+
+  - append() は同じ日付を置き換える（同日の再実行で重複しない）。RETAIN_DAYS より古い日付は落とす
+  - 銘柄別ファイルは直近 SERIES_DAYS 日分（全履歴はストア側）
+  - 旧形式の日次 JSON は import_daily_json() で取り込める
+"""
+from __future__ import annotations
+
+import os, re
+from pathlib import Path
+
+import pandas as pd
+
+from .config import DATA_DIR
+from . import content_writer
+
+HISTORY_FILE = DATA_DIR / "score_history.parquet"
+SCORE_COLS   = ["vcp", "rs", "ecr_rank", "canslim", "ses", "composite", "pf"]
+RETAIN_DAYS  = int(os.environ.get("SCORE_HISTORY_RETAIN_DAYS", "0") or 0) or 5 * 365
+SERIES_DAYS  = 365
+INDEX_NAME   = "index.json"
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# ストア（ticker × date）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def rows_to_frame(date: str, rows: list) -> pd.DataFrame:
+    """strategies の行（ticker / status / scores{...}）→ 1日分の行"""
+    df = pd.DataFrame({
+        "date":   pd.Timestamp(date),
+        "ticker": [r["ticker"] for r in rows],
+        "status": [r.get("status") for r in rows],
+    })
+    for col in SCORE_COLS:
+        df[col] = pd.to_numeric(pd.Series([(r.get("scores") or {}).get(col) for r in rows],
+                                          dtype="object"), errors="coerce")
+    return df
+
+
+def load(path: Path = HISTORY_FILE, tickers: list | None = None, start: str | None = None,
+         columns: list | None = None) -> pd.DataFrame:
+    """ストアを読む（tickers / start は Parquet 側の行フィルタ）"""
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame(columns=["date", "ticker", "status", *SCORE_COLS])
+    filters = []
+    if tickers is not None:
+        filters.append(("ticker", "in", list(tickers)))
+    if start is not None:
+        filters.append(("date", ">=", pd.Timestamp(start)))
+    return pd.read_parquet(path, columns=columns, filters=filters or None)
+
+
+def write(df: pd.DataFrame, path: Path = HISTORY_FILE) -> Path:
+    """ticker, date でソートして zstd Parquet に保存（一時ファイル → rename）"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    out = df.sort_values(["ticker", "date"]).reset_index(drop=True)
+    out["status"] = out["status"].astype("category")
+    tmp = path.with_suffix(".parquet.tmp")
+    out.to_parquet(tmp, compression="zstd", index=False, row_group_size=100_000)
+    os.replace(tmp, path)
+    return path
+
+
+def append(date: str, rows: list, path: Path = HISTORY_FILE, retain_days: int = RETAIN_DAYS) -> pd.DataFrame:
+    """1日分を追加（同じ日付は置き換え）して保存。保存後の全履歴を返す"""
+    old = load(path)
+    new = rows_to_frame(date, rows)
+    cutoff = pd.Timestamp(date) - pd.Timedelta(days=retain_days)
+    keep = old[(old["date"] != new["date"].iloc[0]) & (old["date"] >= cutoff)] if len(new) else old
+    df = pd.concat([keep.astype({"status": "object"}), new], ignore_index=True) if len(keep) else new
+    write(df, path)
+    return df
+
+
+def available_dates(path: Path = HISTORY_FILE) -> list:
+    df = load(path, columns=["date"])
+    return sorted(d.strftime("%Y-%m-%d") for d in df["date"].unique())
+
+
+def import_daily_json(hist_dir, path: Path = HISTORY_FILE) -> int:
+    """旧形式の strategies_history/{date}.json をストアへ取り込む。取り込んだ日数を返す"""
+    frames = []
+    for f in sorted(Path(hist_dir).glob("*.json")):
+        if not re.fullmatch(r"\d{4}-\d{2}-\d{2}\.json", f.name):
+            continue
+        rows = content_writer.read_json(f)
+        if isinstance(rows, list) and rows:
+            frames.append(rows_to_frame(f.stem, rows))
+    if not frames:
+        return 0
+    old = load(path)
+    imported = pd.concat(frames, ignore_index=True)
+    keep = old[~old["date"].isin(imported["date"].unique())]
+    write(pd.concat([keep.astype({"status": "object"}), imported], ignore_index=True), path)
+    return len(frames)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 銘柄別の時系列ファイル（フロントエンド用）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _series(g: pd.DataFrame) -> dict:
+    out = {"ticker": g["ticker"].iloc[0],
+           "dates":  g["date"].dt.strftime("%Y-%m-%d").tolist(),
+           "status": g["status"].astype(object).tolist()}
+    for col in SCORE_COLS:
+        vals = g[col].astype(float)
+        out[col] = [None if pd.isna(v) else (int(v) if float(v).is_integer() else round(float(v), 2))
+                    for v in vals]
+    return out
+
+
+def write_series(out_dir, df: pd.DataFrame | None = None, path: Path = HISTORY_FILE,
+                 days: int = SERIES_DAYS) -> dict:
+    """
+    ストアから content/score_history/{TICKER}.json と index.json を書き出す。
+    履歴から消えた銘柄のファイルは削除する。index.json の内容を返す。
+    """
+    out_dir = Path(out_dir)
+    df = load(path) if df is None else df
+    if len(df):
+        df = df[df["date"] >= df["date"].max() - pd.Timedelta(days=days)]
+    df = df.sort_values(["ticker", "date"])
+
+    names = {ticker: f"{ticker.replace('/', '_')}.json" for ticker in df["ticker"].unique().tolist()}
+    files = {names[ticker]: _series(g) for ticker, g in df.groupby("ticker", sort=True, observed=True)}
+    # 銘柄別ファイル（ユニバース分）は manifest に載せず、ハッシュは index.json に持たせる
+    entries = content_writer.write_tree(out_dir, files, manifest=False, keep=(INDEX_NAME,))
+    dates = sorted(d.strftime("%Y-%m-%d") for d in df["date"].unique())
+    index = {"dates": dates, "first": dates[0] if dates else None, "last": dates[-1] if dates else None,
+             "tickers": {t: entries[names[t]]["hash"] for t in sorted(names) if names[t] in entries}}
+    content_writer.write_json(out_dir / INDEX_NAME, index)
+    return index
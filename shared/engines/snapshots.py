@@ -0,0 +1,186 @@
+"""
+snapshots.py — 日次スコアスナップショット（日付パーティションの Parquet）
+=========================================================================
+スキャンでスコアした全銘柄の行（全スコア・ブレークダウン・売買水準・セクター）を
+1日1パーティションで保存する。content/strategies/ / daily-*.json / strategies_history は
+ここから作る派生ビューで、アドホックなスクリーニングは再スキャンせずにこのストアへ問い合わせる。
+
+  data/snapshots/date=YYYY-MM-DD/part-0.parquet
+
+  - ネストした dict（vcp_detail / ses_breakdown / canslim_breakdown）は JSON 文字列列で保持し、
+    to_rows() で元の dict に戻す
+  - スキーマメタデータに universe キーを持ち、同じ日・同じユニバースのスキャン結果かを判定できる
+  - パーティションは1ファイルずつ読んで連結する（日によって列の型が揺れても壊れない）
+
+    from engines import snapshots
+    snapshots.query(where=lambda d: (d["vcp"] >= 80) & (d["rs"] >= 90), sort="canslim", top=20)
+    snapshots.compare("2026-02-19", "2026-02-20", columns=["vcp", "rs"])
+"""
+from __future__ import annotations
+
+import os, json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .config import DATA_DIR
+
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+NESTED_COLS  = ["vcp_detail", "ses_breakdown", "canslim_breakdown"]
+_META_KEY    = b"sentinel.universe"
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 書き込み
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _partition(date: str, root: Path = SNAPSHOT_DIR) -> Path:
+    return Path(root) / f"date={date}" / "part-0.parquet"
+
+
+def rows_to_frame(rows: list) -> pd.DataFrame:
+    """スコア済み行のリスト → DataFrame（ネスト dict は JSON 文字列化）"""
+    df = pd.DataFrame(rows)
+    for col in NESTED_COLS:
+        if col in df.columns:
+            df[col] = [json.dumps(v, ensure_ascii=False) for v in df[col]]
+    return df
+
+
+def write_snapshot(rows: list, date: str, universe_key: str | None = None,
+                   root: Path = SNAPSHOT_DIR) -> Path:
+    """1日分の行を zstd 圧縮 Parquet に保存（同じ日付は置き換え）。保存先を返す"""
+    table = pa.Table.from_pandas(rows_to_frame(rows), preserve_index=False)
+    if universe_key:
+        meta  = {**(table.schema.metadata or {}), _META_KEY: universe_key.encode()}
+        table = table.replace_schema_metadata(meta)
+    path = _partition(date, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+    return path
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 読み出し・クエリ
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def available_dates(root: Path = SNAPSHOT_DIR) -> list:
+    """保存済みの日付（昇順）"""
+    root = Path(root)
+    if not root.exists():
+        return []
+    return sorted(p.parent.name[5:] for p in root.glob("date=*/part-0.parquet"))
+
+
+def latest_date(root: Path = SNAPSHOT_DIR) -> str | None:
+    dates = available_dates(root)
+    return dates[-1] if dates else None
+
+
+def universe_key(date: str, root: Path = SNAPSHOT_DIR) -> str | None:
+    """その日のスナップショットを作ったユニバースのキー（無ければ None）"""
+    path = _partition(date, root)
+    if not path.exists():
+        return None
+    meta = pq.read_schema(path).metadata or {}
+    return meta.get(_META_KEY, b"").decode() or None
+
+
+def load(date: str | list | None = None, columns: list | None = None,
+         filters: list | None = None, root: Path = SNAPSHOT_DIR) -> pd.DataFrame:
+    """
+    スナップショットを DataFrame で返す（snapshot_date 列付き。date 列は各銘柄の最終バー日）。
+
+    date    : 日付 or 日付リスト（省略時は最新日、"all" で全日付）
+    columns : 読み込む列（省略時は全列）
+    filters : pyarrow 形式の行フィルタ（例 [("sector", "==", "Technology")]）
+    """
+    if date is None:
+        date = latest_date(root)
+        if date is None:
+            return pd.DataFrame()
+    dates = available_dates(root) if date == "all" else ([date] if isinstance(date, str) else list(date))
+
+    frames = []
+    for d in dates:
+        path = _partition(d, root)
+        if not path.exists():
+            continue
+        df = pd.read_parquet(path, columns=columns, filters=filters)
+        frames.append(df.assign(snapshot_date=d))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def query(date: str | list | None = None, where=None, sort: str | list | None = None,
+          ascending: bool = False, top: int | None = None, columns: list | None = None,
+          filters: list | None = None, root: Path = SNAPSHOT_DIR) -> pd.DataFrame:
+    """
+    フィルタ → ソート → 上位N件。
+
+    where : DataFrame を受け取り bool Series を返す関数（列演算で評価）
+    sort  : ソート列（既定は降順）
+    top   : 先頭N件（日付を複数指定した場合は日付ごとではなく全体のN件）
+    """
+    df = load(date, columns=columns, filters=filters, root=root)
+    if df.empty:
+        return df
+    if where is not None:
+        df = df[np.asarray(where(df), dtype=bool)]
+    if sort is not None:
+        df = df.sort_values(sort, ascending=ascending, kind="stable")
+    if top is not None:
+        df = df.head(top)
+    return df.reset_index(drop=True)
+
+
+def compare(date_a: str, date_b: str, columns: list | None = None,
+            on: str = "ticker", how: str = "outer", root: Path = SNAPSHOT_DIR) -> pd.DataFrame:
+    """
+    2日分のスナップショットを銘柄で結合する（列名に _a / _b を付与）。
+    数値列には差分列 {col}_chg（b - a）を追加する。
+    """
+    cols = None if columns is None else list(dict.fromkeys([on, *columns]))
+    a = load(date_a, columns=cols, root=root).drop(columns=["snapshot_date"])
+    b = load(date_b, columns=cols, root=root).drop(columns=["snapshot_date"])
+    if a.empty or b.empty:
+        return pd.DataFrame()
+    out = a.merge(b, on=on, how=how, suffixes=("_a", "_b"))
+    for col in (columns or [c for c in a.columns if c != on]):
+        ca, cb = f"{col}_a", f"{col}_b"
+        if ca in out and pd.api.types.is_numeric_dtype(out[ca]) and pd.api.types.is_numeric_dtype(out[cb]):
+            out[f"{col}_chg"] = out[cb] - out[ca]
+    return out
+
+
+def to_rows(df: pd.DataFrame) -> list:
+    """DataFrame → JSON 化可能な行 dict のリスト（NaN → None、ネスト列は dict に復元）"""
+    if df.empty:
+        return []
+    out  = df.astype(object).where(df.notna(), None)
+    rows = []
+    for r in out.to_dict("records"):
+        row = {k: (v.item() if hasattr(v, "item") else v) for k, v in r.items()}
+        for col in NESTED_COLS:
+            if isinstance(row.get(col), str):
+                row[col] = json.loads(row[col])
+        rows.append(row)
+    return rows
+
+
+def load_rows(date: str, universe: str | None = None, root: Path = SNAPSHOT_DIR) -> list | None:
+    """
+    その日のスナップショットをスキャン行（run_scan の戻り値と同じ形）で返す。
+    universe を指定した場合、キーが一致しなければ None。
+    """
+    if not _partition(date, root).exists():
+        return None
+    if universe is not None and universe_key(date, root) != universe:
+        return None
+    return to_rows(load(date, root=root).drop(columns=["snapshot_date"]))
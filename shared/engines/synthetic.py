@@ -0,0 +1,170 @@
+"""
+synthetic.py — 決定論的な合成 OHLCV ユニバース（負荷試験・スケーリング検証用）
+==============================================================================
+FMP のクォータを使わずに「5,000銘柄なら？」「20年分なら？」を検証するための
+シード付き合成マーケット。
+
+  - 銘柄ごとに (SYNTHETIC_SEED, ticker) から乱数系列を決定（同じ入力 → 同じ出力）
+  - レジーム: TREND（上昇トレンド）/ VCP（段階的なボラ収縮 + 出来高枯れ）/ RANDOM（ランダムウォーク）
+    を 40〜160 本のセグメントで切り替え
+  - 系列は常に SYNTHETIC_END を終端とする SYNTHETIC_HISTORY 本（約20年）を生成して末尾を切り出す。
+    days を変えても重なる足は一致する（days がそれを超える場合は生成済みの全期間を返す）
+  - 日付は market_calendar の NYSE 営業日（祝日・臨時休場には足を作らない）
+
+core_fmp は DATA_PROVIDER=synthetic のとき、この模擬データを返す。
+"""
+from __future__ import annotations
+
+import os, zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from . import market_calendar
+
+SYNTHETIC_SEED    = int(os.getenv("SYNTHETIC_SEED", "0") or 0)
+SYNTHETIC_END     = os.getenv("SYNTHETIC_END", "2026-02-20")
+SYNTHETIC_HISTORY = 5040   # 生成する本数（約20年）。days に関係なく常にこの長さの系列から切り出す
+
+REGIMES     = ("TREND", "VCP", "RANDOM")
+REGIME_PROB = (0.35, 0.25, 0.40)
+
+_SECTORS = [
+    ("Technology", "Semiconductors"), ("Technology", "Software—Infrastructure"),
+    ("Healthcare", "Biotechnology"), ("Financial Services", "Banks—Diversified"),
+    ("Consumer Cyclical", "Specialty Retail"), ("Industrials", "Aerospace & Defense"),
+    ("Energy", "Oil & Gas E&P"), ("Communication Services", "Internet Content"),
+    ("Basic Materials", "Gold"), ("Utilities", "Utilities—Regulated Electric"),
+]
+
+
+def synthetic_tickers(n: int) -> list:
+    """合成ユニバースの銘柄コード（SYN00000〜）"""
+    return [f"SYN{i:05d}" for i in range(n)]
+
+
+def _rng(ticker: str, salt: int = 0) -> np.random.Generator:
+    return np.random.default_rng([SYNTHETIC_SEED, zlib.crc32(ticker.encode()), salt])
+
+
+@lru_cache(maxsize=1)
+def _dates() -> pd.DatetimeIndex:
+    """SYNTHETIC_END 以前の直近 SYNTHETIC_HISTORY 営業日（全銘柄共通）"""
+    start = f"{market_calendar.FIRST_YEAR}-01-01"
+    return market_calendar.sessions(start, SYNTHETIC_END)[-SYNTHETIC_HISTORY:]
+
+
+def _segments(rng: np.random.Generator, n: int):
+    """レジーム別の (drift, sigma, volume multiplier) 配列を作る"""
+    drift = np.empty(n)
+    sigma = np.empty(n)
+    vmult = np.empty(n)
+    base_sigma = rng.uniform(0.012, 0.03)
+
+    i = 0
+    while i < n:
+        regime = rng.choice(REGIMES, p=REGIME_PROB)
+        length = min(int(rng.integers(40, 161)), n - i)
+        seg = slice(i, i + length)
+
+        if regime == "TREND":
+            drift[seg] = rng.uniform(0.0008, 0.0025)
+            sigma[seg] = base_sigma * rng.uniform(0.8, 1.1)
+            vmult[seg] = rng.uniform(1.0, 1.3)
+
+        elif regime == "VCP":
+            # 3段階の収縮: ボラは段階的に縮小、最終段で出来高が枯れる
+            steps = np.array_split(np.arange(length), 3)
+            for k, (scale, vol) in enumerate(((1.0, 1.0), (0.6, 0.75), (0.3, 0.4))):
+                idx = steps[k] + i
+                drift[idx] = 0.0004 if k < 2 else 0.0002
+                sigma[idx] = base_sigma * scale
+                vmult[idx] = vol
+
+        else:  # RANDOM
+            drift[seg] = rng.normal(0.0, 0.0004)
+            sigma[seg] = base_sigma * rng.uniform(1.0, 1.4)
+            vmult[seg] = rng.uniform(0.8, 1.1)
+
+        i += length
+    return drift, sigma, vmult
+
+
+def generate_ohlcv(ticker: str, days: int = 365) -> pd.DataFrame:
+    """
+    合成 OHLCV を返す（core_fmp.get_historical_data と同じ形式）
+    DatetimeIndex(name="date") / Open, High, Low, Close, Volume
+    """
+    dates = _dates()
+    n     = len(dates)
+    rng = _rng(ticker)
+    drift, sigma, vmult = _segments(rng, n)
+
+    # 終値: 対数リターンの累積
+    rets  = drift + sigma * rng.standard_normal(n)
+    start = rng.uniform(10, 400)
+    close = start * np.exp(np.cumsum(rets))
+
+    # 始値: 前日終値 + ギャップ / 高値・安値: 実体の外側にヒゲ
+    prev  = np.concatenate(([start], close[:-1]))
+    open_ = prev * np.exp(sigma * 0.3 * rng.standard_normal(n))
+    wick  = np.abs(sigma * 0.5 * rng.standard_normal((2, n)))
+    high  = np.maximum(open_, close) * np.exp(wick[0])
+    low   = np.minimum(open_, close) * np.exp(-wick[1])
+
+    # 出来高: 銘柄固有の水準 × レジーム × 値幅に比例したスパイク
+    base_vol = np.exp(rng.uniform(np.log(2e5), np.log(2e7)))
+    shock    = 1.0 + 1.5 * np.abs(rets - drift) / sigma
+    volume   = base_vol * vmult * shock * rng.lognormal(0.0, 0.25, n)
+
+    df = pd.DataFrame({
+        "Open":   np.round(open_, 4),
+        "High":   np.round(high, 4),
+        "Low":    np.round(low, 4),
+        "Close":  np.round(close, 4),
+        "Volume": np.round(volume).astype("int64"),
+    }, index=dates)
+    return df.iloc[-int(days):]
+
+
+def synthetic_eod_bulk(date: str, symbols: list | None = None) -> pd.DataFrame:
+    """一括EOD（core_fmp.get_eod_bulk と同じ形式）。その日に足が無ければ空"""
+    symbols = symbols if symbols is not None else synthetic_tickers(int(os.getenv("SYNTHETIC_UNIVERSE", "100") or 100))
+    ts   = pd.Timestamp(date)
+    rows = []
+    for t in symbols:
+        df = generate_ohlcv(t, SYNTHETIC_HISTORY)
+        if ts in df.index:
+            rows.append({"symbol": t, "date": ts, **df.loc[ts].to_dict()})
+    out = pd.DataFrame(rows, columns=["symbol", "date", "Open", "High", "Low", "Close", "Volume"])
+    return out.astype({"Volume": "int64"})
+
+
+def synthetic_quote(ticker: str) -> dict:
+    """最終足から作るクォート（/stable/quote 互換の主要キーのみ）"""
+    df = generate_ohlcv(ticker, days=2)
+    last, prev = df.iloc[-1], df.iloc[-2]
+    price = float(last["Close"])
+    return {
+        "symbol":            ticker,
+        "price":             round(price, 2),
+        "change":            round(price - float(prev["Close"]), 2),
+        "changesPercentage": round((price / float(prev["Close"]) - 1) * 100, 2),
+        "volume":            int(last["Volume"]),
+        "dayHigh":           round(float(last["High"]), 2),
+        "dayLow":            round(float(last["Low"]), 2),
+    }
+
+
+def synthetic_profile(ticker: str) -> dict:
+    """会社プロフィール（/stable/profile 互換の主要キーのみ）"""
+    sector, industry = _SECTORS[zlib.crc32(ticker.encode()) % len(_SECTORS)]
+    return {
+        "symbol":            ticker,
+        "companyName":       f"Synthetic {ticker}",
+        "sector":            sector,
+        "industry":          industry,
+        "description":       "Synthetic instrument for load testing.",
+        "exchangeShortName": "SYN",
+    }
@@ -0,0 +1,170 @@
+"""
+universe.py — ユニバース登録簿（上場廃止・履歴不足の自動スキップ）
+====================================================================
+config.TICKERS は手書きの和集合なので、FMP が返さなくなった銘柄（上場廃止・買収）や
+MIN_BARS に届かない新規上場銘柄も含まれる。これらは毎回リトライとバックオフだけ消費して落ちる。
+
+fetch の結果を銘柄ごとに記録し、次回以降のスキャンから外す:
+
+  ok     … 履歴取得に成功し MIN_BARS 以上ある
+  short  … 取得できたが MIN_BARS 未満（足りる頃に再確認）
+  dead   … DEAD_AFTER 日続けて取得失敗（REVALIDATE_DEAD 日ごとに再確認）
+
+  data/universe/registry.json          （DATA_DIR。DATA_PROVIDER=fmp）
+  data/universe/registry_{provider}.json（合成データなど）
+
+  - 1回の実行で成功が1件も無い場合は API 障害とみなし、失敗を記録しない（全銘柄 dead を防ぐ）
+  - 保存時はディスク上の登録簿を読み直し、この実行で触った銘柄だけ上書き（シャードワーカーの並走に対応）
+  - UNIVERSE_FILTER=0 で全銘柄を対象に戻す（記録は続ける）
+"""
+from __future__ import annotations
+
+import os, json, math, threading
+from datetime import date, timedelta
+from pathlib import Path
+
+from .config import DATA_DIR, TICKERS
+
+_PROVIDER         = os.environ.get("DATA_PROVIDER", "fmp").strip().lower() or "fmp"
+REGISTRY_FILE     = DATA_DIR / "universe" / ("registry.json" if _PROVIDER == "fmp"
+                                             else f"registry_{_PROVIDER}.json")
+MIN_BARS          = 200
+DEAD_AFTER        = 2    # 取得失敗がこの日数続いたら dead
+REVALIDATE_DEAD   = 7    # dead を再確認する間隔（日）
+REVALIDATE_SHORT  = 30   # short を再確認する最長間隔（日）
+FILTER_ENABLED    = os.environ.get("UNIVERSE_FILTER", "1").strip() != "0"
+
+
+class UniverseRegistry:
+    """銘柄ごとの取得結果（status / bars / last_bar / last_seen / checked / failures）"""
+
+    def __init__(self, path: Path = REGISTRY_FILE):
+        self.path      = Path(path)
+        self.entries   = self._read()
+        self._touched  = set()
+        self._failed   = {}
+        self._ok_count = 0
+        self._lock     = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except Exception:
+            return {}
+
+    # ── 記録 ──────────────────────────────────────────────
+
+    def record(self, ticker: str, df=None, min_bars: int = MIN_BARS, today: date | None = None):
+        """
+        fetch の結果を記録。df は取得した OHLCV（取得失敗なら None）。
+        失敗は save() まで保留し、実行全体で成功があったときだけ反映する。
+        """
+        today = (today or date.today()).isoformat()
+        with self._lock:
+            if df is None or len(df) == 0:
+                self._failed[ticker] = today
+                return
+            bars = len(df)
+            self.entries[ticker] = {
+                "status":    "ok" if bars >= min_bars else "short",
+                "bars":      bars,
+                "last_bar":  df.index[-1].strftime("%Y-%m-%d"),
+                "last_seen": today,
+                "checked":   today,
+                "failures":  0,
+            }
+            self._failed.pop(ticker, None)
+            self._touched.add(ticker)
+            self._ok_count += 1
+
+    def _apply_failures(self):
+        for ticker, today in self._failed.items():
+            e = dict(self.entries.get(ticker) or {"status": "ok", "bars": 0, "last_bar": None,
+                                                  "last_seen": None, "failures": 0})
+            if e.get("checked") != today:   # 同じ日の再実行では数えない
+                e["failures"] = e.get("failures", 0) + 1
+            e["checked"] = today
+            if e["failures"] >= DEAD_AFTER:
+                e["status"] = "dead"
+            self.entries[ticker] = e
+            self._touched.add(ticker)
+
+    def save(self) -> bool:
+        """この実行で触った銘柄をディスク上の登録簿へマージして保存。保存したら True"""
+        with self._lock:
+            if self._failed and not self._ok_count:
+                print(f"  ⚠️ universe: {len(self._failed)} fetch failures and no successes "
+                      f"— treating as an outage, not recording")
+                self._failed.clear()
+            self._apply_failures()
+            self._failed.clear()
+            if not self._touched:
+                return False
+            merged = self._read()
+            merged.update({t: self.entries[t] for t in self._touched})
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(merged, indent=0, sort_keys=True))
+            os.replace(tmp, self.path)
+            self.entries, self._touched, self._ok_count = merged, set(), 0
+            return True
+
+    # ── 判定 ──────────────────────────────────────────────
+
+    def _revalidate_on(self, e: dict) -> date | None:
+        """スキップ中の銘柄を再確認する日（スキップしないなら None）"""
+        checked = e.get("checked")
+        if not checked:
+            return None
+        checked = date.fromisoformat(checked)
+        if e.get("status") == "dead":
+            return checked + timedelta(days=REVALIDATE_DEAD)
+        if e.get("status") == "short":
+            # 1営業日に1本増える想定で MIN_BARS に届く頃（暦日換算）に再確認
+            missing = max(1, MIN_BARS - int(e.get("bars") or 0))
+            return checked + timedelta(days=min(REVALIDATE_SHORT, math.ceil(missing * 7 / 5)))
+        return None
+
+    def is_active(self, ticker: str, today: date | None = None) -> bool:
+        e = self.entries.get(ticker)
+        if not e:
+            return True
+        due = self._revalidate_on(e)
+        return due is None or (today or date.today()) >= due
+
+    def active(self, tickers: list, today: date | None = None) -> list:
+        """スキャン対象にする銘柄（未登録・ok・再確認日を迎えた銘柄）"""
+        if not FILTER_ENABLED:
+            return list(tickers)
+        return [t for t in tickers if self.is_active(t, today)]
+
+    def skipped(self, tickers: list, today: date | None = None) -> dict:
+        """{ticker: status} — 今回スキップする銘柄"""
+        if not FILTER_ENABLED:
+            return {}
+        return {t: self.entries[t]["status"] for t in tickers if not self.is_active(t, today)}
+
+    def summary(self) -> dict:
+        out = {"ok": 0, "short": 0, "dead": 0}
+        for e in self.entries.values():
+            out[e.get("status", "ok")] = out.get(e.get("status", "ok"), 0) + 1
+        return out
+
+
+_registry      = None
+_registry_lock = threading.Lock()
+
+
+def registry() -> UniverseRegistry:
+    """プロセス共通の登録簿（初回利用時に読み込む）"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = UniverseRegistry()
+        return _registry
+
+
+def active_universe(tickers: list | None = None) -> list:
+    """全スクリプト共通のスキャン対象: config.TICKERS（重複除去）から dead / short を除いたもの"""
+    uni = sorted(set(tickers if tickers is not None else TICKERS))
+    return registry().active(uni)
@@ -0,0 +1,5 @@
+"""
+pipeline — 日次スキャンの共通パイプライン
+universe → fetch → indicators → score → rank → outputs
+"""
+from .scan import run_scan
@@ -0,0 +1,90 @@
+"""
+incremental.py — 入力指紋つきスコアキャッシュ（差分スキャン用）
+================================================================
+score ステージの出力（RS 付与前の行）を銘柄ごとの入力指紋と一緒に保存し、
+次回スキャンで指紋が一致した銘柄は score を飛ばして前回の行を再利用する。
+祝日・売買停止銘柄・AI ステップ失敗後の再実行では、ほぼ全銘柄が再計算不要になる。
+
+指紋（input_fingerprint）:
+  last_date / bars / last_close … checkpoint.data_fingerprint と同じ
+  bars_hash    … 日付と OHLCV 全列のハッシュ（分割調整などで過去バーの高値・安値・出来高が
+                 書き換わった場合も検知。VCP / ATR / 売買水準は終値以外にも依存するため）
+  fund_version … income-statement / fundamentals / profile のハッシュ
+
+キャッシュ全体のキー（SCORE_KEY）は CONFIG・取得期間・stages.SCORE_VERSION から作るので、
+スコアリングのロジックや設定を変えたときは自動で全銘柄が再計算される。
+RS パーセンタイルは銘柄横断の値なので保存せず、毎回 rank ステージで付け直す（安価）。
+"""
+from __future__ import annotations
+
+import os, json, hashlib
+
+from engines import core_fmp, price_store
+from engines.checkpoint import run_key, data_fingerprint
+from engines.config import CONFIG
+from . import stages
+
+SCORE_CACHE_FILE = core_fmp.CACHE_DIR / "pipeline" / "score_cache.json"
+SCORE_KEY = run_key({
+    "config":       CONFIG,
+    "history_days": stages.HISTORY_DAYS,
+    "min_bars":     stages.MIN_BARS,
+    "version":      stages.SCORE_VERSION,
+    "provider":     core_fmp.DATA_PROVIDER,
+})
+
+
+def _digest(obj) -> str:
+    raw = obj if isinstance(obj, bytes) else json.dumps(obj, sort_keys=True, default=str).encode()
+    return hashlib.sha1(raw).hexdigest()[:12]
+
+
+def _bars_digest(df) -> str:
+    # API / 価格ストアのどちらから読んでも同じ値になるよう float64 に揃える（出来高の int / float の違い）
+    values = df[price_store.OHLCV_COLS].to_numpy(dtype="float64")
+    dates  = df.index.to_numpy(dtype="datetime64[ns]").astype("int64")
+    return _digest(dates.tobytes() + values.tobytes())
+
+
+def input_fingerprint(fetched: dict) -> dict:
+    """fetch ステージの結果 → score の入力を一意に表す指紋"""
+    df = fetched["df"]
+    return {
+        **data_fingerprint(df),
+        "bars_hash":    _bars_digest(df),
+        "fund_version": _digest([fetched["stmts"], fetched["fund"], fetched["profile"]]),
+    }
+
+
+class ScoreCache:
+    """{ticker: {"fp": 指紋, "row": score 行}} を1ファイルに保持する"""
+
+    def __init__(self, path=SCORE_CACHE_FILE, key: str = SCORE_KEY):
+        self.path    = path
+        self.key     = key
+        self.entries = {}
+        self.hits    = 0
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("key") == key:
+                    self.entries = data.get("entries", {})
+            except Exception:
+                pass  # 壊れたキャッシュは捨てて全件再計算
+
+    def lookup(self, ticker: str, fp: dict) -> dict | None:
+        entry = self.entries.get(ticker)
+        if entry and entry["fp"] == fp:
+            self.hits += 1
+            return entry["row"]
+        return None
+
+    def put(self, ticker: str, fp: dict, row: dict):
+        self.entries[ticker] = {"fp": fp, "row": row}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"key": self.key, "entries": self.entries},
+                                  ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -0,0 +1,124 @@
+"""
+ingest.py — 一括EODで価格ストアを日次更新する
+==============================================
+銘柄ごとに historical-price-eod/full を叩く代わりに、/stable/eod-bulk（全銘柄の1日分）を
+1日1リクエストで取得して、各銘柄のファイルに1本ずつ追記する。
+
+  - 追記できるのは「ストアの最終バー = 直前の営業日（market_calendar）」の銘柄だけ
+  - それより古い・ストアに無い銘柄は欠損ありとして、銘柄単位の履歴取得でバックフィル
+  - その日の行が一括EODに無い銘柄（売買停止・上場廃止など）は missing として報告のみ
+  - 始値がストアの最終終値から ADJUST_GAP 以上離れている銘柄は、分割・併合などで過去の足が
+    調整し直された可能性があるので追記せず、全履歴を取り直してストアのファイルごと置き換える
+    （追記すると調整前の履歴と調整後の足が混ざり、RS・VCP・52週高値が壊れた系列で計算される）
+
+取り込み後は price_store.mark_ingested() で取り込み済みの日付を記録する。
+スキャンは PRICE_SOURCE=store でこのストアを優先して読む（stages.fetch）。
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from engines import core_fmp, price_store, market_calendar
+from engines.universe import registry as universe_registry
+from . import stages
+from .pipelined import FETCH_WORKERS
+
+BACKFILL_DAYS = stages.HISTORY_DAYS
+ADJUST_GAP    = 0.25   # 始値 / 前日終値 の乖離がこれを超えたら調整の疑い（決算ギャップでの取り直しは許容）
+
+
+def backfill(tickers: list, workers: int = FETCH_WORKERS, root=price_store.PRICE_DIR,
+             replace: bool = False) -> int:
+    """
+    銘柄ごとの履歴取得でストアを埋める。成功数を返す。
+    replace=True なら既存のファイルを取得した履歴で置き換える（取得範囲より古い調整前の足を残さない）
+    """
+    def one(t):
+        df = core_fmp.get_historical_data(t, days=BACKFILL_DAYS)
+        universe_registry().record(t, df, stages.MIN_BARS)
+        if df is None or df.empty:
+            return False
+        if replace:
+            price_store.write(t, df[price_store.OHLCV_COLS], root)
+        else:
+            price_store.update(t, df, root)
+        return True
+
+    if not tickers:
+        return 0
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return sum(ex.map(one, tickers))
+
+
+def _adjusted(ticker: str, bar: pd.DataFrame, root) -> bool:
+    """一括EODの足の始値がストアの最終終値から ADJUST_GAP 以上離れているか"""
+    stored = price_store.read(ticker, days=1, root=root)
+    if stored is None or stored.empty:
+        return False
+    close, open_ = float(stored["Close"].iloc[-1]), float(bar["Open"].iloc[0])
+    return close > 0 and abs(open_ / close - 1) > ADJUST_GAP
+
+
+def ingest_date(date: str, tickers: list, root=price_store.PRICE_DIR, do_backfill: bool = True) -> dict | None:
+    """
+    1日分の一括EODを取り込んで結果の件数を返す。
+    一括EODが空（データ未確定など）は {"empty": True}、取得失敗は None。
+    """
+    if date > market_calendar.latest_completed_session().isoformat():
+        return {"date": date, "empty": True}   # 未確定の日の足はストアに入れない（確定後に取り込み直す）
+    bulk = core_fmp.get_eod_bulk(date, symbols=tickers)
+    if bulk is None:
+        return None
+    if bulk.empty:
+        return {"date": date, "empty": True}
+
+    ts    = pd.Timestamp(date)
+    prev  = pd.Timestamp(market_calendar.previous_session(date))
+    bars  = bulk.set_index("symbol")
+    lasts = {t: price_store.last_date(t, root) for t in tickers}
+
+    appended, current, missing, gaps, adjusted = 0, 0, [], [], []
+    for t in tickers:
+        last = lasts[t]
+        if last is not None and last >= ts:
+            current += 1
+            continue
+        if t not in bars.index:
+            missing.append(t)
+            continue
+        if last is None or last < prev:
+            gaps.append(t)
+            continue
+        row = bars.loc[[t]].set_index("date")[price_store.OHLCV_COLS]
+        if _adjusted(t, row, root):
+            adjusted.append(t)
+            continue
+        price_store.update(t, row.rename_axis("date"), root)
+        appended += 1
+
+    filled   = backfill(gaps, root=root) if do_backfill else 0
+    refilled = backfill(adjusted, root=root, replace=True) if do_backfill else 0
+    price_store.mark_ingested(date, root)
+    return {
+        "date":       date,
+        "appended":   appended,
+        "up_to_date": current,
+        "backfilled": filled,
+        "gaps":       len(gaps),
+        "adjusted":   adjusted,
+        "refetched":  refilled,
+        "missing":    missing,
+    }
+
+
+def ingest_range(start: str, end: str, tickers: list, root=price_store.PRICE_DIR,
+                 do_backfill: bool = True) -> list:
+    """start〜end の営業日を順に取り込む"""
+    results = []
+    for d in market_calendar.sessions(start, end):
+        res = ingest_date(d.strftime("%Y-%m-%d"), tickers, root, do_backfill)
+        if res is not None:
+            results.append(res)
+    return results
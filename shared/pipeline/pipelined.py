@@ -0,0 +1,175 @@
+"""
+pipelined.py — fetch（I/O）と score（CPU）を分離したプロデューサ・コンシューマ型スキャン
+======================================================================================
+  fetch  : asyncio のタスク群。HTTP は core_fmp（requests）なのでスレッドに逃がし、
+           総リクエストレートは engines.ratelimit のトークンバケットが制御する
+  queue  : 上限付き asyncio.Queue。score 側が詰まると fetch が put で待つ（バックプレッシャー）。
+           spill=True（既定）なら OHLCV は価格ストアへ書き出し、キューには銘柄キーと軽量データだけを流す
+  score  : ProcessPoolExecutor。GIL に縛られず pandas / エンジン計算を並列化
+  gather : 行を集めて返す（RS パーセンタイルは呼び出し側の rank ステージで付与）
+
+score_cache（incremental.ScoreCache）を渡すと、fetch 後に入力指紋を照合し、
+一致した銘柄は score を飛ばして前回の行を再利用する（差分スキャン）。
+
+実行後に PipelineStats がキュー深さと各ステージの稼働率を出すので、
+どちら側がボトルネックかを確認できる（fetch 稼働率が高く score が idle → I/O 律速）。
+
+  PIPELINE_WORKERS      … fetch の同時実行数（既定 8）
+  PIPELINE_CPU_WORKERS  … score のプロセス数（既定 CPU数-1、0 ならメインプロセス内で実行）
+  PIPELINE_QUEUE_SIZE   … fetch → score キューの上限（既定 CPU_WORKERS×4）
+"""
+import os, time, asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from engines import cache_policy
+from engines.ratelimit import FMP_LIMITER
+from . import stages
+from .incremental import input_fingerprint
+
+FETCH_WORKERS = int(os.getenv("PIPELINE_WORKERS", "8") or 8)
+CPU_WORKERS   = int(os.getenv("PIPELINE_CPU_WORKERS") or max(1, (os.cpu_count() or 2) - 1))
+QUEUE_SIZE    = int(os.getenv("PIPELINE_QUEUE_SIZE", "0") or 0) or max(4, CPU_WORKERS * 4)
+
+
+class PipelineStats:
+    """ステージごとの稼働時間とキュー深さのサンプル"""
+
+    def __init__(self, fetch_workers: int, cpu_workers: int, queue_size: int):
+        self.fetch_workers = fetch_workers
+        self.cpu_workers   = cpu_workers
+        self.queue_size    = queue_size
+        self.fetch_busy    = 0.0   # fetch 実行中の合計秒数
+        self.fetch_blocked = 0.0   # キュー満杯で put を待った合計秒数（バックプレッシャー）
+        self.score_busy    = 0.0   # score 実行中の合計秒数
+        self.score_starved = 0.0   # キューが空で get を待った合計秒数
+        self.depths        = []
+        self.fetched = self.skipped = self.scored = self.reused = self.errors = 0
+        self.wall = 0.0
+
+    def sample(self, depth: int):
+        self.depths.append(depth)
+
+    def as_dict(self) -> dict:
+        wall = self.wall or 1e-9
+        return {
+            "wall_sec":          round(self.wall, 2),
+            "fetched":           self.fetched,
+            "skipped":           self.skipped,
+            "scored":            self.scored,
+            "reused":            self.reused,
+            "errors":            self.errors,
+            "fetch_workers":     self.fetch_workers,
+            "cpu_workers":       self.cpu_workers,
+            "fetch_util":        round(self.fetch_busy / (wall * self.fetch_workers), 3),
+            "fetch_blocked_sec": round(self.fetch_blocked, 2),
+            "score_util":        round(self.score_busy / (wall * max(1, self.cpu_workers)), 3),
+            "score_starved_sec": round(self.score_starved, 2),
+            "queue_size":        self.queue_size,
+            "queue_max":         max(self.depths, default=0),
+            "queue_mean":        round(sum(self.depths) / len(self.depths), 2) if self.depths else 0.0,
+            "rate_limiter":      FMP_LIMITER.stats(),
+            "cache":             cache_policy.stats(),
+        }
+
+    def report(self):
+        d = self.as_dict()
+        bottleneck = "score (CPU)" if d["fetch_blocked_sec"] > d["score_starved_sec"] else "fetch (I/O)"
+        print(f"  📊 fetch util {d['fetch_util']:.0%} (blocked {d['fetch_blocked_sec']}s) / "
+              f"score util {d['score_util']:.0%} (starved {d['score_starved_sec']}s) / "
+              f"queue max {d['queue_max']}/{d['queue_size']} mean {d['queue_mean']} "
+              f"→ bottleneck: {bottleneck}")
+        if d["reused"]:
+            print(f"  ♻️  {d['reused']} unchanged tickers reused / {d['scored']} rescored")
+        cache_policy.report()
+
+
+async def _run(tickers: list, stats: PipelineStats, fetch_pool, score_pool,
+               score_cache=None, spill: bool = True) -> list:
+    loop  = asyncio.get_running_loop()
+    todo  = list(reversed(tickers))
+    queue = asyncio.Queue(maxsize=stats.queue_size)
+    rows  = []
+    reported = 0   # 進捗を出した 50 件単位の区切り
+
+    async def produce():
+        while todo:
+            ticker = todo.pop()
+            t0 = time.perf_counter()
+            try:
+                fetched = await loop.run_in_executor(fetch_pool, stages.fetch, ticker)
+            except Exception as e:
+                print(f"    ❌ {ticker} (fetch): {e}")
+                stats.errors += 1
+                fetched = None
+            stats.fetch_busy += time.perf_counter() - t0
+            if fetched is None:
+                stats.skipped += 1
+                continue
+            stats.fetched += 1
+            if score_cache is not None:
+                fetched["fp"] = input_fingerprint(fetched)
+                cached = score_cache.lookup(ticker, fetched["fp"])
+                if cached is not None:
+                    rows.append(cached)
+                    stats.reused += 1
+                    continue
+            if spill:
+                fetched = await loop.run_in_executor(fetch_pool, stages.spill, fetched)
+            t0 = time.perf_counter()
+            await queue.put(fetched)
+            stats.fetch_blocked += time.perf_counter() - t0
+            stats.sample(queue.qsize())
+
+    async def consume():
+        nonlocal reported
+        while True:
+            t0 = time.perf_counter()
+            fetched = await queue.get()
+            stats.score_starved += time.perf_counter() - t0
+            if fetched is None:
+                return
+            t0 = time.perf_counter()
+            try:
+                row = await loop.run_in_executor(score_pool, stages.score, fetched)
+            except Exception as e:
+                print(f"    ❌ {fetched['ticker']} (score): {e}")
+                stats.errors += 1
+                row = None
+            stats.score_busy += time.perf_counter() - t0
+            if row:
+                rows.append(row)
+                stats.scored += 1
+                if score_cache is not None:
+                    score_cache.put(row["ticker"], fetched["fp"], row)
+            # reused / skipped は fetch 側で増えるので、50 の倍数ちょうどではなく区切りを越えたときに出す
+            done = stats.scored + stats.reused + stats.skipped + stats.errors
+            if done // 50 > reported:
+                reported = done // 50
+                print(f"    {done}/{len(tickers)} processed ({stats.scored} scored, {stats.reused} reused, "
+                      f"queue {queue.qsize()})")
+
+    consumers = [asyncio.create_task(consume()) for _ in range(max(1, stats.cpu_workers))]
+    await asyncio.gather(*(produce() for _ in range(stats.fetch_workers)))
+    for _ in consumers:
+        await queue.put(None)  # 終了シグナル
+    await asyncio.gather(*consumers)
+    return rows
+
+
+def fetch_and_score(tickers: list, fetch_workers: int = FETCH_WORKERS,
+                    cpu_workers: int = CPU_WORKERS, queue_size: int = QUEUE_SIZE,
+                    score_cache=None, spill: bool = True):
+    """
+    fetch → score をパイプライン実行し (行リスト, PipelineStats) を返す。
+    行は ticker 順（RS 付与前）。cpu_workers=0 なら score はメインプロセスの1スレッドで実行。
+    score_cache を渡した場合、新たに score した行はキャッシュに追加される（保存は呼び出し側）。
+    spill=False なら DataFrame をそのままキュー経由で score に渡す（価格ストアに書かない）。
+    """
+    stats = PipelineStats(max(1, fetch_workers), cpu_workers, max(1, queue_size))
+    t0 = time.perf_counter()
+    score_pool = ProcessPoolExecutor(cpu_workers) if cpu_workers > 0 else ThreadPoolExecutor(1)
+    with ThreadPoolExecutor(stats.fetch_workers) as fetch_pool, score_pool:
+        rows = asyncio.run(_run(tickers, stats, fetch_pool, score_pool, score_cache, spill))
+    stats.wall = time.perf_counter() - t0
+    rows.sort(key=lambda r: r["ticker"])
+    return rows, stats
@@ -0,0 +1,120 @@
+"""
+scan.py — ステージを束ねる日次スキャン本体（成果物キャッシュ付き）
+===================================================================
+generate_articles / generate_strategies / personal/generate_strategies は
+すべて run_scan() の結果（同じスコア済みスナップショット）を消費する。
+
+中間成果物は cache/pipeline/{as_of}_{universe hash}/ に保存:
+  universe.json — 対象銘柄
+  raw.json      — score ステージの出力（RS 付与前）
+  stats.json    — fetch / score ステージの稼働率・キュー深さ（pipelined.PipelineStats）
+
+rank ステージの出力（最終スナップショット）は engines.snapshots の日付パーティション
+（data/snapshots/date={as_of}/）に保存し、これが各 JSON ビューの元データになる。
+api/stock 用の銘柄別レスポンスも同じタイミングで engines.api_snapshots が書き出す
+（frontend/public/content/stocks/{TICKER}.json）。
+
+日付をまたいで使う差分キャッシュは cache/pipeline/score_cache.json（incremental.ScoreCache）。
+fetch の成否は engines.universe の登録簿に記録し、dead / short の銘柄は次回から fetch しない。
+
+同じ日・同じユニバースで2本目以降のスクリプトが呼ぶとスナップショットを読むだけで終わる。
+"""
+from __future__ import annotations
+
+import os, json, time, hashlib
+
+from engines import core_fmp, snapshots, market_calendar, api_snapshots
+from engines.universe import registry as universe_registry
+from . import stages, pipelined
+from .incremental import ScoreCache
+from .pipelined import FETCH_WORKERS, CPU_WORKERS
+
+ARTIFACT_DIR = core_fmp.CACHE_DIR / "pipeline"
+# 合成データの実行で本番のスナップショットを上書きしないよう、FMP 以外は cache 側に分ける
+SNAPSHOT_ROOT    = (snapshots.SNAPSHOT_DIR if core_fmp.DATA_PROVIDER == "fmp"
+                    else ARTIFACT_DIR / f"snapshots_{core_fmp.DATA_PROVIDER}")
+API_SNAPSHOT_DIR = (api_snapshots.OUT_DIR if core_fmp.DATA_PROVIDER == "fmp"
+                    else ARTIFACT_DIR / f"api_{core_fmp.DATA_PROVIDER}")
+
+
+class ScanArtifacts:
+    """1回のスキャン（as_of × ユニバース）の中間成果物"""
+
+    def __init__(self, as_of: str, tickers: list):
+        self.key = hashlib.sha1(
+            (core_fmp.DATA_PROVIDER + "|" + ",".join(tickers)).encode()
+        ).hexdigest()[:8]
+        self.dir = ARTIFACT_DIR / f"{as_of}_{self.key}"
+
+    def load(self, name: str):
+        path = self.dir / f"{name}.json"
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return None  # 壊れた成果物は作り直す
+
+    def save(self, name: str, obj):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.dir / f"{name}.json.tmp"
+        tmp.write_text(json.dumps(obj, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.dir / f"{name}.json")
+
+
+def default_as_of() -> str:
+    """EOD データが揃っている最新の営業日（週末・祝日の再実行は直前の営業日のスナップショットを共有）"""
+    return market_calendar.latest_completed_session().isoformat()
+
+
+def run_scan(tickers: list | None = None, as_of: str | None = None,
+             workers: int = FETCH_WORKERS, cpu_workers: int = CPU_WORKERS,
+             refresh: bool = False, persist: bool = True, incremental: bool = True) -> list:
+    """
+    スコア済みスナップショット（rank 済みの行リスト）を返す。
+
+    Parameters
+    ----------
+    tickers : 対象銘柄（省略時は config.TICKERS）
+    as_of   : 成果物のキー日付（省略時は最新の営業日）
+    workers / cpu_workers : fetch の同時実行数 / score のプロセス数
+    refresh : True なら既存成果物を無視して再計算
+    persist : False なら成果物を保存しない（ベンチマーク用。差分キャッシュ・価格ストアも使わない）
+    incremental : True なら入力指紋が前回と同じ銘柄の score を再利用する
+    """
+    as_of = as_of or default_as_of()
+    uni   = stages.universe(tickers)
+    art   = ScanArtifacts(as_of, uni)   # キーは要求ユニバースで決める（登録簿が変わっても同じ日は同じキー）
+
+    if not refresh:
+        scored = snapshots.load_rows(as_of, universe=art.key, root=SNAPSHOT_ROOT)
+        if scored is not None:
+            print(f"  ♻️  Using cached scan: {art.dir.name} ({len(scored)} tickers)")
+            return scored
+
+    t0  = time.time()
+    raw = None if refresh else art.load("raw")
+    if raw is None:
+        targets = stages.active(uni) if persist else uni
+        if len(targets) < len(uni):
+            print(f"  ⏭  Skipping {len(uni) - len(targets)} dead / short-history tickers (universe registry)")
+        print(f"  Starting scan: {len(targets)} tickers (fetch={workers}, score={cpu_workers} procs)...")
+        cache = ScoreCache() if incremental and persist else None
+        raw, stats = pipelined.fetch_and_score(targets, workers, cpu_workers,
+                                               score_cache=cache, spill=persist)
+        stats.report()
+        if cache is not None and stats.scored:
+            cache.save()
+        if persist:
+            universe_registry().save()
+            art.save("universe", uni)
+            art.save("raw", raw)
+            art.save("stats", stats.as_dict())
+
+    scored = stages.rank(raw)
+    if persist:
+        snapshots.write_snapshot(scored, as_of, universe_key=art.key, root=SNAPSHOT_ROOT)
+        n = api_snapshots.write_all(scored, as_of, out_dir=API_SNAPSHOT_DIR)
+        print(f"  📇 API snapshots: {n} tickers → {API_SNAPSHOT_DIR.name}/")
+    print(f"  ✅ Scan done: {len(scored)}/{len(uni)} tickers ({time.time() - t0:.0f}s)")
+    return scored
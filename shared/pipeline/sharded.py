@@ -0,0 +1,198 @@
+"""
+sharded.py — ユニバースを分割して複数ワーカーでスキャンする（SQLite ワークキュー）
+==================================================================================
+  enqueue : ユニバースを crc32(ticker) % N で N シャードに分け、タスクとして登録
+  work    : ワーカー（別プロセス・別ホスト）がタスクを1つずつ取り出し、fetch → score して
+            RS 付与前の行を結果として書き戻す
+  merge   : 全シャードの行を集めて rank（RS パーセンタイルは全銘柄で一括計算）→ スナップショット保存
+
+シャードの割り当ては ticker だけで決まるので、ユニバースに銘柄が増減しても他の銘柄のシャードは動かない。
+キューはローカルの SQLite ファイル（SCAN_QUEUE_DB で場所を変更可）。
+共有ファイルシステム上に置けば複数ホストのワーカーがそのまま使える。
+
+タスクはリース方式: 取得したワーカーが LEASE_SEC 以内に完了しなければ他のワーカーが再取得できる
+（ワーカーが落ちてもスキャンが止まらない）。MAX_ATTEMPTS 回失敗したシャード、
+最後の試行中にワーカーが落ちてリースが切れたシャードは failed になる（merge はそれを明示して止まる）。
+"""
+from __future__ import annotations
+
+import os, json, time, socket, sqlite3, zlib
+from pathlib import Path
+
+from engines import core_fmp
+from engines.universe import registry as universe_registry
+from . import stages, pipelined
+
+QUEUE_DB     = Path(os.getenv("SCAN_QUEUE_DB") or core_fmp.CACHE_DIR / "pipeline" / "queue.sqlite")
+LEASE_SEC    = int(os.getenv("SCAN_LEASE_SEC", "1800") or 1800)
+MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    run_id      TEXT    NOT NULL,
+    shard       INTEGER NOT NULL,
+    tickers     TEXT    NOT NULL,
+    status      TEXT    NOT NULL DEFAULT 'pending',   -- pending / running / done / failed
+    worker      TEXT,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    rows        TEXT,
+    stats       TEXT,
+    error       TEXT,
+    updated     REAL,
+    PRIMARY KEY (run_id, shard)
+);
+"""
+
+
+def shard_of(ticker: str, n: int) -> int:
+    """銘柄 → シャード番号（プロセス・ホストをまたいで決定的）"""
+    return zlib.crc32(ticker.encode()) % n
+
+
+def split(tickers: list, n: int) -> dict:
+    """{shard: [tickers]}（空のシャードは含めない）"""
+    shards = {}
+    for t in tickers:
+        shards.setdefault(shard_of(t, n), []).append(t)
+    return dict(sorted(shards.items()))
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """SQLite 上のシャードタスクキュー（1接続 = 1ワーカー）"""
+
+    def __init__(self, path: Path = QUEUE_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, run_id: str, shards: dict, reset: bool = False) -> int:
+        """シャードを登録。既存の run_id は reset=True のときだけ作り直す。登録数を返す"""
+        with self.conn:
+            if reset:
+                self.conn.execute("DELETE FROM tasks WHERE run_id = ?", (run_id,))
+            cur = self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (run_id, shard, tickers, updated) VALUES (?, ?, ?, ?)",
+                [(run_id, k, json.dumps(v), time.time()) for k, v in shards.items()],
+            )
+        return cur.rowcount
+
+    def _expire(self, run_id: str, now: float):
+        """試行回数を使い切ったままリースが切れた running（最後の試行中にワーカーが落ちた）を failed にする"""
+        self.conn.execute(
+            "UPDATE tasks SET status = 'failed', error = 'lease expired on final attempt (worker ' || "
+            "COALESCE(worker, '?') || ')', lease_until = NULL, updated = ? "
+            "WHERE run_id = ? AND status = 'running' AND attempts >= ? AND lease_until < ?",
+            (now, run_id, MAX_ATTEMPTS, now),
+        )
+
+    def claim(self, run_id: str, worker: str, lease: int = LEASE_SEC) -> tuple | None:
+        """未処理（またはリース切れ）のシャードを1つ取得して (shard, tickers) を返す"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")  # 取得〜更新を他ワーカーと排他
+        try:
+            self._expire(run_id, now)
+            row = self.conn.execute(
+                "SELECT shard, tickers FROM tasks WHERE run_id = ? AND attempts < ? AND "
+                "(status = 'pending' OR (status = 'running' AND lease_until < ?)) "
+                "ORDER BY shard LIMIT 1",
+                (run_id, MAX_ATTEMPTS, now),
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE tasks SET status = 'running', worker = ?, attempts = attempts + 1, "
+                    "lease_until = ?, updated = ? WHERE run_id = ? AND shard = ?",
+                    (worker, now + lease, now, run_id, row[0]),
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return (row[0], json.loads(row[1])) if row else None
+
+    def complete(self, run_id: str, shard: int, rows: list, stats: dict | None = None):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE tasks SET status = 'done', rows = ?, stats = ?, error = NULL, updated = ? "
+                "WHERE run_id = ? AND shard = ?",
+                (json.dumps(rows, ensure_ascii=False), json.dumps(stats or {}), time.time(), run_id, shard),
+            )
+
+    def fail(self, run_id: str, shard: int, error: str):
+        """失敗を記録。試行回数が残っていれば pending に戻す"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+                "error = ?, lease_until = NULL, updated = ? WHERE run_id = ? AND shard = ?",
+                (MAX_ATTEMPTS, error[:500], time.time(), run_id, shard),
+            )
+
+    def status(self, run_id: str) -> dict:
+        """{status: 件数}（リースの切れた最終試行は failed として数える）"""
+        with self.conn:
+            self._expire(run_id, time.time())
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) FROM tasks WHERE run_id = ? GROUP BY status", (run_id,)
+        ).fetchall()
+        return dict(rows)
+
+    def failures(self, run_id: str) -> dict:
+        """{shard: error}（failed のシャード）"""
+        return dict(self.conn.execute(
+            "SELECT shard, error FROM tasks WHERE run_id = ? AND status = 'failed' ORDER BY shard", (run_id,)
+        ).fetchall())
+
+    def results(self, run_id: str) -> list:
+        """完了シャードの行をすべて返す（ticker 順）"""
+        out = []
+        for (rows,) in self.conn.execute(
+            "SELECT rows FROM tasks WHERE run_id = ? AND status = 'done'", (run_id,)
+        ):
+            out.extend(json.loads(rows))
+        out.sort(key=lambda r: r["ticker"])
+        return out
+
+
+def work(queue: WorkQueue, run_id: str, worker: str | None = None,
+         max_tasks: int | None = None, **scan_kwargs) -> int:
+    """キューが空になる（または max_tasks 件処理する）までシャードを処理。処理したシャード数を返す"""
+    worker = worker or default_worker_id()
+    done = 0
+    while max_tasks is None or done < max_tasks:
+        task = queue.claim(run_id, worker)
+        if task is None:
+            break
+        shard, tickers = task
+        print(f"  [{worker}] shard {shard}: {len(tickers)} tickers")
+        try:
+            rows, stats = pipelined.fetch_and_score(tickers, **scan_kwargs)
+        except Exception as e:
+            print(f"  ❌ [{worker}] shard {shard}: {e}")
+            queue.fail(run_id, shard, str(e))
+            continue
+        queue.complete(run_id, shard, rows, stats.as_dict())
+        done += 1
+    universe_registry().save()
+    return done
+
+
+def merge(queue: WorkQueue, run_id: str) -> list:
+    """全シャードの行に横断 RS を付けて返す（未完了・失敗シャードがあれば RuntimeError）"""
+    st = queue.status(run_id)
+    failed = queue.failures(run_id)
+    if failed:
+        detail = "; ".join(f"shard {k}: {v}" for k, v in failed.items())
+        raise RuntimeError(f"run {run_id} has {len(failed)} failed shard(s): {detail}")
+    pending = {k: v for k, v in st.items() if k != "done"}
+    if not st or pending:
+        raise RuntimeError(f"run {run_id} is not complete: {st or 'no tasks'}")
+    return stages.rank(queue.results(run_id))
@@ -0,0 +1,189 @@
+"""
+stages.py — 日次スキャンの各ステージ
+====================================
+universe → fetch → indicators → score → rank（横断RS）→ outputs
+
+fetch / indicators / score は1銘柄単位で完結し、全銘柄を必要とするのは rank のみ。
+fetch と score の間では spill で OHLCV を価格ストアへ逃がし、score は銘柄キーから読み直せる
+（パイプライン上を流れるのは軽量なバンドルだけになり、メモリがユニバースの大きさに依存しない）。
+score の出力（行dict）が全出力スクリプト共通の「スコア済みスナップショット」1行になる。
+各スクリプト固有の表示形式（composite の重み・ネスト構造など）は出力側で組み立てる。
+"""
+from __future__ import annotations
+
+import os
+import numpy as np
+import pandas as pd
+
+from engines import core_fmp, price_store
+from engines.universe            import registry as universe_registry, active_universe
+from engines.analysis            import VCPAnalyzer, RSAnalyzer, StrategyValidator
+from engines.sentinel_efficiency import SentinelEfficiencyAnalyzer
+from engines.ecr_strategy        import ECRStrategyEngine
+from engines.canslim             import CANSLIMAnalyzer
+from engines.config              import CONFIG, TICKERS
+
+HISTORY_DAYS  = 700   # 200日MA・RS(252日)に十分な期間
+MIN_BARS      = 200
+SCORE_VERSION = 1     # score の出力が変わる修正をしたら上げる（差分スキャンのキャッシュを無効化）
+# "store": 一括EOD（scripts/update_prices.py）で更新済みの価格ストアを優先し、API は不足分だけ
+PRICE_SOURCE  = os.getenv("PRICE_SOURCE", "api").strip().lower()
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 1. universe
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def universe(tickers: list | None = None) -> list:
+    """スキャン対象（重複除去・ソート済み）"""
+    return sorted(set(tickers if tickers is not None else TICKERS))
+
+
+def active(tickers: list) -> list:
+    """universe のうち登録簿（engines.universe）で dead / short になっていない銘柄"""
+    return active_universe(tickers)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 2. fetch — I/O のみ
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _stored_history(ticker: str) -> pd.DataFrame | None:
+    """価格ストアが一括EODの取り込み日まで揃っていればそれを返す"""
+    through = price_store.ingested_through()
+    if not through:
+        return None
+    df = price_store.read(ticker, days=HISTORY_DAYS)
+    if df is None or len(df) < MIN_BARS or df.index[-1] < pd.Timestamp(through):
+        return None
+    return df
+
+
+def fetch(ticker: str) -> dict | None:
+    """
+    OHLCV・income-statement・プロフィールを取得。
+    fundamentals は CANSLIM のフォールバック用なので、income-statement が2期未満のときだけ取得する。
+    PRICE_SOURCE=store なら OHLCV は価格ストアから読み、古い・無い銘柄だけ API で取る。
+    """
+    df = _stored_history(ticker) if PRICE_SOURCE == "store" else None
+    from_store = df is not None
+    if df is None:
+        df = core_fmp.get_historical_data(ticker, days=HISTORY_DAYS)
+    universe_registry().record(ticker, df, MIN_BARS)  # 取得失敗・履歴不足は次回以降スキップ
+    if df is None or len(df) < MIN_BARS:
+        return None
+    out = bundle(ticker, df)
+    if from_store:
+        out["store"] = str(price_store.PRICE_DIR)
+    return out
+
+
+def bundle(ticker: str, df: pd.DataFrame) -> dict:
+    """OHLCV に score が使う財務・プロフィールを添えたバンドル（api_snapshots.live からも使う）"""
+    stmts   = CANSLIMAnalyzer._fetch_income_statements(ticker)
+    fund    = (core_fmp.get_fundamentals(ticker) or {}) if len(stmts) < 2 else None
+    profile = core_fmp.get_company_profile(ticker) or {}
+    return {"ticker": ticker, "df": df, "stmts": stmts, "fund": fund, "profile": profile}
+
+
+def spill(fetched: dict, root=price_store.PRICE_DIR) -> dict:
+    """OHLCV を価格ストアへ書き出し、DataFrame を外したバンドルを返す（score 側で読み直す）"""
+    if fetched.get("store"):
+        return {**fetched, "df": None}  # ストアから読んだものは書き戻さない
+    price_store.update(fetched["ticker"], fetched["df"], root)
+    return {**fetched, "df": None, "store": str(root)}
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 3. indicators — 価格由来の軽量指標
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _ma_ratio(close: pd.Series, price: float, n: int):
+    if len(close) < n:
+        return None
+    ma = float(close.iloc[-n:].mean())
+    return round((price / ma - 1) * 100, 1) if ma > 0 and not np.isnan(ma) else None
+
+
+def indicators(df: pd.DataFrame) -> dict:
+    close = df["Close"]
+    price = float(close.iloc[-1])
+    pivot = float(df["High"].iloc[-20:].max())  # 簡易ピボット（直近20日高値）
+    dist  = (price - pivot) / pivot
+    return {
+        "price":          price,
+        "pivot":          pivot,
+        "pivot_dist_pct": round(dist * 100, 2),
+        "status":         "ACTION" if -0.05 <= dist <= 0.03 else ("WAIT" if dist < -0.05 else "EXTENDED"),
+        "ma50_ratio":     _ma_ratio(close, price, 50),
+        "ma200_ratio":    _ma_ratio(close, price, 200),
+        "raw_rs":         RSAnalyzer.get_raw_score(df),
+    }
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 4. score — CPU（全エンジン）
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def score(fetched: dict) -> dict | None:
+    """fetch（または spill）の結果 → スコア済み1行（rs は rank ステージで付与）"""
+    ticker, df, profile = fetched["ticker"], fetched["df"], fetched["profile"]
+    if df is None:
+        df = price_store.read(ticker, days=HISTORY_DAYS, root=fetched["store"])
+        if df is None:
+            return None
+    ind = indicators(df)
+
+    vcp     = VCPAnalyzer.calculate(df)
+    pf      = StrategyValidator.run(df)
+    ses     = SentinelEfficiencyAnalyzer.calculate(df)
+    ecr     = ECRStrategyEngine.analyze_single(ticker, df)
+    canslim = CANSLIMAnalyzer.calculate(ticker, df, fund=fetched["fund"], stmts=fetched["stmts"])
+
+    price  = ind["price"]
+    entry  = round(ind["pivot"] * 1.002, 2)
+    stop   = round(entry - vcp["atr"] * CONFIG["STOP_LOSS_ATR"], 2)
+    target = round(entry + (entry - stop) * CONFIG["TARGET_R_MULTIPLE"], 2)
+
+    return {
+        "ticker":   ticker,
+        "date":     df.index[-1].strftime("%Y-%m-%d"),
+        "name":     profile.get("companyName", ticker),
+        "sector":   profile.get("sector", "N/A"),
+        "industry": profile.get("industry", "N/A"),
+        **ind,
+        "atr":      vcp["atr"],
+        "atr_pct":  round(vcp["atr"] / price * 100, 2) if price > 0 else None,
+        "entry":    entry,
+        "stop":     stop,
+        "target":   target,
+        "rs":       None,
+        "vcp":      vcp["score"],
+        "pf":       round(pf, 2),
+        "ses":      ses["score"],
+        "ecr_rank": ecr["sentinel_rank"],
+        "canslim":  canslim["score"],
+        "ecr_phase":         ecr["phase"],
+        "ecr_strategy":      ecr["strategy"],
+        "canslim_grade":     canslim["grade"],
+        "vcp_detail":        vcp,
+        "ses_breakdown":     ses.get("breakdown", {}),
+        "canslim_breakdown": canslim.get("breakdown", {}),
+    }
+
+
+def process_ticker(ticker: str) -> dict | None:
+    """fetch → score を1銘柄で通す（逐次・スレッド実行用）"""
+    fetched = fetch(ticker)
+    return score(fetched) if fetched else None
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 5. rank — 横断 RS パーセンタイル
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def rank(rows: list) -> list:
+    """raw_rs から RS Rating（1-99）を付与した新しい行リストを返す（入力は変更しない）"""
+    rs_input  = [{"ticker": r["ticker"], "raw_rs": r["raw_rs"]} for r in rows]
+    rs_map    = {s["ticker"]: s["rs_rating"] for s in RSAnalyzer.assign_percentiles(rs_input)}
+    return [{**r, "rs": rs_map.get(r["ticker"], 0)} for r in rows]
@@ -0,0 +1,71 @@
+import { useEffect, useState } from 'react';
+
+// frontend / personal 共通（各 vite.config.js の alias '@shared' → shared/web）。
+// /content/manifest.json（shared/engines/content_writer.py が更新）の内容ハッシュを
+// ?v= に付けて取得する。中身が変わらない限り URL も変わらないので、ブラウザ・CDN が長期キャッシュできる。
+let manifestPromise = null;
+const contentCache  = new Map();   // path（+ version）→ Promise（同じページ内の重複取得を1回にまとめる）
+
+function loadManifest() {
+  if (!manifestPromise) {
+    manifestPromise = fetch('/content/manifest.json', { cache: 'no-cache' })
+      .then(r => (r.ok ? r.json() : null))
+      .then(m => m?.files ?? {})
+      .catch(() => ({}));
+  }
+  return manifestPromise;
+}
+
+async function load(path, version) {
+  const hash = version ?? (await loadManifest())[path]?.hash;
+  const url  = hash ? `/content/${path}?v=${hash}` : `/content/${path}`;
+  const r = await fetch(url);
+  return r.ok ? r.json() : null;
+}
+
+// version を渡すと manifest の代わりにそのハッシュを使う（manifest に載せないファイル用）
+export function fetchContent(path, version) {
+  const key = version ? `${path}?v=${version}` : path;
+  if (!contentCache.has(key)) {
+    contentCache.set(key, load(path, version).catch(e => { contentCache.delete(key); throw e; }));
+  }
+  return contentCache.get(key);
+}
+
+export function useContent(path) {
+  const [data, setData]       = useState(null);
+  const [loading, setLoading] = useState(true);
+
+  useEffect(() => {
+    let alive = true;
+    setLoading(true);
+    fetchContent(path)
+      .then(d => { if (alive) { setData(d); setLoading(false); } })
+      .catch(() => { if (alive) setLoading(false); });
+    return () => { alive = false; };
+  }, [path]);
+
+  return { data, loading };
+}
+
+// ── strategies（content_writer.write_strategies の分割出力）──────────
+// index.json に件数とシャード名、各シャードはそれだけで表示できる銘柄行のリスト。
+// rows.json（全銘柄の行）は銘柄横断の検索が必要な画面だけが読む。
+export const fetchStrategyIndex = () => fetchContent('strategies/index.json');
+
+export const fetchStrategyRows = () =>
+  fetchContent('strategies/rows.json').then(rows => rows ?? []);
+
+export const fetchStrategyShard = entry =>
+  entry?.file ? fetchContent(`strategies/${entry.file}`).then(rows => rows ?? []) : Promise.resolve([]);
+
+export const fetchMethodComparison = index =>
+  index?.method_comparison ? fetchContent(`strategies/${index.method_comparison.file}`) : Promise.resolve(null);
+
+// ── score_history（engines/score_history.py）────────────────────
+// 銘柄別ファイルは manifest に載せず、index.json の tickers にハッシュを持つ。履歴の無い銘柄は null
+export async function fetchScoreHistory(ticker) {
+  const index = await fetchContent('score_history/index.json');
+  const hash  = index?.tickers?.[ticker];
+  return hash ? fetchContent(`score_history/${ticker.replace('/', '_')}.json`, hash) : null;
+}